@@ -16,17 +16,60 @@ if str(project_root) not in sys.path:
 
 def cmd_scrape(args):
     """抓取推文命令"""
-    from scraper import save_user_tweets, scrape_user_tweets
+    from scraper import save_user_tweets, scrape_user_tweets, scrape_user_tweets_incremental
+    from scraper.cache import get_scrape_cache_stats, set_cache_enabled
+    
+    if args.no_cache:
+        set_cache_enabled(False)
     
     print(f"抓取 @{args.username} 的 {args.count} 条推文...")
-    tweets = scrape_user_tweets(args.username, args.count)
+    if args.full:
+        tweets = scrape_user_tweets(args.username, args.count)
+        new_count = len(tweets)
+    else:
+        tweets, new_count = scrape_user_tweets_incremental(args.username, args.count)
     
     if tweets:
-        saved = save_user_tweets(args.username, tweets)
-        print(f"✓ 成功抓取 {len(tweets)} 条推文")
-        print(f"✓ 已保存到 {saved['json']}")
+        saved = save_user_tweets(args.username, tweets, format=args.format)
+        print(f"✓ 成功抓取 {len(tweets)} 条推文（新增 {new_count} 条）")
+        for path in saved.values():
+            print(f"✓ 已保存到 {path}")
     else:
         print("✗ 未找到推文")
+    
+    cache_stats = get_scrape_cache_stats()
+    if cache_stats["hits"]:
+        print(f"  (抓取缓存命中 {cache_stats['hits']} 次)")
+
+
+def cmd_scrape_many(args):
+    """批量抓取推文命令"""
+    from scraper import save_user_tweets, scrape_many_users
+    from scraper.cache import set_cache_enabled
+    from scraper.config import MULTI_HANDLE_CHUNK_SIZE
+    
+    if args.no_cache:
+        set_cache_enabled(False)
+    
+    usernames = [name.replace("@", "") for name in args.usernames]
+    if args.file:
+        with open(args.file, "r", encoding="utf-8") as f:
+            usernames.extend(line.strip().replace("@", "") for line in f if line.strip())
+    
+    if not usernames:
+        print("✗ 请提供至少一个用户名")
+        sys.exit(1)
+    
+    print(f"批量抓取 {len(usernames)} 个用户，每人 {args.count} 条推文...")
+    chunk_size = args.chunk_size or MULTI_HANDLE_CHUNK_SIZE
+    results = scrape_many_users(usernames, args.count, chunk_size=chunk_size)
+    
+    for username, tweets in results.items():
+        if tweets:
+            save_user_tweets(username, tweets, format=args.format)
+            print(f"✓ @{username}: {len(tweets)} 条")
+        else:
+            print(f"✗ @{username}: 未找到推文")
 
 
 def cmd_analyze(args):
@@ -42,10 +85,16 @@ def cmd_analyze(args):
     from common.logger import get_module_logger
     from common.validators import sanitize_username, validate_username
     from mbti_analyzer import analyze_user_mbti
+    from mbti_analyzer.analysis_cache import set_analysis_cache_enabled
     from mbti_analyzer.html_to_image import convert_html_to_image
+    from scraper.cache import get_scrape_cache_stats, set_cache_enabled
     
     logger = get_module_logger("cli.analyze")
     
+    if args.no_cache:
+        set_cache_enabled(False)
+        set_analysis_cache_enabled(False)
+    
     # 验证用户名
     username = args.username.replace("@", "")
     valid, error = validate_username(username)
@@ -64,7 +113,8 @@ def cmd_analyze(args):
     
     try:
         # 执行分析
-        report_path, image_path, result = analyze_user_mbti(username)
+        collection_mode = "single_pass" if args.single_pass else None
+        report_path, image_path, result = analyze_user_mbti(username, collection_mode)
         
         print(f"\n✓ 分析完成!")
         print(f"  MBTI 类型: {result.get('mbti_type', 'Unknown')}")
@@ -78,13 +128,19 @@ def cmd_analyze(args):
             if confidences:
                 avg_confidence = sum(confidences) / len(confidences)
                 print(f"  置信度: {avg_confidence:.1f}%")
+        
+        cache_stats = get_scrape_cache_stats()
+        if cache_stats["hits"]:
+            print(f"  抓取缓存: 命中 {cache_stats['hits']} 次，未命中 {cache_stats['misses']} 次")
         print(f"\n📄 报告已保存: {report_path}")
         
         # 如果指定了保存图片
         if args.save_image:
             try:
                 print("📸 正在生成图片...")
-                img_path = convert_html_to_image(report_path)
+                img_path = convert_html_to_image(
+                    report_path, renderer=args.renderer, options=_render_options(args)
+                )
                 print(f"✓ 图片已保存: {img_path}")
             except Exception as e:
                 print(f"✗ 图片生成失败: {e}")
@@ -123,70 +179,71 @@ def cmd_analyze(args):
         sys.exit(1)
 
 
-def cmd_stats(args):
-    """MBTI统计命令"""
-    import glob
-    import re
+def _collect_mbti_stats(day=None):
+    """
+    从统计索引（数据库 analyses 表）汇总MBTI分析记录
+
+    Args:
+        day: 只统计某一天（YYYYMMDD），None 表示全部
+
+    Returns:
+        (各类型数量 Counter, 用户名列表)
+    """
     from collections import Counter
-    from common.calculations import (
-        calculate_percentage,
-        calculate_percentage_bar,
-        format_percentage_display,
-    )
+    from common.data.database import get_database
     from config import get_config
     
-    # 使用配置获取报告目录
     config = get_config()
-    reports_pattern = str(config.storage.reports_dir / "*.html")
-    reports = glob.glob(reports_pattern)
-    
-    mbti_types = []
-    users = {}
-    
-    for report in reports:
-        # 提取用户名和MBTI类型
-        filename = report.split("/")[-1]
-        username_match = re.search(r"mbti_report_(.+?)_\d+", filename)
-        if username_match:
-            username = username_match.group(1)
-            
-            with open(report, "r", encoding="utf-8") as f:
-                content = f.read()
-                mbti_match = re.search(r"分析结论:.*?([A-Z]{4})", content)
-                if mbti_match:
-                    mbti_type = mbti_match.group(1)
-                    mbti_types.append(mbti_type)
-                    users[username] = mbti_type
-    
-    # 统计分析
-    type_count = Counter(mbti_types)
-    total = len(mbti_types)
+    database = get_database(config.storage.database_path)
+    db_day = f"{day[:4]}-{day[4:6]}-{day[6:]}" if day else None
+    type_count = Counter(database.mbti_type_counts(db_day))
+    
+    if not type_count and not database.count_analyses():
+        # 索引为空但已有旧报告：提示导入一次
+        if any(config.storage.reports_dir.glob("mbti_report_*.html")):
+            print("提示: 统计索引为空，运行 `backfill-stats` 导入已有报告\n")
+    
+    return type_count, database.analyzed_users(db_day)
+
+
+def _dimension_counts(type_count):
+    """按四个维度统计字母出现次数"""
+    from collections import Counter
+    
+    dimensions = {"E/I": Counter(), "S/N": Counter(), "T/F": Counter(), "J/P": Counter()}
+    
+    for mbti, count in type_count.items():
+        dimensions["E/I"][mbti[0]] += count
+        dimensions["S/N"][mbti[1]] += count
+        dimensions["T/F"][mbti[2]] += count
+        dimensions["J/P"][mbti[3]] += count
+    
+    return dimensions
+
+
+def cmd_stats(args):
+    """MBTI统计命令"""
+    from common.calculations import calculate_percentage, format_percentage_display
+    
+    type_count, users = _collect_mbti_stats()
+    total = sum(type_count.values())
     
     print("=== MBTI 类型分布统计 ===")
     print(f"总测试人数: {total}")
-    print(f"不同用户数: {len(set(users.keys()))}")
+    print(f"不同用户数: {len(users)}")
     print("\n各类型分布:")
     print("-" * 30)
     
     # 按数量排序输出
     for mbti_type, count in type_count.most_common():
         percentage = calculate_percentage(count, total)
-        bar = calculate_percentage_bar(percentage, bar_length=30)
         print(f"{mbti_type}: {count:3d} {format_percentage_display(percentage, include_bar=True, bar_length=30)}")
     
     # 维度统计
     print("\n各维度分布:")
     print("-" * 30)
     
-    dimensions = {"E/I": Counter(), "S/N": Counter(), "T/F": Counter(), "J/P": Counter()}
-    
-    for mbti in mbti_types:
-        dimensions["E/I"][mbti[0]] += 1
-        dimensions["S/N"][mbti[1]] += 1
-        dimensions["T/F"][mbti[2]] += 1
-        dimensions["J/P"][mbti[3]] += 1
-    
-    for dim, counts in dimensions.items():
+    for dim, counts in _dimension_counts(type_count).items():
         print(f"\n{dim}:")
         for letter, count in sorted(counts.items()):
             percentage = calculate_percentage(count, total)
@@ -202,42 +259,14 @@ def cmd_stats(args):
 
 def cmd_today_stats(args):
     """今日MBTI统计命令"""
-    import glob
-    import re
-    from collections import Counter
     from datetime import datetime
     from common.calculations import calculate_percentage, format_percentage_display
-    from config import get_config
     
     # 获取今天的日期
     today = datetime.now().strftime("%Y%m%d")
     
-    # 使用配置获取报告目录
-    config = get_config()
-    reports_pattern = str(config.storage.reports_dir / f"*_{today}_*.html")
-    reports = glob.glob(reports_pattern)
-    
-    mbti_types = []
-    users = []
-    
-    for report in reports:
-        # 提取用户名和MBTI类型
-        filename = report.split("/")[-1]
-        username_match = re.search(r"mbti_report_(.+?)_\d+", filename)
-        if username_match:
-            username = username_match.group(1)
-            users.append(username)
-            
-            with open(report, "r", encoding="utf-8") as f:
-                content = f.read()
-                mbti_match = re.search(r"分析结论:.*?([A-Z]{4})", content)
-                if mbti_match:
-                    mbti_type = mbti_match.group(1)
-                    mbti_types.append(mbti_type)
-    
-    # 统计分析
-    type_count = Counter(mbti_types)
-    total = len(mbti_types)
+    type_count, users = _collect_mbti_stats(today)
+    total = sum(type_count.values())
     
     print(f"=== 今日 MBTI 分析统计 ({today}) ===")
     print(f"分析人数: {total}")
@@ -247,7 +276,7 @@ def cmd_today_stats(args):
         return
     
     print("\n今日用户:")
-    for user in sorted(set(users)):
+    for user in users:
         print(f"  @{user}")
     
     print("\n类型分布:")
@@ -263,15 +292,7 @@ def cmd_today_stats(args):
     print("\n维度偏好:")
     print("-" * 30)
     
-    dimensions = {"E/I": Counter(), "S/N": Counter(), "T/F": Counter(), "J/P": Counter()}
-    
-    for mbti in mbti_types:
-        dimensions["E/I"][mbti[0]] += 1
-        dimensions["S/N"][mbti[1]] += 1
-        dimensions["T/F"][mbti[2]] += 1
-        dimensions["J/P"][mbti[3]] += 1
-    
-    for dim, counts in dimensions.items():
+    for dim, counts in _dimension_counts(type_count).items():
         parts = []
         for letter in sorted(counts.keys()):
             count = counts[letter]
@@ -280,6 +301,90 @@ def cmd_today_stats(args):
         print(f"{dim}: {' vs '.join(parts)}")
 
 
+def cmd_backfill_stats(args):
+    """导入已有报告到统计索引"""
+    from mbti_analyzer.report_generator import backfill_report_index
+    
+    print("正在导入已有报告到统计索引...")
+    imported, unrecognized = backfill_report_index(args.reports_dir)
+    print(f"✓ 新导入 {imported} 份报告")
+    if unrecognized:
+        print(f"✗ {unrecognized} 份报告无法识别，已跳过")
+
+
+def cmd_render(args):
+    """批量把报告转换为图片"""
+    from datetime import datetime
+    from config import get_config
+    from mbti_analyzer.html_to_image import HTMLToImageConverter
+    from mbti_analyzer.image_cache import get_image_cache_stats, set_image_cache_enabled
+    from mbti_analyzer.image_renderer import render_many
+    
+    if args.no_cache:
+        set_image_cache_enabled(False)
+    
+    reports = args.reports
+    if not reports:
+        # 默认转换当天生成的报告
+        day = args.date or datetime.now().strftime("%Y%m%d")
+        reports_dir = get_config().storage.reports_dir
+        reports = sorted(str(p) for p in reports_dir.glob(f"mbti_report_*_{day}_*.html"))
+    
+    if not reports:
+        print("没有需要转换的报告")
+        return
+    
+    print(f"正在转换 {len(reports)} 份报告...")
+    options = _render_options(args)
+    if (args.renderer or get_config().render.renderer) == "pillow":
+        results = render_many(reports, args.output_dir, options)
+    else:
+        converter = HTMLToImageConverter(options=options)
+        results = converter.convert_many(reports, args.output_dir, args.concurrency)
+    
+    failed = 0
+    for result in results:
+        if result.ok:
+            print(f"  ✓ {result.image_path}")
+        else:
+            failed += 1
+            print(f"  ✗ {result.html_path}: {result.error}")
+    
+    print(f"\n完成: 成功 {len(reports) - failed}，失败 {failed}")
+    cache_stats = get_image_cache_stats()
+    if cache_stats["hits"] or cache_stats["evictions"]:
+        print(f"图片缓存: 命中 {cache_stats['hits']} 次，淘汰 {cache_stats['evictions']} 个")
+    if failed:
+        sys.exit(1)
+
+
+def _add_render_arguments(parser):
+    """添加图片生成相关的参数（analyze --save-image 和 render 共用）"""
+    parser.add_argument("--renderer", choices=["browser", "pillow"],
+                        help="图片生成方式：browser 浏览器截图，pillow 直接绘制 (默认读取配置)")
+    parser.add_argument("--format", dest="image_format", choices=["png", "jpeg", "webp"],
+                        help="图片格式 (默认读取配置)")
+    parser.add_argument("--quality", type=int, help="JPEG/WebP 质量 1-100")
+    parser.add_argument("--scale", type=int, help="缩放倍数 (默认: 2)")
+    parser.add_argument("--palette", type=int, dest="palette_colors",
+                        help="PNG 量化为指定颜色数的调色板图片，显著减小体积")
+    parser.add_argument("--thumbnail", type=int, dest="thumbnail_width",
+                        help="同时生成指定宽度的缩略图")
+
+
+def _render_options(args):
+    """根据命令行参数生成图片输出参数，未指定的参数使用配置值"""
+    from mbti_analyzer.render_options import RenderOptions
+    
+    return RenderOptions.from_config(
+        format=args.image_format,
+        quality=args.quality,
+        scale=args.scale,
+        palette_colors=args.palette_colors,
+        thumbnail_width=args.thumbnail_width,
+    )
+
+
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(
@@ -289,10 +394,13 @@ def main():
         epilog="""
 示例:
   %(prog)s scrape elonmusk                    # 抓取推文
+  %(prog)s scrape-many -f users.txt -n 50     # 批量抓取
   %(prog)s analyze taylorswift13              # 分析MBTI
   %(prog)s analyze @naval --save-image        # 分析并保存图片
   %(prog)s stats                              # 查看所有统计
   %(prog)s today-stats                        # 查看今日统计
+  %(prog)s backfill-stats                     # 导入已有报告到统计
+  %(prog)s render -c 4                        # 批量把今日报告转换为图片
         """
     )
     
@@ -303,6 +411,29 @@ def main():
     parser_scrape.add_argument("username", help="Twitter用户名")
     parser_scrape.add_argument("count", type=int, nargs="?", default=100, 
                               help="抓取数量 (默认: 100)")
+    parser_scrape.add_argument("--full", action="store_true",
+                              help="忽略本地记录，全量重新抓取")
+    parser_scrape.add_argument("--no-cache", action="store_true",
+                              help="不使用抓取缓存")
+    parser_scrape.add_argument("--format", choices=["jsonl", "json", "csv", "both"],
+                              default="jsonl",
+                              help="保存格式：jsonl 追加到用户推文库，其余生成完整快照 (默认: jsonl)")
+    
+    # scrape-many 命令
+    parser_scrape_many = subparsers.add_parser("scrape-many", help="批量抓取多个用户的推文")
+    parser_scrape_many.add_argument("usernames", nargs="*", help="Twitter用户名列表")
+    parser_scrape_many.add_argument("-f", "--file", help="用户名列表文件（每行一个）")
+    parser_scrape_many.add_argument("-n", "--count", type=int, default=100,
+                                   help="每个用户的抓取数量 (默认: 100)")
+    parser_scrape_many.add_argument("--chunk-size", type=int, default=None,
+                                   help="每次 actor 运行包含的用户数 "
+                                        "(默认: MULTI_HANDLE_CHUNK_SIZE，未设置时为 50)")
+    parser_scrape_many.add_argument("--no-cache", action="store_true",
+                                   help="不使用抓取缓存")
+    parser_scrape_many.add_argument("--format", choices=["jsonl", "json", "csv", "both"],
+                                   default="jsonl",
+                                   help="保存格式：jsonl 追加到用户推文库，其余生成完整快照 "
+                                        "(默认: jsonl)")
     
     # analyze 命令
     parser_analyze = subparsers.add_parser("analyze", help="分析用户MBTI类型")
@@ -311,6 +442,11 @@ def main():
                                help="跳过交互式提示")
     parser_analyze.add_argument("--save-image", action="store_true",
                                help="将报告保存为图片")
+    parser_analyze.add_argument("--single-pass", action="store_true",
+                               help="只运行一次搜索并在本地区分原创和回复")
+    parser_analyze.add_argument("--no-cache", action="store_true",
+                               help="不使用抓取缓存和分析结果缓存，强制重新抓取和分析")
+    _add_render_arguments(parser_analyze)
     
     # stats 命令
     parser_stats = subparsers.add_parser("stats", help="查看MBTI统计数据")
@@ -318,6 +454,21 @@ def main():
     # today-stats 命令
     parser_today = subparsers.add_parser("today-stats", help="查看今日MBTI统计")
     
+    # backfill-stats 命令
+    parser_backfill = subparsers.add_parser("backfill-stats", help="把已有的HTML报告导入统计索引")
+    parser_backfill.add_argument("--reports-dir", help="报告目录（默认使用配置中的目录）")
+    
+    # render 命令
+    parser_render = subparsers.add_parser("render", help="批量把HTML报告转换为图片")
+    parser_render.add_argument("reports", nargs="*", help="报告文件路径（默认转换当天的报告）")
+    parser_render.add_argument("--date", help="转换指定日期的报告 (YYYYMMDD)")
+    parser_render.add_argument("-o", "--output-dir", help="图片输出目录")
+    parser_render.add_argument("-c", "--concurrency", type=int,
+                              help="同时截图的页面数 (默认: 浏览器池页面总数)")
+    _add_render_arguments(parser_render)
+    parser_render.add_argument("--no-cache", action="store_true",
+                              help="不使用图片缓存，强制重新生成")
+    
     # 解析参数
     args = parser.parse_args()
     
@@ -329,9 +480,12 @@ def main():
     # 执行对应命令
     commands = {
         "scrape": cmd_scrape,
+        "scrape-many": cmd_scrape_many,
         "analyze": cmd_analyze,
         "stats": cmd_stats,
         "today-stats": cmd_today_stats,
+        "backfill-stats": cmd_backfill_stats,
+        "render": cmd_render,
     }
     
     commands[args.command](args)
@@ -2,6 +2,9 @@
 数据处理模块
 """
 
+from .database import Database, get_database
+from .tweet import Tweet, as_tweet, parse_created_at, tweet_to_dict
+from .tweet_batch import TweetBatch, as_batch
 from .tweet_utils import (
     calculate_tweet_stats,
     filter_original_tweets,
@@ -17,6 +20,14 @@ from .tweet_utils import (
 )
 
 __all__ = [
+    "Database",
+    "get_database",
+    "Tweet",
+    "TweetBatch",
+    "as_batch",
+    "as_tweet",
+    "parse_created_at",
+    "tweet_to_dict",
     "calculate_tweet_stats",
     "filter_original_tweets",
     "filter_reply_tweets",
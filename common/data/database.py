@@ -0,0 +1,409 @@
+"""
+SQLite 存储
+推文和 MBTI 分析结果的嵌入式数据库，按用户、时间和类型建立索引
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, List, Mapping, Optional
+
+from .tweet import Tweet, parse_created_at
+
+# 批量写入时每次 executemany 的行数
+INSERT_BATCH_SIZE = 500
+
+# MBTI 维度顺序，与 analyses 表的列对应
+DIMENSIONS = ("E_I", "S_N", "T_F", "J_P")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tweets (
+    id TEXT PRIMARY KEY,
+    author TEXT NOT NULL,
+    created_at TEXT,
+    created_ts REAL,
+    text TEXT,
+    likes INTEGER DEFAULT 0,
+    retweets INTEGER DEFAULT 0,
+    replies INTEGER DEFAULT 0,
+    views INTEGER DEFAULT 0,
+    is_reply INTEGER DEFAULT 0,
+    is_retweet INTEGER DEFAULT 0,
+    is_quote INTEGER DEFAULT 0,
+    is_pin INTEGER DEFAULT 0,
+    author_name TEXT,
+    url TEXT,
+    media TEXT,
+    hashtags TEXT,
+    mentions TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tweets_author_time
+    ON tweets (author COLLATE NOCASE, created_ts);
+
+CREATE TABLE IF NOT EXISTS analyses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL,
+    mbti_type TEXT NOT NULL,
+    e_i REAL,
+    s_n REAL,
+    t_f REAL,
+    j_p REAL,
+    report_path TEXT,
+    created_at TEXT NOT NULL,
+    created_date TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_username ON analyses (username COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_analyses_date ON analyses (created_date);
+CREATE INDEX IF NOT EXISTS idx_analyses_type ON analyses (mbti_type);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_analyses_report ON analyses (report_path);
+"""
+
+_TWEET_COLUMNS = (
+    "id", "author", "created_at", "created_ts", "text", "likes", "retweets", "replies",
+    "views", "is_reply", "is_retweet", "is_quote", "is_pin", "author_name", "url",
+    "media", "hashtags", "mentions",
+)
+
+_UPSERT_TWEET = (
+    f"INSERT INTO tweets ({', '.join(_TWEET_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in _TWEET_COLUMNS)}) "
+    "ON CONFLICT(id) DO UPDATE SET likes = excluded.likes, retweets = excluded.retweets, "
+    "replies = excluded.replies, views = excluded.views"
+)
+
+
+def _tweet_row(tweet: Mapping) -> tuple:
+    created_at = tweet.get("created_at", "") or ""
+    created = parse_created_at(created_at)
+    return (
+        str(tweet.get("id")),
+        tweet.get("author", "") or "",
+        created_at,
+        created.timestamp() if created else None,
+        tweet.get("text", "") or "",
+        tweet.get("likes", 0) or 0,
+        tweet.get("retweets", 0) or 0,
+        tweet.get("replies", 0) or 0,
+        tweet.get("views", 0) or 0,
+        int(bool(tweet.get("is_reply"))),
+        int(bool(tweet.get("is_retweet"))),
+        int(bool(tweet.get("is_quote"))),
+        int(bool(tweet.get("is_pin"))),
+        tweet.get("author_name", "") or "",
+        tweet.get("url", "") or "",
+        json.dumps(list(tweet.get("media") or ()), ensure_ascii=False),
+        json.dumps(list(tweet.get("hashtags") or ()), ensure_ascii=False),
+        json.dumps(list(tweet.get("mentions") or ()), ensure_ascii=False),
+    )
+
+
+def _row_to_tweet(row: sqlite3.Row) -> Tweet:
+    return Tweet(
+        id=row["id"],
+        author=row["author"],
+        author_name=row["author_name"],
+        created_at=row["created_at"],
+        text=row["text"],
+        likes=row["likes"],
+        retweets=row["retweets"],
+        replies=row["replies"],
+        views=row["views"],
+        url=row["url"],
+        is_reply=bool(row["is_reply"]),
+        is_retweet=bool(row["is_retweet"]),
+        is_quote=bool(row["is_quote"]),
+        is_pin=bool(row["is_pin"]),
+        media=json.loads(row["media"] or "[]"),
+        hashtags=json.loads(row["hashtags"] or "[]"),
+        mentions=json.loads(row["mentions"] or "[]"),
+    )
+
+
+_ANALYSIS_COLUMNS = (
+    "analyses (username, mbti_type, e_i, s_n, t_f, j_p, report_path, created_at, created_date) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_INSERT_ANALYSIS = f"INSERT INTO {_ANALYSIS_COLUMNS}"
+# 导入已有报告时按报告路径去重
+_IMPORT_ANALYSIS = f"INSERT OR IGNORE INTO {_ANALYSIS_COLUMNS}"
+
+
+def _analysis_row(
+    username: str,
+    mbti_result: Dict,
+    report_path: Optional[str] = None,
+    created_at: Optional[datetime] = None,
+) -> tuple:
+    created_at = created_at or datetime.now()
+    dimensions = mbti_result.get("dimensions") or {}
+    return (
+        username,
+        mbti_result["mbti_type"],
+        *(dimensions.get(dim, {}).get("percentage") for dim in DIMENSIONS),
+        report_path,
+        created_at.isoformat(timespec="seconds"),
+        created_at.strftime("%Y-%m-%d"),
+    )
+
+
+def _is_special_path(path: str) -> bool:
+    """内存数据库或 SQLite URI，不是普通的文件路径"""
+    return path == ":memory:" or path.startswith("file:")
+
+
+def _date_filter(day: Optional[str]) -> tuple:
+    """按日期（YYYY-MM-DD）过滤分析记录的 WHERE 子句"""
+    if day is None:
+        return "", ()
+    return " WHERE created_date = ?", (day,)
+
+
+class Database:
+    """
+    推文与分析结果数据库
+
+    使用 WAL 模式，读写可以并发；每个线程使用各自的连接
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: 数据库文件路径（":memory:" 表示内存数据库，仅限单线程使用；
+                也可以是 "file:" 开头的 SQLite URI）
+        """
+        self.path = str(path)
+        self._local = threading.local()
+        self._memory_conn = None
+        if not _is_special_path(self.path):
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self.path == ":memory:":
+            if self._memory_conn is None:
+                self._memory_conn = self._open()
+            return self._memory_conn
+
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+        return conn
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, uri=self.path.startswith("file:"))
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def close(self):
+        """关闭当前线程的连接"""
+        conn = self._memory_conn or getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+        self._memory_conn = None
+        self._local.conn = None
+
+    # ---- 推文 ----
+
+    def insert_tweets(self, tweets: Iterable[Mapping]) -> int:
+        """
+        批量写入推文（已存在的推文只更新互动数）
+
+        Args:
+            tweets: 推文列表或生成器，没有 id 的推文会被跳过
+
+        Returns:
+            写入的推文数量
+        """
+        conn = self._connection()
+        rows = (_tweet_row(tweet) for tweet in tweets if tweet.get("id"))
+        written = 0
+        while True:
+            batch = list(islice(rows, INSERT_BATCH_SIZE))
+            if not batch:
+                break
+            with conn:
+                conn.executemany(_UPSERT_TWEET, batch)
+            written += len(batch)
+        return written
+
+    def get_tweets(
+        self,
+        author: str,
+        limit: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[Tweet]:
+        """
+        按作者读取推文（从新到旧）
+
+        Args:
+            author: 作者用户名（不区分大小写）
+            limit: 最多返回的数量
+            since: 起始时间（含）
+            until: 结束时间（不含）
+
+        Returns:
+            推文列表
+        """
+        sql = "SELECT * FROM tweets WHERE author = ? COLLATE NOCASE"
+        params: list = [author]
+        if since is not None:
+            sql += " AND created_ts >= ?"
+            params.append(since.timestamp())
+        if until is not None:
+            sql += " AND created_ts < ?"
+            params.append(until.timestamp())
+        sql += " ORDER BY created_ts DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [_row_to_tweet(row) for row in self._connection().execute(sql, params)]
+
+    def count_tweets(self, author: Optional[str] = None) -> int:
+        """统计推文数量"""
+        if author is None:
+            row = self._connection().execute("SELECT COUNT(*) FROM tweets").fetchone()
+        else:
+            row = self._connection().execute(
+                "SELECT COUNT(*) FROM tweets WHERE author = ? COLLATE NOCASE", (author,)
+            ).fetchone()
+        return row[0]
+
+    # ---- 分析结果 ----
+
+    def record_analysis(
+        self,
+        username: str,
+        mbti_result: Dict,
+        report_path: Optional[str] = None,
+        created_at: Optional[datetime] = None,
+    ) -> int:
+        """
+        记录一次 MBTI 分析结果
+
+        Args:
+            username: Twitter用户名
+            mbti_result: 分析结果（包含 mbti_type 和 dimensions）
+            report_path: 生成的报告路径
+            created_at: 分析时间，默认当前时间
+
+        Returns:
+            记录 id
+        """
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute(
+                _INSERT_ANALYSIS, _analysis_row(username, mbti_result, report_path, created_at)
+            )
+        return cursor.lastrowid
+
+    def import_analyses(self, records: Iterable[Dict]) -> int:
+        """
+        批量导入分析记录，报告路径已存在的记录会被跳过
+
+        Args:
+            records: {"username", "mbti_result", "report_path", "created_at"} 字典
+
+        Returns:
+            新导入的记录数
+        """
+        conn = self._connection()
+        rows = (
+            _analysis_row(
+                record["username"],
+                record["mbti_result"],
+                record.get("report_path"),
+                record.get("created_at"),
+            )
+            for record in records
+        )
+        imported = 0
+        while True:
+            batch = list(islice(rows, INSERT_BATCH_SIZE))
+            if not batch:
+                break
+            with conn:
+                before = conn.total_changes
+                conn.executemany(_IMPORT_ANALYSIS, batch)
+                imported += conn.total_changes - before
+        return imported
+
+    def has_report(self, report_path: str) -> bool:
+        """报告是否已经记录"""
+        row = self._connection().execute(
+            "SELECT 1 FROM analyses WHERE report_path = ?", (report_path,)
+        ).fetchone()
+        return row is not None
+
+    def count_analyses(self, day: Optional[str] = None) -> int:
+        """统计分析次数（可按日期 YYYY-MM-DD 过滤）"""
+        where, params = _date_filter(day)
+        return self._connection().execute(
+            f"SELECT COUNT(*) FROM analyses{where}", params
+        ).fetchone()[0]
+
+    def mbti_type_counts(self, day: Optional[str] = None) -> Dict[str, int]:
+        """各 MBTI 类型的分析次数"""
+        where, params = _date_filter(day)
+        rows = self._connection().execute(
+            f"SELECT mbti_type, COUNT(*) FROM analyses{where} GROUP BY mbti_type", params
+        )
+        return {row[0]: row[1] for row in rows}
+
+    def analyzed_users(self, day: Optional[str] = None) -> List[str]:
+        """被分析过的用户（不区分大小写去重、按名称排序）"""
+        where, params = _date_filter(day)
+        rows = self._connection().execute(
+            f"SELECT DISTINCT username COLLATE NOCASE FROM analyses{where} "
+            "ORDER BY username COLLATE NOCASE",
+            params,
+        )
+        return [row[0] for row in rows]
+
+    def count_users(self, day: Optional[str] = None) -> int:
+        """被分析过的不同用户数（用户名不区分大小写）"""
+        where, params = _date_filter(day)
+        return self._connection().execute(
+            f"SELECT COUNT(DISTINCT username COLLATE NOCASE) FROM analyses{where}", params
+        ).fetchone()[0]
+
+    def latest_analysis(self, username: str) -> Optional[Dict]:
+        """用户最近一次的分析记录"""
+        row = self._connection().execute(
+            "SELECT * FROM analyses WHERE username = ? COLLATE NOCASE "
+            "ORDER BY created_at DESC, id DESC LIMIT 1",
+            (username,),
+        ).fetchone()
+        return dict(row) if row else None
+
+
+# 数据库路径 -> 实例
+_databases: Dict[str, Database] = {}
+_databases_lock = threading.Lock()
+
+
+def get_database(path: str) -> Database:
+    """
+    获取指定路径的共享数据库实例
+
+    Args:
+        path: 数据库文件路径（":memory:" 和 "file:" URI 原样使用）
+
+    Returns:
+        数据库实例
+    """
+    key = str(path)
+    if not _is_special_path(key):
+        key = os.path.abspath(key)
+    with _databases_lock:
+        database = _databases.get(key)
+        if database is None:
+            database = Database(key)
+            _databases[key] = database
+        return database
@@ -0,0 +1,237 @@
+"""
+推文记录类型
+整个流程（抓取 → 存储 → 分析）共用的紧凑推文结构，只在 JSON/CSV 边界转换为字典
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
+
+# Twitter API 的 createdAt 格式，例如 "Wed Oct 10 20:19:24 +0000 2018"
+TWITTER_TIME_FORMAT = "%a %b %d %H:%M:%S %z %Y"
+
+# 字段顺序与原先 extract_tweet_fields 返回的字典一致，保证导出的 JSON 不变
+TWEET_FIELDS: Tuple[str, ...] = (
+    "text",
+    "author",
+    "author_name",
+    "created_at",
+    "likes",
+    "retweets",
+    "replies",
+    "views",
+    "url",
+    "id",
+    "is_reply",
+    "is_retweet",
+    "is_quote",
+    "is_pin",
+    "media",
+    "hashtags",
+    "mentions",
+)
+
+# 可以通过下标访问的派生字段
+DERIVED_FIELDS: Tuple[str, ...] = ("has_media", "engagement_rate")
+
+_FIELD_SET = frozenset(TWEET_FIELDS)
+_KEY_SET = _FIELD_SET | frozenset(DERIVED_FIELDS)
+
+
+def parse_created_at(created_at: str) -> Optional[datetime]:
+    """解析推文时间，无法解析时返回 None"""
+    if not created_at:
+        return None
+    for fmt in (TWITTER_TIME_FORMAT, "%Y-%m-%dT%H:%M:%S.%f%z", "%Y-%m-%dT%H:%M:%S%z"):
+        try:
+            return datetime.strptime(created_at.replace("Z", "+0000"), fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def tweet_sort_key(tweet: Dict) -> Tuple[int, str]:
+    """
+    推文排序键（越新越大）
+
+    推文 id 是递增的雪花 id，优先按数值比较；非数字 id 退回按时间比较
+    """
+    tweet_id = str(tweet.get("id", ""))
+    if tweet_id.isdigit():
+        return int(tweet_id), ""
+    created = parse_created_at(tweet.get("created_at", ""))
+    return 0, created.isoformat() if created else ""
+
+
+class Tweet:
+    """
+    单条推文
+
+    使用 __slots__ 存储，单条记录的内存占用远小于同等字段的字典；
+    同时支持 tweet["text"] / tweet.get("likes", 0) 形式的访问，兼容原有按字典处理推文的代码
+    """
+
+    __slots__ = TWEET_FIELDS
+
+    def __init__(
+        self,
+        text: str = "",
+        author: str = "",
+        author_name: str = "",
+        created_at: str = "",
+        likes: int = 0,
+        retweets: int = 0,
+        replies: int = 0,
+        views: int = 0,
+        url: str = "",
+        id: str = "",
+        is_reply: bool = False,
+        is_retweet: bool = False,
+        is_quote: bool = False,
+        is_pin: bool = False,
+        media: Tuple = (),
+        hashtags: Tuple = (),
+        mentions: Tuple = (),
+    ):
+        self.text = text
+        self.author = author
+        self.author_name = author_name
+        self.created_at = created_at
+        self.likes = likes
+        self.retweets = retweets
+        self.replies = replies
+        self.views = views
+        self.url = url
+        self.id = id
+        self.is_reply = is_reply
+        self.is_retweet = is_retweet
+        self.is_quote = is_quote
+        self.is_pin = is_pin
+        self.media = tuple(media or ())
+        self.hashtags = tuple(hashtags or ())
+        self.mentions = tuple(mentions or ())
+
+    @classmethod
+    def from_api(cls, tweet: Dict) -> "Tweet":
+        """
+        从 Apify 原始响应构建推文（纯函数）
+
+        Args:
+            tweet: actor 数据集中的一条原始记录
+
+        Returns:
+            推文记录
+        """
+        # 基于实际API响应格式提取字段
+        author = tweet.get("author", {})
+        if isinstance(author, dict):
+            author_username = author.get("userName", "")
+            author_name = author.get("name", "") or author.get("displayName", "")
+        else:
+            author_username = tweet.get("userName", "")
+            author_name = tweet.get("name", "")
+
+        # 处理媒体内容
+        media_list = tweet.get("media", [])
+        if not isinstance(media_list, list):
+            media_list = []
+
+        # 提取照片URL
+        photos = tweet.get("photos", [])
+        if isinstance(photos, list):
+            media_urls = [
+                photo.get("url", "") if isinstance(photo, dict) else str(photo) for photo in photos
+            ]
+        else:
+            media_urls = [
+                media.get("url", "") if isinstance(media, dict) else str(media)
+                for media in media_list
+            ]
+
+        return cls(
+            text=tweet.get("text", "") or tweet.get("fullText", ""),
+            author=author_username,
+            author_name=author_name,
+            created_at=tweet.get("createdAt", ""),
+            likes=tweet.get("likeCount", 0),
+            retweets=tweet.get("retweetCount", 0),
+            replies=tweet.get("replyCount", 0),
+            views=tweet.get("viewCount", 0),
+            url=tweet.get("url", "") or tweet.get("twitterUrl", ""),
+            id=tweet.get("id", ""),
+            is_reply=tweet.get("isReply", False) or bool(tweet.get("inReplyToId")),
+            is_retweet=tweet.get("isRetweet", False) or bool(tweet.get("retweetedStatusId")),
+            is_quote=tweet.get("isQuote", False),
+            is_pin=tweet.get("isPin", False),
+            media=media_urls,
+            hashtags=tweet.get("hashtags", []) or [],
+            mentions=tweet.get("mentions", []) or [],
+        )
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "Tweet":
+        """从 to_dict 的输出（或任意包含部分字段的字典）构建推文，未知字段被忽略"""
+        if isinstance(data, cls):
+            return data
+        return cls(**{key: data[key] for key in TWEET_FIELDS if key in data})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典（只在 JSON/CSV 等输出边界使用）"""
+        data = {field: getattr(self, field) for field in TWEET_FIELDS}
+        data["media"] = list(self.media)
+        data["hashtags"] = list(self.hashtags)
+        data["mentions"] = list(self.mentions)
+        return data
+
+    @property
+    def has_media(self) -> bool:
+        """是否包含媒体"""
+        return len(self.media) > 0
+
+    @property
+    def engagement_rate(self) -> float:
+        """互动率：(点赞 + 转发 + 回复) / 浏览量"""
+        return (self.likes + self.retweets + self.replies) / max(self.views or 0, 1)
+
+    # ---- 兼容字典式访问 ----
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _KEY_SET:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """与 dict.get 相同的语义"""
+        if key in _KEY_SET:
+            return getattr(self, key)
+        return default
+
+    def __contains__(self, key: object) -> bool:
+        return key in _FIELD_SET
+
+    def keys(self) -> Tuple[str, ...]:
+        """字段名列表（使 dict(tweet) 和 csv.DictWriter 可以直接使用推文）"""
+        return TWEET_FIELDS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(TWEET_FIELDS)
+
+    def __len__(self) -> int:
+        return len(TWEET_FIELDS)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Tweet):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in TWEET_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"Tweet(id={self.id!r}, author={self.author!r}, text={self.text[:30]!r})"
+
+
+def as_tweet(tweet: Mapping) -> Tweet:
+    """把字典或 Tweet 统一为 Tweet"""
+    return tweet if isinstance(tweet, Tweet) else Tweet.from_dict(tweet)
+
+
+def tweet_to_dict(tweet: Mapping) -> Dict[str, Any]:
+    """把 Tweet 或字典统一为字典（输出边界使用）"""
+    return tweet.to_dict() if isinstance(tweet, Tweet) else tweet
@@ -0,0 +1,189 @@
+"""
+列式推文批次
+把一批推文的数值指标存为 NumPy 数组，统计计算一次向量化完成，不再反复遍历推文列表
+"""
+
+from itertools import chain
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+import numpy as np
+
+from .tweet import Tweet, parse_created_at
+
+# 列名 -> dtype，顺序与 _row 返回的元组一致
+_COLUMNS: Tuple[Tuple[str, type], ...] = (
+    ("likes", np.int64),
+    ("retweets", np.int64),
+    ("replies", np.int64),
+    ("views", np.int64),
+    ("text_length", np.int64),
+    ("hashtag_count", np.int64),
+    ("mention_count", np.int64),
+    ("has_media", np.bool_),
+    ("is_reply", np.bool_),
+    ("is_retweet", np.bool_),
+)
+
+
+def _row(tweet: Mapping) -> Tuple:
+    """提取一条推文的数值指标（字典推文兼容旧的 v1 字段名）"""
+    if isinstance(tweet, Tweet):
+        return (
+            tweet.likes or 0,
+            tweet.retweets or 0,
+            tweet.replies or 0,
+            tweet.views or 0,
+            len(tweet.text or ""),
+            len(tweet.hashtags),
+            len(tweet.mentions),
+            bool(tweet.media),
+            bool(tweet.is_reply),
+            bool(tweet.is_retweet),
+        )
+    return (
+        tweet.get("likes", tweet.get("favorite_count", 0)) or 0,
+        tweet.get("retweets", tweet.get("retweet_count", 0)) or 0,
+        tweet.get("replies", tweet.get("reply_count", 0)) or 0,
+        tweet.get("views", 0) or 0,
+        len(tweet.get("text", "") or ""),
+        len(tweet.get("hashtags") or ()),
+        len(tweet.get("mentions") or ()),
+        bool(tweet.get("has_media", bool(tweet.get("media")))),
+        bool(tweet.get("is_reply", False)),
+        bool(tweet.get("is_retweet", False)),
+    )
+
+
+def _to_timestamp(created_at: str) -> float:
+    parsed = parse_created_at(created_at)
+    return parsed.timestamp() if parsed else np.nan
+
+
+class TweetBatch:
+    """
+    推文指标的列式存储
+
+    构建时一次性提取全部指标；之后 likes / views / text_length 等列都是 NumPy 数组，
+    calculate_tweet_stats、calculate_stats_summary 和 analyze_tweet_patterns 会直接使用这些列。
+    时间戳列在首次访问时才解析。
+    """
+
+    __slots__ = ("_columns", "_created_at", "_timestamps", "_size")
+
+    def __init__(self, columns: Dict[str, np.ndarray], created_at: List[str]):
+        self._columns = columns
+        self._created_at = created_at
+        self._timestamps = None
+        self._size = len(created_at)
+
+    @classmethod
+    def from_tweets(cls, tweets: Iterable[Mapping]) -> "TweetBatch":
+        """
+        从推文（Tweet 或字典）构建批次
+
+        Args:
+            tweets: 推文列表或生成器
+
+        Returns:
+            推文批次
+        """
+        if isinstance(tweets, TweetBatch):
+            return tweets
+
+        if not isinstance(tweets, list):
+            tweets = list(tweets)
+
+        # 所有指标先展平成一个整数序列，一次性写入数组
+        matrix = np.fromiter(
+            chain.from_iterable(map(_row, tweets)),
+            dtype=np.int64,
+            count=len(tweets) * len(_COLUMNS),
+        ).reshape(len(tweets), len(_COLUMNS))
+        created_at = [tweet.get("created_at", "") or "" for tweet in tweets]
+        columns = {
+            name: matrix[:, index].astype(dtype, copy=False)
+            for index, (name, dtype) in enumerate(_COLUMNS)
+        }
+        return cls(columns, created_at)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """发布时间（Unix 秒，无法解析的为 NaN）"""
+        if self._timestamps is None:
+            self._timestamps = np.fromiter(
+                (_to_timestamp(value) for value in self._created_at),
+                dtype=np.float64,
+                count=self._size,
+            )
+        return self._timestamps
+
+    @property
+    def engagement_rate(self) -> np.ndarray:
+        """每条推文的互动率：(点赞 + 转发 + 回复) / 浏览量"""
+        engagement = self["likes"] + self["retweets"] + self["replies"]
+        return engagement / np.maximum(self["views"], 1)
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        按名称获取一列
+
+        除存储的列外还支持 engagement_rate 和 timestamp
+
+        Raises:
+            KeyError: 列不存在
+        """
+        if name in self._columns:
+            return self._columns[name]
+        if name == "engagement_rate":
+            return self.engagement_rate
+        if name == "timestamp":
+            return self.timestamps
+        raise KeyError(f"Unknown column: {name}")
+
+    __getitem__ = column
+
+    def column_names(self) -> List[str]:
+        """可用的列名"""
+        return [name for name, _ in _COLUMNS] + ["engagement_rate", "timestamp"]
+
+    def rate(self, name: str) -> float:
+        """布尔列为真（或计数列非零）的比例"""
+        if not self._size:
+            return 0.0
+        return float(np.count_nonzero(self.column(name))) / self._size
+
+    def mean(self, name: str) -> float:
+        """某一列的平均值"""
+        if not self._size:
+            return 0.0
+        return float(self.column(name).mean())
+
+    def group_totals(self, group_key: str, value_key: str) -> Dict:
+        """
+        按列分组统计数量和总和
+
+        Args:
+            group_key: 分组列
+            value_key: 求和列
+
+        Returns:
+            {分组值: (数量, 总和)}
+        """
+        values = self.column(value_key)
+        keys, inverse = np.unique(self.column(group_key), return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(keys))
+        sums = np.bincount(inverse, weights=values, minlength=len(keys))
+        if np.issubdtype(values.dtype, np.integer) or values.dtype == np.bool_:
+            sums = sums.astype(np.int64)
+        return {
+            key.item(): (int(count), group_sum.item())
+            for key, count, group_sum in zip(keys, counts, sums)
+        }
+
+
+def as_batch(tweets: Iterable[Mapping]) -> TweetBatch:
+    """把推文列表统一为 TweetBatch（已是批次时直接返回）"""
+    return TweetBatch.from_tweets(tweets)
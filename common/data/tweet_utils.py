@@ -148,9 +148,9 @@ def simplify_tweet(tweet: Dict) -> Dict:
         "created_at": tweet.get("created_at", ""),
         "reply_to": tweet.get("in_reply_to_screen_name", ""),
         "metrics": {
-            "likes": tweet.get("favorite_count", 0),
-            "retweets": tweet.get("retweet_count", 0),
-            "replies": tweet.get("reply_count", 0),
+            "likes": tweet.get("favorite_count", tweet.get("likes", 0)),
+            "retweets": tweet.get("retweet_count", tweet.get("retweets", 0)),
+            "replies": tweet.get("reply_count", tweet.get("replies", 0)),
         },
     }
 
@@ -225,10 +225,23 @@ def calculate_tweet_stats(tweets: List[Dict]) -> Dict:
             "total_replies": 0,
         }
 
-    total_length = sum(len(tweet.get("text", "")) for tweet in tweets)
-    total_likes = sum(tweet.get("favorite_count", 0) for tweet in tweets)
-    total_retweets = sum(tweet.get("retweet_count", 0) for tweet in tweets)
-    total_replies = sum(tweet.get("reply_count", 0) for tweet in tweets)
+    # TweetBatch：直接对列求和
+    if hasattr(tweets, "column"):
+        return {
+            "total": len(tweets),
+            "avg_length": int(tweets.column("text_length").sum()) // len(tweets),
+            "total_likes": int(tweets.column("likes").sum()),
+            "total_retweets": int(tweets.column("retweets").sum()),
+            "total_replies": int(tweets.column("replies").sum()),
+        }
+
+    # 与 TweetBatch 读取相同的字段：likes / retweets / replies，旧的 v1 字段名作为回退
+    total_length = sum(len(tweet.get("text", "") or "") for tweet in tweets)
+    total_likes = sum(tweet.get("likes", tweet.get("favorite_count", 0)) or 0 for tweet in tweets)
+    total_retweets = sum(
+        tweet.get("retweets", tweet.get("retweet_count", 0)) or 0 for tweet in tweets
+    )
+    total_replies = sum(tweet.get("replies", tweet.get("reply_count", 0)) or 0 for tweet in tweets)
 
     return {
         "total": len(tweets),
@@ -10,6 +10,8 @@ from .calculations import (
     calculate_stats_summary,
     format_percentage_display,
 )
+from .disk_cache import DiskCache, make_cache_key
+from .json_repair import loads_tolerant, repair_json
 from .path_utils import add_project_to_path, get_project_root
 from .rate_limiter import RateLimiter, get_rate_limiter
 
@@ -21,6 +23,12 @@ __all__ = [
     "calculate_percentage_bar",
     "calculate_stats_summary",
     "format_percentage_display",
+    # disk_cache
+    "DiskCache",
+    "make_cache_key",
+    # json_repair
+    "repair_json",
+    "loads_tolerant",
     # path_utils
     "add_project_to_path",
     "get_project_root",
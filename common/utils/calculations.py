@@ -178,6 +178,10 @@ def calculate_stats_summary(
             "groups": {}
         }
     
+    # 列式数据（如 TweetBatch）：向量化计算
+    if hasattr(data, "column"):
+        return _columnar_stats_summary(data, value_key, group_key)
+
     values = [item.get(value_key, 0) for item in data]
     total_sum = sum(values)
     
@@ -210,6 +214,32 @@ def calculate_stats_summary(
     return summary
 
 
+def _columnar_stats_summary(data, value_key: str, group_key: str = None) -> Dict[str, any]:
+    """calculate_stats_summary 的列式实现，data 需提供 column() 和 group_totals()"""
+    values = data.column(value_key)
+    total_sum = values.sum().item()
+
+    summary = {
+        "total": len(data),
+        "sum": total_sum,
+        "average": total_sum / len(data),
+        "min": values.min().item(),
+        "max": values.max().item(),
+        "groups": {}
+    }
+
+    if group_key:
+        for group, (count, group_sum) in data.group_totals(group_key, value_key).items():
+            summary["groups"][group] = {
+                "count": count,
+                "sum": group_sum,
+                "average": group_sum / count if count else 0,
+                "percentage": calculate_percentage(count, len(data))
+            }
+
+    return summary
+
+
 def format_percentage_display(
     percentage: float,
     include_bar: bool = True,
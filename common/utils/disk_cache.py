@@ -0,0 +1,211 @@
+"""
+磁盘缓存
+基于目录的键值缓存，支持 TTL 过期、按总大小的 LRU 淘汰和命中统计
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, IO, Iterator, Optional
+
+
+def make_cache_key(*parts: Any) -> str:
+    """
+    根据任意可 JSON 序列化的数据生成规范化的缓存键
+
+    字典按键排序后再哈希，因此字段顺序不同的相同输入得到相同的键
+    """
+    canonical = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    目录式磁盘缓存
+
+    - 每个键对应一个文件，写入时先写临时文件再原子替换
+    - 文件修改时间表示写入时间（用于 TTL），访问时间表示最近使用时间（用于 LRU）
+    - 总大小超过上限时按最近使用时间从旧到新淘汰
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        ttl_seconds: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        suffix: str = "",
+    ):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 缓存目录
+            ttl_seconds: 过期时间（秒），None 表示永不过期
+            max_bytes: 缓存目录总大小上限，None 表示不限制
+            suffix: 缓存文件扩展名
+        """
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "writes": 0, "evictions": 0}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.stats[name] += amount
+
+    def path_for(self, key: str) -> str:
+        """返回键对应的缓存文件路径（不保证存在）"""
+        return os.path.join(self.cache_dir, f"{key}{self.suffix}")
+
+    def get_path(self, key: str) -> Optional[str]:
+        """
+        查找未过期的缓存文件
+
+        命中时刷新访问时间；过期的文件会被删除
+
+        Returns:
+            缓存文件路径，未命中时返回 None
+        """
+        path = self.path_for(key)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            self._count("misses")
+            return None
+
+        now = time.time()
+        if self.ttl_seconds is not None and now - mtime > self.ttl_seconds:
+            self._remove(path)
+            self._count("expired")
+            self._count("misses")
+            return None
+
+        try:
+            # 只更新访问时间，保留写入时间供 TTL 判断
+            os.utime(path, (now, mtime))
+        except OSError:
+            pass
+        self._count("hits")
+        return path
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        """读取缓存内容，未命中时返回 None"""
+        path = self.get_path(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put_bytes(self, key: str, data: bytes) -> str:
+        """写入缓存内容并返回缓存文件路径"""
+        with self.open_writer(key, mode="wb") as f:
+            f.write(data)
+        return self.path_for(key)
+
+    def put_file(self, key: str, src_path: str) -> str:
+        """把已有文件复制进缓存并返回缓存文件路径"""
+        with open(src_path, "rb") as src, self.open_writer(key, mode="wb") as dst:
+            while True:
+                chunk = src.read(1024 * 1024)
+                if not chunk:
+                    break
+                dst.write(chunk)
+        return self.path_for(key)
+
+    @contextmanager
+    def open_writer(self, key: str, mode: str = "w", **kwargs) -> Iterator[IO]:
+        """
+        以流式方式写入缓存
+
+        with 块正常结束时提交；块内抛出异常（包括生成器被提前关闭）时丢弃已写入的内容
+
+        Args:
+            key: 缓存键
+            mode: 文件打开模式（"w" 或 "wb"）
+            **kwargs: 传给 open 的其他参数，如 encoding
+        """
+        if "b" not in mode:
+            kwargs.setdefault("encoding", "utf-8")
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        committed = False
+        try:
+            with open(tmp_path, mode, **kwargs) as f:
+                yield f
+            os.replace(tmp_path, self.path_for(key))
+            committed = True
+            self._count("writes")
+        finally:
+            if not committed:
+                self._remove(tmp_path)
+
+        self.evict()
+
+    def discard(self, key: str):
+        """删除指定缓存"""
+        self._remove(self.path_for(key))
+
+    def evict(self) -> int:
+        """
+        按 LRU 策略淘汰缓存，使总大小不超过上限
+
+        Returns:
+            淘汰的文件数量
+        """
+        if self.max_bytes is None:
+            return 0
+
+        entries = []
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if not entry.is_file() or entry.name.endswith(".tmp"):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            entries.append((st.st_atime, st.st_size, entry.path))
+            total += st.st_size
+
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+            evicted += 1
+
+        if evicted:
+            self._count("evictions", evicted)
+        return evicted
+
+    def clear(self) -> int:
+        """清空缓存目录，返回删除的文件数量"""
+        removed = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file():
+                self._remove(entry.path)
+                removed += 1
+        return removed
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取命中统计"""
+        with self._lock:
+            return dict(self.stats)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,298 @@
+"""
+容错 JSON 解析
+一次线性扫描把模型输出（如 Gemini 的分析结果）的不规范 JSON 改写为合法 JSON，然后交给 json.loads
+
+可以处理：
+- 字符串中未转义的换行和控制字符
+- 字符串中未转义的引号（根据引号后面的字符判断是否为字符串结尾）
+- 缺少的逗号和多余的逗号
+- 无效的转义序列
+- JSON 前后的说明文字和 ``` 代码块标记
+- 被截断的输出（自动补齐未闭合的字符串和括号）
+- Python 风格的 True / False / None
+"""
+
+import json
+import re
+import sys
+import time
+from typing import Any, List
+
+# 字符串内部需要特殊处理的字符
+_STRING_SPECIAL = re.compile(r'["\\\x00-\x1f]')
+# 数字、字面量或不带引号的单词
+_BAREWORD = re.compile(r"[A-Za-z0-9_+\-.]+")
+_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?$")
+_LITERALS = {
+    "true": "true", "false": "false", "null": "null",
+    "True": "true", "False": "false", "None": "null",
+}
+_VALID_ESCAPES = set('"\\/bfnrt')
+_CONTROL_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t", "\b": "\\b", "\f": "\\f"}
+_WHITESPACE = " \t\r\n"
+
+# 容器状态：等待键、等待冒号、等待值、值之后（等待逗号或结束）
+_KEY, _COLON, _VALUE, _AFTER = range(4)
+
+
+class _Frame:
+    __slots__ = ("closer", "state", "count")
+
+    def __init__(self, closer: str):
+        self.closer = closer
+        self.state = _KEY if closer == "}" else _VALUE
+        self.count = 0
+
+
+class _Repairer:
+    """单次扫描的修复器：逗号在下一个元素开始时才输出，因此多余的逗号自然被丢弃"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+        self.out: List[str] = []
+        self.stack: List[_Frame] = []
+
+    def run(self) -> str:
+        text = self.text
+        start = min((i for i in (text.find("{"), text.find("[")) if i != -1), default=-1)
+        if start == -1:
+            raise ValueError("响应中未找到JSON数据")
+        self.pos = start
+        length = len(text)
+
+        while self.pos < length:
+            char = text[self.pos]
+            if char in _WHITESPACE:
+                self.pos += 1
+            elif char in "{[":
+                self._begin_value()
+                self.out.append(char)
+                self.stack.append(_Frame("}" if char == "{" else "]"))
+                self.pos += 1
+            elif char in "}]":
+                self._close()
+                self.pos += 1
+                if not self.stack:
+                    break
+            elif char == ",":
+                frame = self.stack[-1]
+                if frame.state == _AFTER:
+                    frame.state = _KEY if frame.closer == "}" else _VALUE
+                self.pos += 1
+            elif char == ":":
+                frame = self.stack[-1]
+                if frame.state == _COLON:
+                    self.out.append(":")
+                    frame.state = _VALUE
+                self.pos += 1
+            elif char == '"':
+                self._string()
+            else:
+                match = _BAREWORD.match(text, self.pos)
+                if match:
+                    self._bareword(match.group())
+                    self.pos = match.end()
+                else:
+                    # 无法识别的字符（例如代码块标记中的反引号）直接跳过
+                    self.pos += 1
+
+        # 输出被截断：补齐未完成的值和括号
+        while self.stack:
+            self._close()
+        return "".join(self.out)
+
+    def _is_key_position(self) -> bool:
+        frame = self.stack[-1]
+        return frame.closer == "}" and frame.state in (_KEY, _AFTER)
+
+    def _begin_key(self):
+        frame = self.stack[-1]
+        if frame.count:
+            self.out.append(",")
+        frame.count += 1
+        frame.state = _COLON
+
+    def _begin_value(self):
+        """开始输出一个值：按需补上逗号或冒号"""
+        if not self.stack:
+            return
+        frame = self.stack[-1]
+        if frame.closer == "}":
+            if frame.state in (_KEY, _AFTER):
+                # 对象中出现没有键的值，补一个占位键
+                self._begin_key()
+                self.out.append('""')
+            if frame.state == _COLON:
+                self.out.append(":")
+        elif frame.count:
+            self.out.append(",")
+        if frame.closer == "]":
+            frame.count += 1
+        frame.state = _AFTER
+
+    def _close(self):
+        frame = self.stack.pop()
+        if frame.state == _COLON:
+            self.out.append(":null")
+        elif frame.state == _VALUE and frame.closer == "}" and frame.count:
+            self.out.append("null")
+        self.out.append(frame.closer)
+
+    def _bareword(self, word: str):
+        if self._is_key_position():
+            self._begin_key()
+            self.out.append(json.dumps(word))
+            return
+        self._begin_value()
+        if word in _LITERALS:
+            self.out.append(_LITERALS[word])
+        elif _NUMBER.match(word):
+            self.out.append(word)
+        else:
+            self.out.append(json.dumps(word, ensure_ascii=False))
+
+    def _string(self):
+        """读取一个字符串（self.pos 指向开头的引号），修复内容后输出"""
+        is_key = self._is_key_position()
+        if is_key:
+            self._begin_key()
+        else:
+            self._begin_value()
+
+        text = self.text
+        out = self.out
+        out.append('"')
+        pos = self.pos + 1
+        while True:
+            match = _STRING_SPECIAL.search(text, pos)
+            if match is None:
+                # 截断在字符串中间
+                out.append(text[pos:])
+                pos = len(text)
+                break
+            index = match.start()
+            out.append(text[pos:index])
+            char = text[index]
+            if char == '"':
+                if self._closes_string(index, is_key):
+                    pos = index + 1
+                    break
+                out.append('\\"')
+                pos = index + 1
+            elif char == "\\":
+                pos = self._escape(index)
+            else:
+                out.append(_CONTROL_ESCAPES.get(char) or f"\\u{ord(char):04x}")
+                pos = index + 1
+        out.append('"')
+        self.pos = pos
+
+    def _next_char(self, index: int) -> str:
+        """index 处开始的第一个非空白字符，到达末尾时返回空字符串"""
+        text = self.text
+        while index < len(text) and text[index] in _WHITESPACE:
+            index += 1
+        return text[index : index + 1]
+
+    def _closes_string(self, index: int, is_key: bool) -> bool:
+        """根据引号后面的字符判断它是字符串结尾还是内容中的引号"""
+        following = self._next_char(index + 1)
+        if not following:
+            return True
+        if is_key:
+            return following in ":,}]"
+        if following == ",":
+            # 逗号后面应当是下一个键或值，否则逗号属于字符串内容（例如 "他说"好的"，然后"）
+            after_comma = self._next_char(self.text.index(",", index) + 1)
+            return not after_comma or after_comma in '"{}[]-0123456789tfnTFN'
+        if following == '"':
+            # 换行后紧跟另一个字符串，说明缺少逗号；同一行的 "" 则是内容中的引号加上真正的结尾
+            return "\n" in self.text[index + 1 : self.text.index('"', index + 1)]
+        return following in "}]"
+
+    def _escape(self, index: int) -> int:
+        text = self.text
+        following = text[index + 1 : index + 2]
+        if following in _VALID_ESCAPES and following:
+            self.out.append(text[index : index + 2])
+            return index + 2
+        if following == "'":
+            self.out.append("'")
+            return index + 2
+        if following == "u" and re.match(r"[0-9a-fA-F]{4}", text[index + 2 : index + 6]):
+            self.out.append(text[index : index + 6])
+            return index + 6
+        # 无效转义：保留反斜杠本身
+        self.out.append("\\\\")
+        return index + 1
+
+
+def repair_json(text: str) -> str:
+    """
+    把不规范的 JSON 文本改写为合法 JSON
+
+    Args:
+        text: 模型输出（可以包含 JSON 前后的说明文字）
+
+    Returns:
+        合法的 JSON 文本
+
+    Raises:
+        ValueError: 文本中没有 JSON 对象或数组
+    """
+    return _Repairer(text).run()
+
+
+def loads_tolerant(text: str) -> Any:
+    """
+    解析 JSON，失败时先修复再解析
+
+    Raises:
+        ValueError: 修复后仍无法解析
+    """
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return json.loads(repair_json(text))
+
+
+def benchmark(paths: List[str]) -> dict:
+    """
+    统计一组样本的修复成功率和平均耗时
+
+    Args:
+        paths: 样本文件路径
+
+    Returns:
+        {"total", "succeeded", "failed": [失败的文件], "avg_ms"}
+    """
+    failed = []
+    elapsed = 0.0
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        started = time.perf_counter()
+        try:
+            json.loads(repair_json(text))
+        except ValueError:
+            failed.append(path)
+        elapsed += time.perf_counter() - started
+    return {
+        "total": len(paths),
+        "succeeded": len(paths) - len(failed),
+        "failed": failed,
+        "avg_ms": elapsed * 1000 / len(paths) if paths else 0.0,
+    }
+
+
+def main(paths: List[str]):
+    """打印样本的修复成功率和平均耗时（make bench-json）"""
+    result = benchmark(paths)
+    print(f"成功 {result['succeeded']}/{result['total']}，平均 {result['avg_ms']:.3f} ms")
+    for path in result["failed"]:
+        print(f"  ✗ {path}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -2,6 +2,7 @@
 智能 API 限流处理器
 """
 
+import threading
 import time
 from collections import deque
 from datetime import datetime, timedelta
@@ -16,6 +17,7 @@ class RateLimiter:
     - 滑动窗口限流
     - 自适应退避
     - 多级限流策略
+    - 多线程共享（内部加锁）
     """
     
     def __init__(
@@ -44,7 +46,10 @@ class RateLimiter:
         # 退避状态
         self.backoff_until: Optional[datetime] = None
         self.consecutive_failures = 0
-        
+
+        # 并发抓取时多个线程共享同一个限流器
+        self._lock = threading.RLock()
+
     def can_make_request(self) -> tuple[bool, Optional[float]]:
         """
         检查是否可以发起请求
@@ -52,30 +57,31 @@ class RateLimiter:
         Returns:
             (是否可以请求, 需要等待的秒数)
         """
-        now = datetime.now()
-        
-        # 检查是否在退避期
-        if self.backoff_until and now < self.backoff_until:
-            wait_seconds = (self.backoff_until - now).total_seconds()
-            return False, wait_seconds
-        
-        # 清理过期的请求记录
-        self._cleanup_old_requests()
-        
-        # 检查各级限流
-        for period_name, (limit, window) in self.limits.items():
-            count = self._count_requests_in_window(window)
-            if count >= limit:
-                # 计算需要等待的时间
-                if self.request_history:
-                    oldest_in_window = self._get_oldest_request_in_window(window)
-                    if oldest_in_window:
-                        wait_until = oldest_in_window + window
-                        wait_seconds = (wait_until - now).total_seconds()
-                        return False, max(0, wait_seconds)
-                return False, window.total_seconds()
-        
-        return True, None
+        with self._lock:
+            now = datetime.now()
+
+            # 检查是否在退避期
+            if self.backoff_until and now < self.backoff_until:
+                wait_seconds = (self.backoff_until - now).total_seconds()
+                return False, wait_seconds
+
+            # 清理过期的请求记录
+            self._cleanup_old_requests()
+
+            # 检查各级限流
+            for period_name, (limit, window) in self.limits.items():
+                count = self._count_requests_in_window(window)
+                if count >= limit:
+                    # 计算需要等待的时间
+                    if self.request_history:
+                        oldest_in_window = self._get_oldest_request_in_window(window)
+                        if oldest_in_window:
+                            wait_until = oldest_in_window + window
+                            wait_seconds = (wait_until - now).total_seconds()
+                            return False, max(0, wait_seconds)
+                    return False, window.total_seconds()
+
+            return True, None
     
     def record_request(self, success: bool = True):
         """
@@ -84,19 +90,20 @@ class RateLimiter:
         Args:
             success: 请求是否成功
         """
-        now = datetime.now()
-        self.request_history.append(now)
-        
-        if success:
-            # 重置连续失败计数
-            self.consecutive_failures = 0
-            self.backoff_until = None
-        else:
-            # 增加失败计数
-            self.consecutive_failures += 1
-            # 计算退避时间（指数退避）
-            backoff_seconds = min(300, 2 ** self.consecutive_failures)  # 最多5分钟
-            self.backoff_until = now + timedelta(seconds=backoff_seconds)
+        with self._lock:
+            now = datetime.now()
+            self.request_history.append(now)
+
+            if success:
+                # 重置连续失败计数
+                self.consecutive_failures = 0
+                self.backoff_until = None
+            else:
+                # 增加失败计数
+                self.consecutive_failures += 1
+                # 计算退避时间（指数退避）
+                backoff_seconds = min(300, 2 ** self.consecutive_failures)  # 最多5分钟
+                self.backoff_until = now + timedelta(seconds=backoff_seconds)
     
     def record_rate_limit_hit(self, retry_after: Optional[int] = None):
         """
@@ -105,16 +112,17 @@ class RateLimiter:
         Args:
             retry_after: 服务器建议的重试时间（秒）
         """
-        now = datetime.now()
-        self.consecutive_failures += 1
-        
-        if retry_after:
-            # 使用服务器建议的时间
-            self.backoff_until = now + timedelta(seconds=retry_after)
-        else:
-            # 使用自适应退避
-            backoff_seconds = min(600, 30 * self.consecutive_failures)  # 最多10分钟
-            self.backoff_until = now + timedelta(seconds=backoff_seconds)
+        with self._lock:
+            now = datetime.now()
+            self.consecutive_failures += 1
+
+            if retry_after:
+                # 使用服务器建议的时间
+                self.backoff_until = now + timedelta(seconds=retry_after)
+            else:
+                # 使用自适应退避
+                backoff_seconds = min(600, 30 * self.consecutive_failures)  # 最多10分钟
+                self.backoff_until = now + timedelta(seconds=backoff_seconds)
     
     def _cleanup_old_requests(self):
         """清理过期的请求记录"""
@@ -149,30 +157,32 @@ class RateLimiter:
         Returns:
             包含各级限流使用情况的字典
         """
-        self._cleanup_old_requests()
-        stats = {}
-        
-        for period_name, (limit, window) in self.limits.items():
-            count = self._count_requests_in_window(window)
-            stats[period_name] = {
-                "used": count,
-                "limit": limit,
-                "percentage": (count / limit * 100) if limit > 0 else 0,
-                "remaining": max(0, limit - count)
-            }
-        
-        if self.backoff_until:
-            now = datetime.now()
-            if now < self.backoff_until:
-                stats["backoff_seconds"] = (self.backoff_until - now).total_seconds()
-            else:
-                stats["backoff_seconds"] = 0
-        
-        return stats
+        with self._lock:
+            self._cleanup_old_requests()
+            stats = {}
+
+            for period_name, (limit, window) in self.limits.items():
+                count = self._count_requests_in_window(window)
+                stats[period_name] = {
+                    "used": count,
+                    "limit": limit,
+                    "percentage": (count / limit * 100) if limit > 0 else 0,
+                    "remaining": max(0, limit - count)
+                }
+
+            if self.backoff_until:
+                now = datetime.now()
+                if now < self.backoff_until:
+                    stats["backoff_seconds"] = (self.backoff_until - now).total_seconds()
+                else:
+                    stats["backoff_seconds"] = 0
+
+            return stats
 
 
 # 全局限流器实例（可选）
 _global_rate_limiters: Dict[str, RateLimiter] = {}
+_global_rate_limiters_lock = threading.Lock()
 
 
 def get_rate_limiter(
@@ -193,11 +203,12 @@ def get_rate_limiter(
     Returns:
         限流器实例
     """
-    if service_name not in _global_rate_limiters:
-        _global_rate_limiters[service_name] = RateLimiter(
-            max_requests_per_minute=max_requests_per_minute,
-            max_requests_per_hour=max_requests_per_hour,
-            max_requests_per_day=max_requests_per_day
-        )
+    with _global_rate_limiters_lock:
+        if service_name not in _global_rate_limiters:
+            _global_rate_limiters[service_name] = RateLimiter(
+                max_requests_per_minute=max_requests_per_minute,
+                max_requests_per_hour=max_requests_per_hour,
+                max_requests_per_day=max_requests_per_day
+            )
     
     return _global_rate_limiters[service_name]
\ No newline at end of file
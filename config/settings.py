@@ -31,6 +31,8 @@ class ScraperConfig:
     retry_attempts: int = 3
     retry_delay: float = 1.0
     backoff_factor: float = 2.0
+    # 是否启用增量抓取（基于每个用户的高水位只抓取新推文）
+    incremental: bool = True
 
 
 @dataclass
@@ -42,6 +44,18 @@ class AnalyzerConfig:
     min_tweets_required: int = 10
     max_tweet_length: int = 200
     analysis_timeout: int = 30
+    # 推文收集方式：split（原创/回复分别搜索）或 single_pass（一次搜索后本地分类）
+    collection_mode: str = "split"
+    # 推文样本和提示词不变时复用之前的分析结果
+    result_cache_enabled: bool = True
+    result_cache_ttl_hours: int = 168
+    # 批量分析时同时进行的 Gemini 请求数（不超过每分钟请求上限）
+    analysis_concurrency: int = 4
+    # 请求 Gemini 按 JSON Schema 输出（关闭时使用正则提取 + 修复的旧解析方式）
+    structured_output: bool = True
+    # 把静态系统指令放入 Gemini 服务端上下文缓存，每次请求只发送推文样本
+    context_cache_enabled: bool = False
+    context_cache_ttl_minutes: int = 60
 
 
 @dataclass
@@ -64,11 +78,14 @@ class StorageConfig:
     reports_dir: Path
     images_dir: Path
     logs_dir: Path
+    database_path: Path = None
     
     def __post_init__(self):
         """确保目录存在"""
         for dir_path in [self.data_dir, self.reports_dir, self.images_dir, self.logs_dir]:
             dir_path.mkdir(parents=True, exist_ok=True)
+        if self.database_path is None:
+            self.database_path = self.data_dir / "mbti.db"
 
 
 @dataclass
@@ -84,6 +101,30 @@ class DisplayConfig:
     mbti_bar_empty_char: str = "░"
 
 
+@dataclass
+class RenderConfig:
+    """报告截图配置"""
+    # 常驻浏览器数量及每个浏览器可复用的页面数
+    browser_pool_size: int = 2
+    pages_per_browser: int = 2
+    # 每个浏览器截图多少次后重启
+    recycle_after_pages: int = 200
+    # 截图方式：browser（Chromium 截图）或 pillow（不启动浏览器直接绘制）
+    renderer: str = "browser"
+    # pillow 渲染使用的等宽字体与中文字体，留空时自动查找系统字体
+    font_path: str = ""
+    cjk_font_path: str = ""
+    # 图片输出：格式 png/jpeg/webp、质量、缩放倍数、PNG 调色板颜色数（0 不量化）、缩略图宽度（0 不生成）
+    image_format: str = "png"
+    image_quality: int = 85
+    image_scale: int = 2
+    palette_colors: int = 0
+    thumbnail_width: int = 0
+    # 按报告内容缓存生成的图片（images/.cache），超过上限按最近使用淘汰
+    image_cache_enabled: bool = True
+    image_cache_max_mb: int = 200
+
+
 @dataclass
 class ValidationConfig:
     """验证配置"""
@@ -119,7 +160,8 @@ class Config:
             timeout_seconds=int(os.getenv("TIMEOUT_SECONDS", "120")),
             retry_attempts=int(os.getenv("RETRY_ATTEMPTS", "3")),
             retry_delay=float(os.getenv("RETRY_DELAY", "1.0")),
-            backoff_factor=float(os.getenv("BACKOFF_FACTOR", "2.0"))
+            backoff_factor=float(os.getenv("BACKOFF_FACTOR", "2.0")),
+            incremental=os.getenv("INCREMENTAL_SCRAPE", "true").lower() in ("1", "true", "yes")
         )
         
         self.analyzer = AnalyzerConfig(
@@ -128,7 +170,20 @@ class Config:
             reply_tweets_count=int(os.getenv("REPLY_TWEETS_COUNT", "100")),
             min_tweets_required=int(os.getenv("MIN_TWEETS_REQUIRED", "10")),
             max_tweet_length=int(os.getenv("MAX_TWEET_LENGTH", "200")),
-            analysis_timeout=int(os.getenv("ANALYSIS_TIMEOUT", "30"))
+            analysis_timeout=int(os.getenv("ANALYSIS_TIMEOUT", "30")),
+            collection_mode=os.getenv("COLLECTION_MODE", "split"),
+            result_cache_enabled=(
+                os.getenv("ANALYSIS_CACHE", "true").lower() in ("1", "true", "yes")
+            ),
+            result_cache_ttl_hours=int(os.getenv("ANALYSIS_CACHE_TTL_HOURS", "168")),
+            analysis_concurrency=int(os.getenv("ANALYSIS_CONCURRENCY", "4")),
+            structured_output=(
+                os.getenv("GEMINI_STRUCTURED_OUTPUT", "true").lower() in ("1", "true", "yes")
+            ),
+            context_cache_enabled=(
+                os.getenv("GEMINI_CONTEXT_CACHE", "false").lower() in ("1", "true", "yes")
+            ),
+            context_cache_ttl_minutes=int(os.getenv("GEMINI_CONTEXT_CACHE_TTL_MINUTES", "60"))
         )
         
         self.rate_limit = RateLimitConfig(
@@ -144,7 +199,8 @@ class Config:
             data_dir=project_root / "data",
             reports_dir=project_root / "mbti_analyzer" / "reports",
             images_dir=project_root / "mbti_analyzer" / "images",
-            logs_dir=project_root / "logs"
+            logs_dir=project_root / "logs",
+            database_path=Path(os.getenv("DATABASE_PATH", str(project_root / "data" / "mbti.db")))
         )
         
         self.display = DisplayConfig(
@@ -156,6 +212,22 @@ class Config:
             mbti_bar_empty_char=os.getenv("MBTI_BAR_EMPTY_CHAR", "░")
         )
         
+        self.render = RenderConfig(
+            browser_pool_size=int(os.getenv("BROWSER_POOL_SIZE", "2")),
+            pages_per_browser=int(os.getenv("BROWSER_PAGES_PER_BROWSER", "2")),
+            recycle_after_pages=int(os.getenv("BROWSER_RECYCLE_AFTER", "200")),
+            renderer=os.getenv("REPORT_RENDERER", "browser"),
+            font_path=os.getenv("REPORT_FONT_PATH", ""),
+            cjk_font_path=os.getenv("REPORT_CJK_FONT_PATH", ""),
+            image_format=os.getenv("IMAGE_FORMAT", "png"),
+            image_quality=int(os.getenv("IMAGE_QUALITY", "85")),
+            image_scale=int(os.getenv("IMAGE_SCALE", "2")),
+            palette_colors=int(os.getenv("IMAGE_PALETTE_COLORS", "0")),
+            thumbnail_width=int(os.getenv("IMAGE_THUMBNAIL_WIDTH", "0")),
+            image_cache_enabled=os.getenv("IMAGE_CACHE", "true").lower() in ("1", "true", "yes"),
+            image_cache_max_mb=int(os.getenv("IMAGE_CACHE_MAX_MB", "200"))
+        )
+        
         self.validation = ValidationConfig(
             min_username_length=int(os.getenv("MIN_USERNAME_LENGTH", "1")),
             max_username_length=int(os.getenv("MAX_USERNAME_LENGTH", "15")),
@@ -199,6 +271,21 @@ class Config:
         
         if self.rate_limit.max_requests_per_minute <= 0:
             errors.append("max_requests_per_minute 必须大于 0")
+
+        if self.analyzer.analysis_concurrency <= 0:
+            errors.append("analysis_concurrency 必须大于 0")
+
+        if self.analyzer.collection_mode not in ("split", "single_pass"):
+            errors.append("collection_mode 必须是 split 或 single_pass")
+
+        if self.render.browser_pool_size <= 0 or self.render.pages_per_browser <= 0:
+            errors.append("browser_pool_size 和 pages_per_browser 必须大于 0")
+
+        if self.render.renderer not in ("browser", "pillow"):
+            errors.append("renderer 必须是 browser 或 pillow")
+
+        if self.render.image_format not in ("png", "jpeg", "webp"):
+            errors.append("image_format 必须是 png、jpeg 或 webp")
         
         return len(errors) == 0, errors
     
@@ -221,6 +308,7 @@ class Config:
                 "logs_dir": str(self.storage.logs_dir)
             },
             "display": self.display.__dict__,
+            "render": self.render.__dict__,
             "validation": self.validation.__dict__
         }
     
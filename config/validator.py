@@ -184,6 +184,10 @@ TIMEOUT_SECONDS=120
 RETRY_ATTEMPTS=3
 RETRY_DELAY=1.0
 BACKOFF_FACTOR=2.0
+INCREMENTAL_SCRAPE=true
+SCRAPE_CACHE=true
+SCRAPE_CACHE_TTL=900
+SCRAPE_CACHE_MAX_MB=200
 
 # 分析器配置（可选）
 ORIGINAL_TWEETS_COUNT=100
@@ -191,6 +195,7 @@ REPLY_TWEETS_COUNT=100
 MIN_TWEETS_REQUIRED=10
 MAX_TWEET_LENGTH=200
 ANALYSIS_TIMEOUT=30
+COLLECTION_MODE=split
 
 # 限流配置（可选）
 MAX_REQUESTS_PER_MINUTE=60
@@ -199,6 +204,10 @@ MAX_REQUESTS_PER_DAY=10000
 GEMINI_REQUESTS_PER_MINUTE=60
 GEMINI_REQUESTS_PER_DAY=1500
 
+# 存储配置（可选）
+# 是否把抓取的推文写入数据库（分析记录总会写入，供统计使用）
+USE_DATABASE=true
+
 # 显示配置（可选）
 TERMINAL_WIDTH=60
 PROGRESS_BAR_LENGTH=20
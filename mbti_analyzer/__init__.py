@@ -15,19 +15,20 @@ from .report_generator import ReportGenerator
 load_dotenv()
 
 
-def analyze_user_mbti(username: str) -> tuple:
+def analyze_user_mbti(username: str, collection_mode: str = None) -> tuple:
     """
     分析用户MBTI的主函数
 
     Args:
         username: Twitter用户名（不带@）
+        collection_mode: 推文收集方式（"split" / "single_pass"），默认读取配置
 
     Returns:
         tuple: (报告路径, 图片路径, 分析结果)
     """
     # 1. 收集推文数据
     print(f"[1/4] 正在收集 @{username} 的推文数据...")
-    tweet_data = collect_tweet_data(username)
+    tweet_data = collect_tweet_data(username, collection_mode=collection_mode)
 
     if not tweet_data["original_tweets"] and not tweet_data["reply_tweets"]:
         raise ValueError(f"未能获取用户 @{username} 的推文数据")
@@ -43,7 +44,8 @@ def analyze_user_mbti(username: str) -> tuple:
 
     analyzer = GeminiAnalyzer(api_key)
     mbti_result = analyzer.analyze_mbti(tweet_data)
-    print(f"    ✓ 分析结果：{mbti_result['mbti_type']}")
+    cached = "（使用缓存的分析结果）" if analyzer.last_from_cache else ""
+    print(f"    ✓ 分析结果：{mbti_result['mbti_type']}{cached}")
 
     # 3. 生成报告
     print("[3/4] 正在生成HTML报告...")
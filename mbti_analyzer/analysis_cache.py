@@ -0,0 +1,142 @@
+"""
+MBTI 分析结果缓存
+以 (模型, 提示词版本, 完整提示词) 的哈希为键缓存 Gemini 的分析结果；
+推文样本不变时再次分析直接返回缓存结果，不再调用 API
+
+两级缓存：进程内 LRU + 磁盘 JSON 文件，两级共用同一个 TTL
+"""
+
+import copy
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from common.utils.disk_cache import DiskCache, make_cache_key
+from config import get_config
+
+
+def analysis_cache_key(model_name: str, prompt_version: int, prompt: str) -> str:
+    """根据模型名、提示词模板版本和提示词（包含用户名与推文样本）生成缓存键"""
+    return make_cache_key(model_name, prompt_version, prompt)
+
+
+class AnalysisCache:
+    """内存 LRU + 磁盘的两级分析结果缓存"""
+
+    def __init__(
+        self,
+        cache_dir: Optional[str],
+        ttl_seconds: Optional[float] = None,
+        max_entries: int = 128,
+    ):
+        """
+        Args:
+            cache_dir: 磁盘缓存目录，None 表示只使用内存缓存
+            ttl_seconds: 过期时间（秒），None 表示永不过期
+            max_entries: 内存中最多保留的结果数
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.disk = None
+        if cache_dir:
+            self.disk = DiskCache(cache_dir, ttl_seconds=ttl_seconds, suffix=".json")
+        self._memory: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        读取缓存结果（返回副本，调用方可以随意修改）
+
+        Returns:
+            分析结果，未命中或已过期时返回 None
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                stored_at, result = entry
+                if self.ttl_seconds is None or now - stored_at <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return copy.deepcopy(result)
+                del self._memory[key]
+
+        data = self.disk.get_bytes(key) if self.disk else None
+        if data is not None:
+            try:
+                result = json.loads(data)
+            except ValueError:
+                self.disk.discard(key)
+            else:
+                self._remember(key, result, now)
+                with self._lock:
+                    self.stats["disk_hits"] += 1
+                return copy.deepcopy(result)
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, key: str, result: Dict):
+        """写入两级缓存"""
+        self._remember(key, copy.deepcopy(result), time.time())
+        if self.disk:
+            self.disk.put_bytes(key, json.dumps(result, ensure_ascii=False).encode("utf-8"))
+        with self._lock:
+            self.stats["writes"] += 1
+
+    def _remember(self, key: str, result: Dict, stored_at: float):
+        with self._lock:
+            self._memory[key] = (stored_at, result)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取命中统计"""
+        with self._lock:
+            return dict(self.stats)
+
+
+_cache: Optional[AnalysisCache] = None
+_cache_lock = threading.Lock()
+_enabled: Optional[bool] = None
+
+
+def set_analysis_cache_enabled(enabled: bool):
+    """开启或关闭分析结果缓存（CLI 的 --no-cache 使用）"""
+    global _enabled
+    _enabled = enabled
+
+
+def get_analysis_cache() -> Optional[AnalysisCache]:
+    """
+    获取进程级的分析结果缓存（磁盘部分位于 data/analysis_cache）
+
+    Returns:
+        缓存实例，缓存被关闭时返回 None
+    """
+    global _cache
+    config = get_config()
+    enabled = config.analyzer.result_cache_enabled if _enabled is None else _enabled
+    if not enabled:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = AnalysisCache(
+                    str(config.storage.data_dir / "analysis_cache"),
+                    ttl_seconds=config.analyzer.result_cache_ttl_hours * 3600,
+                )
+    return _cache
+
+
+def get_analysis_cache_stats() -> Dict[str, int]:
+    """获取分析结果缓存的命中统计"""
+    cache = _cache
+    if cache is None:
+        return {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+    return cache.get_stats()
@@ -4,30 +4,54 @@ MBTI 人格分析核心逻辑
 """
 
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 # 添加项目根目录到路径
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from common.data.tweet import Tweet, as_tweet  # noqa: E402
+from common.data.tweet_batch import as_batch  # noqa: E402
 from common.exceptions import (  # noqa: E402
     NoTweetsError,
     UserNotFoundError,
 )
 from common.path_utils import add_project_to_path  # noqa: E402
+from config import get_config  # noqa: E402
 from scraper import (  # noqa: E402
     filter_tweets,
     scrape_user_original_tweets_advanced,
+    scrape_user_original_tweets_incremental,
     scrape_user_replies_advanced,
+    scrape_user_replies_incremental,
+    scrape_user_timeline_advanced,
+    scrape_user_timeline_incremental,
     scrape_user_tweets,
 )
 
 add_project_to_path()
 
+# 并发抓取使用的最大线程数（原创搜索 + 回复搜索）
+MAX_SCRAPE_WORKERS = 2
+
+
+def is_original(tweet: Dict) -> bool:
+    """是否为原创推文（非转发、非回复）"""
+    return not tweet["is_retweet"] and not tweet["is_reply"]
+
+
+def is_reply(tweet: Dict) -> bool:
+    """是否为回复推文（非转发）"""
+    return tweet["is_reply"] and not tweet["is_retweet"]
+
 
 def collect_tweet_data(
-    username: str, original_count: int = 100, reply_count: int = 100
+    username: str,
+    original_count: int = 100,
+    reply_count: int = 100,
+    collection_mode: Optional[str] = None,
 ) -> Dict[str, any]:
     """
     收集用户推文数据
@@ -36,32 +60,30 @@ def collect_tweet_data(
         username: Twitter用户名（不带@）
         original_count: 原创推文数量
         reply_count: 回复推文数量
+        collection_mode: 收集方式，"split" 或 "single_pass"；默认读取配置 COLLECTION_MODE
 
     Returns:
         包含原创推文和回复推文的字典
     """
+    if collection_mode is None:
+        collection_mode = get_config().analyzer.collection_mode
+
     # 分别抓取原创和回复，使用更精确的方法
     print("    - 正在抓取推文数据...")
 
     try:
         # 方案1：先尝试使用搜索API（成本低）
         try:
-            # 尝试使用高级搜索
-            original_tweets = scrape_user_original_tweets_advanced(username, original_count)
-            reply_tweets = scrape_user_replies_advanced(username, reply_count)
-
-            # 如果原创推文不够，使用补充方案
-            if len(original_tweets) < original_count:
-                print("    - 原创推文不足，使用补充方案...")
-                # 只额外抓取需要的数量
-                needed = original_count - len(original_tweets)
-                extra_tweets = scrape_user_tweets(username, needed * 2)
-                extra_originals = filter_tweets(
-                    extra_tweets, lambda t: not t["is_retweet"] and not t["is_reply"]
+            if collection_mode == "single_pass":
+                # 一次搜索，本地区分原创和回复
+                original_tweets, reply_tweets = scrape_single_pass(
+                    username, original_count, reply_count
+                )
+            else:
+                # 尝试使用高级搜索（原创与回复并发抓取）
+                original_tweets, reply_tweets = scrape_advanced_concurrently(
+                    username, original_count, reply_count
                 )
-                original_tweets.extend(extra_originals[:needed])
-                original_tweets = original_tweets[:original_count]
-
         except (UserNotFoundError, NoTweetsError):
             # 用户不存在或无推文，直接抛出
             raise
@@ -69,12 +91,8 @@ def collect_tweet_data(
             # 如果搜索失败，使用传统方法但限制数量
             print("    - 搜索失败，使用备用方案...")
             tweets = scrape_user_tweets(username, 300)  # 限制最多300条
-            original_tweets = filter_tweets(
-                tweets, lambda t: not t["is_retweet"] and not t["is_reply"]
-            )[:original_count]
-            reply_tweets = filter_tweets(tweets, lambda t: t["is_reply"] and not t["is_retweet"])[
-                :reply_count
-            ]
+            original_tweets = filter_tweets(tweets, is_original)[:original_count]
+            reply_tweets = filter_tweets(tweets, is_reply)[:reply_count]
     except (UserNotFoundError, NoTweetsError) as e:
         # 记录错误并重新抛出
         print(f"    ✗ {str(e)}")
@@ -96,39 +114,171 @@ def collect_tweet_data(
     }
 
 
-def simplify_tweets(tweets: List[Dict]) -> List[Dict]:
+def fetch_original_tweets(username: str, count: int) -> List[Dict]:
+    """抓取原创推文；启用增量抓取时只搜索上次之后的新推文，与本地语料合并"""
+    if get_config().scraper.incremental:
+        return scrape_user_original_tweets_incremental(username, count)[0]
+    return scrape_user_original_tweets_advanced(username, count)
+
+
+def fetch_reply_tweets(username: str, count: int) -> List[Dict]:
+    """抓取回复推文；启用增量抓取时只搜索上次之后的新推文，与本地语料合并"""
+    if get_config().scraper.incremental:
+        return scrape_user_replies_incremental(username, count)[0]
+    return scrape_user_replies_advanced(username, count)
+
+
+def scrape_advanced_concurrently(
+    username: str, original_count: int, reply_count: int
+) -> Tuple[List[Dict], List[Dict]]:
+    """
+    并发执行原创推文搜索和回复搜索
+
+    两次 actor 运行在有界线程池中同时进行，原创推文不足时的补充抓取
+    在原创搜索结束后立即提交，与仍在进行的回复搜索重叠。
+    任一任务的异常会原样抛出，优先级与串行执行时一致（原创 > 回复 > 补充）；
+    抛出前取消尚未开始的任务，并等待已在进行的 actor 运行结束。
+    启用增量抓取时两类搜索分别按各自的高水位只抓取新推文。
+
+    Args:
+        username: Twitter用户名（不带@）
+        original_count: 原创推文数量
+        reply_count: 回复推文数量
+
+    Returns:
+        (原创推文列表, 回复推文列表)
+    """
+    futures = []
+    with ThreadPoolExecutor(
+        max_workers=MAX_SCRAPE_WORKERS, thread_name_prefix="scrape"
+    ) as executor:
+        try:
+            original_future = executor.submit(fetch_original_tweets, username, original_count)
+            reply_future = executor.submit(fetch_reply_tweets, username, reply_count)
+            futures += [original_future, reply_future]
+
+            original_tweets = original_future.result()
+
+            # 如果原创推文不够，使用补充方案
+            extra_future = None
+            needed = original_count - len(original_tweets)
+            if needed > 0:
+                print("    - 原创推文不足，使用补充方案...")
+                # 只额外抓取需要的数量
+                extra_future = executor.submit(scrape_user_tweets, username, needed * 2)
+                futures.append(extra_future)
+
+            reply_tweets = reply_future.result()
+
+            if extra_future is not None:
+                extra_originals = filter_tweets(extra_future.result(), is_original)
+                original_tweets.extend(extra_originals[:needed])
+                original_tweets = original_tweets[:original_count]
+
+            return original_tweets, reply_tweets
+        except BaseException:
+            # 出错时取消尚未开始的任务；退出 with 时等待已在进行的 actor 运行结束，
+            # 不留下无人等待的运行
+            for future in futures:
+                future.cancel()
+            raise
+
+
+def merge_unique(primary: List[Dict], extra: List[Dict], limit: int) -> List[Dict]:
+    """
+    合并两组推文并按 id 去重，保留先出现的顺序
+
+    Args:
+        primary: 优先保留的推文
+        extra: 补充的推文
+        limit: 最多保留的数量
+
+    Returns:
+        合并后的推文列表
     """
-    简化推文数据，只保留分析所需字段
+    seen = {t.get("id") for t in primary if t.get("id")}
+    merged = list(primary)
+    for tweet in extra:
+        if len(merged) >= limit:
+            break
+        tweet_id = tweet.get("id")
+        if tweet_id and tweet_id in seen:
+            continue
+        seen.add(tweet_id)
+        merged.append(tweet)
+    return merged[:limit]
+
+
+def scrape_single_pass(
+    username: str, original_count: int, reply_count: int
+) -> Tuple[List[Dict], List[Dict]]:
+    """
+    单次搜索收集原创推文和回复
+
+    先发起一次 from:user -filter:nativeretweets 搜索（数量为两者之和；启用增量抓取时
+    只搜索本地语料之后的新推文），
+    再根据 is_reply / is_retweet 在本地分类。只有当搜索结果已满额但某一类仍不足时，
+    才对该类发起定向搜索补充；结果不满额说明用户的推文已经取尽，无需再补。
 
     Args:
-        tweets: 原始推文列表
+        username: Twitter用户名（不带@）
+        original_count: 原创推文数量
+        reply_count: 回复推文数量
 
     Returns:
-        简化后的推文列表
+        (原创推文列表, 回复推文列表)
     """
-    simplified = []
+    target = original_count + reply_count
+    if get_config().scraper.incremental:
+        # 只抓取上次之后的新推文，与本地语料合并
+        tweets, _ = scrape_user_timeline_incremental(username, target)
+    else:
+        tweets = scrape_user_timeline_advanced(username, target)
+
+    original_tweets = filter_tweets(tweets, is_original)[:original_count]
+    reply_tweets = filter_tweets(tweets, is_reply)[:reply_count]
+
+    if len(tweets) < target:
+        return original_tweets, reply_tweets
+
+    # 只对不足的一类回退到定向搜索，两类都不足时并发执行
+    fallbacks = {}
+    if len(original_tweets) < original_count:
+        fallbacks["original"] = (scrape_user_original_tweets_advanced, original_count)
+    if len(reply_tweets) < reply_count:
+        fallbacks["reply"] = (scrape_user_replies_advanced, reply_count)
+
+    if fallbacks:
+        print("    - 单次搜索结果不足，补充定向搜索...")
+        with ThreadPoolExecutor(max_workers=MAX_SCRAPE_WORKERS) as executor:
+            futures = {
+                name: executor.submit(func, username, count)
+                for name, (func, count) in fallbacks.items()
+            }
+            if "original" in futures:
+                original_tweets = merge_unique(
+                    original_tweets, futures["original"].result(), original_count
+                )
+            if "reply" in futures:
+                reply_tweets = merge_unique(reply_tweets, futures["reply"].result(), reply_count)
 
-    for tweet in tweets:
-        # 提取关键信息
-        simplified_tweet = {
-            "text": tweet["text"],
-            "created_at": tweet["created_at"],
-            "likes": tweet["likes"],
-            "retweets": tweet["retweets"],
-            "replies": tweet["replies"],
-            "hashtags": tweet["hashtags"],
-            "mentions": tweet["mentions"],
-            "has_media": len(tweet.get("media", [])) > 0,
-        }
+    return original_tweets, reply_tweets
 
-        # 计算互动率
-        simplified_tweet["engagement_rate"] = (
-            tweet["likes"] + tweet["retweets"] + tweet["replies"]
-        ) / max(tweet.get("views", 1), 1)
 
-        simplified.append(simplified_tweet)
+def simplify_tweets(tweets: List[Dict]) -> List[Tweet]:
+    """
+    统一为 Tweet 记录供分析使用
 
-    return simplified
+    抓取结果本身就是 Tweet，直接复用而不再逐条复制出新的字典；
+    has_media 和 engagement_rate 由 Tweet 按需计算
+
+    Args:
+        tweets: 推文列表（Tweet 或字典）
+
+    Returns:
+        Tweet 列表
+    """
+    return [as_tweet(tweet) for tweet in tweets]
 
 
 def analyze_tweet_patterns(tweet_data: Dict) -> Dict:
@@ -148,44 +298,32 @@ def analyze_tweet_patterns(tweet_data: Dict) -> Dict:
         "language_style": {},
     }
 
+    # 每组推文只构建一次列式批次，之后的统计都是向量化计算
     # 分析原创推文
     if tweet_data["original_tweets"]:
-        original = tweet_data["original_tweets"]
+        original = as_batch(tweet_data["original_tweets"])
 
         # 平均推文长度
-        avg_length = sum(len(t["text"]) for t in original) / len(original)
-        patterns["content_patterns"]["avg_tweet_length"] = avg_length
+        patterns["content_patterns"]["avg_tweet_length"] = original.mean("text_length")
 
         # 使用表情/标签/提及的频率
-        patterns["content_patterns"]["hashtag_usage"] = sum(
-            1 for t in original if t["hashtags"]
-        ) / len(original)
-
-        patterns["content_patterns"]["mention_usage"] = sum(
-            1 for t in original if t["mentions"]
-        ) / len(original)
+        patterns["content_patterns"]["hashtag_usage"] = original.rate("hashtag_count")
+        patterns["content_patterns"]["mention_usage"] = original.rate("mention_count")
 
         # 媒体使用频率
-        patterns["content_patterns"]["media_usage"] = sum(
-            1 for t in original if t["has_media"]
-        ) / len(original)
+        patterns["content_patterns"]["media_usage"] = original.rate("has_media")
 
         # 平均互动率
-        patterns["interaction_style"]["avg_engagement"] = sum(
-            t["engagement_rate"] for t in original
-        ) / len(original)
+        patterns["interaction_style"]["avg_engagement"] = original.mean("engagement_rate")
 
     # 分析回复推文
     if tweet_data["reply_tweets"]:
-        replies = tweet_data["reply_tweets"]
+        replies = as_batch(tweet_data["reply_tweets"])
 
         # 回复的平均长度
-        avg_reply_length = sum(len(t["text"]) for t in replies) / len(replies)
-        patterns["interaction_style"]["avg_reply_length"] = avg_reply_length
+        patterns["interaction_style"]["avg_reply_length"] = replies.mean("text_length")
 
         # 回复中的提及频率（表示互动深度）
-        patterns["interaction_style"]["reply_mention_rate"] = sum(
-            1 for t in replies if t["mentions"]
-        ) / len(replies)
+        patterns["interaction_style"]["reply_mention_rate"] = replies.rate("mention_count")
 
     return patterns
@@ -0,0 +1,285 @@
+"""
+无头浏览器池
+在后台事件循环线程中保持若干个已启动的 Chromium，截图时租用已经打开的页面，避免每次冷启动浏览器
+"""
+
+import asyncio
+import atexit
+import threading
+from concurrent.futures import Future
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+# 与原先单次启动时相同的 Chromium 启动参数
+CHROMIUM_ARGS = [
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+    "--disable-dev-shm-usage",  # 避免 /dev/shm 空间不足
+    "--disable-gpu",  # 在某些环境下提高稳定性
+]
+
+# 页面所在上下文的默认参数
+DEFAULT_CONTEXT_OPTIONS = {
+    "viewport": {"width": 900, "height": 800},
+    "device_scale_factor": 2,  # 提高截图质量
+    "ignore_https_errors": True,  # 忽略本地文件的 HTTPS 错误
+}
+
+
+async def _abort_route(route):
+    await route.abort()
+
+
+async def _start_playwright() -> Any:
+    """启动 Playwright 驱动"""
+    from playwright.async_api import async_playwright
+
+    return await async_playwright().start()
+
+
+class _PooledBrowser:
+    """池中的一个浏览器进程"""
+
+    def __init__(self):
+        self.browser = None
+        self.generation = 0  # 每次重启浏览器加一，页面据此判断是否需要重建
+        self.served = 0  # 本次启动以来完成的截图数量
+        self.leased = 0  # 正在被租用的页面数量
+
+    def is_healthy(self) -> bool:
+        return self.browser is not None and self.browser.is_connected()
+
+
+class _PageSlot:
+    """可租用的页面（每个页面有独立的浏览器上下文）"""
+
+    def __init__(self, owner: _PooledBrowser):
+        self.owner = owner
+        self.generation = -1
+        self.context = None
+        self.page = None
+
+
+class BrowserPool:
+    """
+    常驻的浏览器池
+
+    - size 个浏览器进程，每个浏览器提供 pages_per_browser 个可复用页面
+    - 租用前检查健康状态：浏览器断开则重启，页面关闭或崩溃则重建
+    - 每个浏览器完成 recycle_after 次截图后，在没有页面被占用时重启，防止内存持续增长
+
+    浏览器对象绑定在池自己的事件循环上，调用方通过 run / run_async 把协程提交到该循环执行
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        pages_per_browser: int = 2,
+        recycle_after: int = 200,
+        context_options: Optional[Dict] = None,
+        block_network: bool = True,
+        start_driver: Callable[[], Awaitable[Any]] = _start_playwright,
+    ):
+        """
+        Args:
+            size: 浏览器数量
+            pages_per_browser: 每个浏览器的页面数量（池的最大并发为 size * pages_per_browser）
+            recycle_after: 每个浏览器截图多少次后重启
+            context_options: 新建浏览器上下文的参数
+            block_network: 拦截页面发出的所有网络请求（报告是自包含的本地页面）
+            start_driver: 启动 Playwright 驱动的协程函数
+        """
+        self.size = size
+        self.pages_per_browser = pages_per_browser
+        self.recycle_after = recycle_after
+        self.context_options = context_options or DEFAULT_CONTEXT_OPTIONS
+        self.block_network = block_network
+        self._start_driver = start_driver
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._driver = None
+        self._browsers: List[_PooledBrowser] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._started = False
+        self.stats = {"leases": 0, "launches": 0, "recycles": 0, "page_rebuilds": 0}
+
+    # ---- 后台事件循环 ----
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name="browser-pool", daemon=True
+                )
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def submit(self, func: Callable[..., Awaitable[T]], *args, **kwargs) -> Future:
+        """把协程函数提交到池的事件循环，返回 concurrent.futures.Future"""
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(func(*args, **kwargs), loop)
+
+    def run(self, func: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+        """同步执行：在池的事件循环中运行协程函数并等待结果"""
+        return self.submit(func, *args, **kwargs).result()
+
+    async def run_async(self, func: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+        """异步执行：可以在任意事件循环中等待池中运行的协程函数"""
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    # ---- 以下方法只在池的事件循环中运行 ----
+
+    async def _start(self):
+        if self._started:
+            return
+        self._driver = await self._start_driver()
+        self._idle = asyncio.Queue()
+        for _ in range(self.size):
+            owner = _PooledBrowser()
+            await self._launch(owner)
+            self._browsers.append(owner)
+            for _ in range(self.pages_per_browser):
+                self._idle.put_nowait(_PageSlot(owner))
+        self._started = True
+
+    async def _launch(self, owner: _PooledBrowser):
+        if owner.browser is not None:
+            try:
+                await owner.browser.close()
+            except Exception:
+                pass
+        owner.browser = await self._driver.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+        owner.generation += 1
+        owner.served = 0
+        self.stats["launches"] += 1
+
+    async def _close_page(self, slot: _PageSlot):
+        if slot.context is not None:
+            try:
+                await slot.context.close()
+            except Exception:
+                pass
+        slot.context = None
+        slot.page = None
+
+    async def _prepare(self, slot: _PageSlot):
+        """租出前的健康检查：按需重启浏览器、重建页面"""
+        owner = slot.owner
+        if not owner.is_healthy():
+            await self._launch(owner)
+        elif owner.served >= self.recycle_after and owner.leased == 0:
+            await self._launch(owner)
+            self.stats["recycles"] += 1
+
+        page_broken = slot.page is None or slot.page.is_closed()
+        if slot.generation != owner.generation or page_broken:
+            if slot.page is not None:
+                self.stats["page_rebuilds"] += 1
+            await self._close_page(slot)
+            slot.context = await owner.browser.new_context(**self.context_options)
+            if self.block_network:
+                await slot.context.route("**/*", _abort_route)
+            slot.page = await slot.context.new_page()
+            slot.generation = owner.generation
+
+    @asynccontextmanager
+    async def lease(self):
+        """
+        租用一个页面（必须在池的事件循环中使用）
+
+        Yields:
+            Playwright Page；使用中抛出异常时该页面会被丢弃并在下次租用时重建
+        """
+        await self._start()
+        slot = await self._idle.get()
+        try:
+            await self._prepare(slot)
+        except BaseException:
+            self._idle.put_nowait(slot)
+            raise
+
+        slot.owner.leased += 1
+        self.stats["leases"] += 1
+        try:
+            yield slot.page
+        except BaseException:
+            await self._close_page(slot)
+            raise
+        finally:
+            slot.owner.leased -= 1
+            slot.owner.served += 1
+            self._idle.put_nowait(slot)
+
+    async def _shutdown(self):
+        while self._idle is not None and not self._idle.empty():
+            await self._close_page(self._idle.get_nowait())
+        for owner in self._browsers:
+            if owner.browser is not None:
+                try:
+                    await owner.browser.close()
+                except Exception:
+                    pass
+        if self._driver is not None:
+            try:
+                await self._driver.stop()
+            except Exception:
+                pass
+        self._browsers = []
+        self._driver = None
+        self._idle = None
+        self._started = False
+
+    def close(self):
+        """关闭所有浏览器并停止后台事件循环"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(timeout=30)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
+
+
+_pool: Optional[BrowserPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """获取进程级共享的浏览器池（参数来自 config.render）"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            from config import get_config
+
+            render = get_config().render
+            context_options = dict(DEFAULT_CONTEXT_OPTIONS, device_scale_factor=render.image_scale)
+            _pool = BrowserPool(
+                size=render.browser_pool_size,
+                pages_per_browser=render.pages_per_browser,
+                recycle_after=render.recycle_after_pages,
+                context_options=context_options,
+            )
+        return _pool
+
+
+def shutdown_browser_pool():
+    """关闭共享浏览器池（进程退出时自动调用）"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
+
+
+atexit.register(shutdown_browser_pool)
@@ -3,11 +3,16 @@ Gemini API 集成
 负责调用 Gemini 2.5 Flash 进行 MBTI 分析
 """
 
+import asyncio
 import json
 import re
 import sys
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
 
 import google.generativeai as genai
 
@@ -17,77 +22,19 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 from common.exceptions import APIError, EmptyResponseError, RateLimitError  # noqa: E402
+from common.utils.json_repair import repair_json  # noqa: E402
+from common.utils.rate_limiter import RateLimiter, get_rate_limiter  # noqa: E402
+from config import get_config  # noqa: E402
 
+from .analysis_cache import analysis_cache_key, get_analysis_cache  # noqa: E402
 
-class GeminiAnalyzer:
-    """Gemini API 客户端，用于MBTI分析"""
-
-    def __init__(self, api_key: str):
-        """
-        初始化 Gemini 客户端
-
-        Args:
-            api_key: Gemini API 密钥
-        """
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel("gemini-2.5-flash")
-
-    def analyze_mbti(self, tweet_data: Dict) -> Dict:
-        """
-        分析推文数据，返回MBTI结果
-
-        Args:
-            tweet_data: 包含原创推文和回复的数据
-
-        Returns:
-            MBTI分析结果
-        """
-        prompt = self._build_prompt(tweet_data)
-
-        try:
-            response = self.model.generate_content(prompt)
-
-            # 尝试获取响应文本
-            try:
-                response_text = response.text
-                if not response_text:
-                    raise EmptyResponseError("Gemini API 返回空响应")
-            except Exception as e:
-                # 如果无法访问 .text，尝试手动提取
-                if response.candidates:
-                    candidate = response.candidates[0]
-                    if hasattr(candidate, "finish_reason") and candidate.finish_reason == 2:
-                        raise APIError("内容被 Gemini 安全过滤器阻止，请尝试其他用户")
-                raise APIError(f"Gemini API 调用失败: {str(e)}")
-
-            result = self._parse_response(response_text)
-            return result
-
-        except Exception as e:
-            if "GEMINI_API_KEY" in str(e):
-                raise
-            elif "RateLimitError" in str(type(e)) or "429" in str(e):
-                raise RateLimitError("Gemini API 限流，请稍后重试", retry_after=60)
-            elif isinstance(e, (APIError, EmptyResponseError)):
-                raise
-            else:
-                raise APIError(f"Gemini API 调用失败: {str(e)}")
-
-    def _build_prompt(self, data: Dict) -> str:
-        """
-        构建分析提示词
-
-        Args:
-            data: 推文数据
+# 提示词版本：修改 SYSTEM_INSTRUCTION 或 _build_prompt 的指令内容后递增，使旧的缓存结果失效
+# 3：推文样本附带互动数据（[赞/转]），此前互动数从未读到，样本中没有这一行
+PROMPT_VERSION = 3
 
-        Returns:
-            格式化的提示词
-        """
-        # 格式化推文样本
-        original_sample = self._format_tweets(data["original_tweets"][:30])
-        reply_sample = self._format_tweets(data["reply_tweets"][:30])
-
-        prompt = f"""你是一位专业的心理学家，精通MBTI人格理论。请分析Twitter用户 @{data['username']} 的推文内容，推断其MBTI类型。
+# 与用户无关的静态指令（偏差提醒、各维度的判断要点、输出格式），作为系统指令随模型创建一次，
+# 每次请求只发送用户名和推文样本
+SYSTEM_INSTRUCTION = """你是一位专业的心理学家，精通MBTI人格理论。你的任务是根据用户提供的Twitter推文样本，推断其MBTI类型。
 
 ## 重要指导原则
 1. **避免类型偏见**：MBTI的16种类型在人群中分布相对均匀，不要偏向任何特定类型
@@ -115,13 +62,7 @@ class GeminiAnalyzer:
    - 不要因为内容具体就判断为S型
 
 ## 分析材料
-以下是用户的推文样本（包含原创内容和回复他人的内容）。请注意，这些是抽样数据，不要将样本数量作为活跃度的判断依据。
-
-## 原创推文样本
-{original_sample}
-
-## 回复他人的内容样本
-{reply_sample}
+每次会提供一位用户的推文样本（包含原创内容和回复他人的内容）。请注意，这些是抽样数据，不要将样本数量作为活跃度的判断依据。
 
 ## 分析要求
 
@@ -187,32 +128,32 @@ class GeminiAnalyzer:
 **重要**：在analysis字段中，使用"该用户"或"其"来指代分析对象，避免使用"他/她/他们"等可能造成性别假设的代词：
 
 ```json
-{{
+{
     "mbti_type": "XXXX",
-    "dimensions": {{
-        "E_I": {{
+    "dimensions": {
+        "E_I": {
             "type": "I或E",
             "percentage": 数字(50-100),
             "analysis": "详细分析，说明判断依据"
-        }},
-        "S_N": {{
+        },
+        "S_N": {
             "type": "S或N",
             "percentage": 数字(50-100),
             "analysis": "详细分析，说明判断依据"
-        }},
-        "T_F": {{
+        },
+        "T_F": {
             "type": "T或F",
             "percentage": 数字(50-100),
             "analysis": "详细分析，说明判断依据"
-        }},
-        "J_P": {{
+        },
+        "J_P": {
             "type": "J或P",
             "percentage": 数字(50-100),
             "analysis": "详细分析，说明判断依据"
-        }}
-    }},
+        }
+    },
     "overall_analysis": "整体人格特征的综合描述，100字左右"
-}}
+}
 ```
 
 注意：
@@ -226,7 +167,359 @@ class GeminiAnalyzer:
 3. 确保输出是有效的JSON格式
 4. **最终检查**：在输出前，请确认你的判断没有过度倾向于ISTJ类型（I+S+T+J的组合）"""
 
-        return prompt
+DIMENSION_LETTERS = {"E_I": ("E", "I"), "S_N": ("S", "N"), "T_F": ("T", "F"), "J_P": ("J", "P")}
+
+
+def _dimension_schema(letters: Tuple[str, str]) -> Dict:
+    return {
+        "type": "object",
+        "properties": {
+            "type": {"type": "string", "enum": list(letters)},
+            "percentage": {"type": "integer"},
+            "analysis": {"type": "string"},
+        },
+        "required": ["type", "percentage", "analysis"],
+    }
+
+
+# 结构化输出使用的响应 Schema，与提示词中的 JSON 格式一致
+RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "mbti_type": {"type": "string"},
+        "dimensions": {
+            "type": "object",
+            "properties": {key: _dimension_schema(v) for key, v in DIMENSION_LETTERS.items()},
+            "required": list(DIMENSION_LETTERS),
+        },
+        "overall_analysis": {"type": "string"},
+    },
+    "required": ["mbti_type", "dimensions", "overall_analysis"],
+}
+
+# 响应解析方式计数：structured（一次 json.loads）、legacy（正则提取）、
+# legacy_repair（需要 _fix_json_errors 修复）
+_parse_stats: Counter = Counter()
+_parse_stats_lock = threading.Lock()
+
+
+def _count_parse(kind: str):
+    with _parse_stats_lock:
+        _parse_stats[kind] += 1
+
+
+def get_parse_stats() -> Dict[str, int]:
+    """获取响应解析方式的计数，用于观察旧解析路径的命中频率"""
+    with _parse_stats_lock:
+        return {kind: _parse_stats[kind] for kind in ("structured", "legacy", "legacy_repair")}
+
+
+# 服务端上下文缓存（缓存 SYSTEM_INSTRUCTION），按模型名保存句柄
+_context_caches: Dict[str, Any] = {}
+_context_cache_lock = threading.Lock()
+_context_cache_failed = False
+
+
+def get_context_cache(model_name: str):
+    """
+    获取缓存了 SYSTEM_INSTRUCTION 的服务端上下文缓存句柄，过期前重复使用
+
+    Args:
+        model_name: 模型名
+
+    Returns:
+        genai.caching.CachedContent，创建失败时返回 None（本进程内不再重试）
+    """
+    global _context_cache_failed
+    with _context_cache_lock:
+        if _context_cache_failed:
+            return None
+        handle = _context_caches.get(model_name)
+        # 留出一分钟余量，避免请求发出时缓存恰好过期
+        now = datetime.now(timezone.utc)
+        if handle is not None and handle.expire_time - timedelta(minutes=1) > now:
+            return handle
+        try:
+            handle = genai.caching.CachedContent.create(
+                model=f"models/{model_name}",
+                display_name=f"mbti-system-v{PROMPT_VERSION}",
+                system_instruction=SYSTEM_INSTRUCTION,
+                ttl=timedelta(minutes=get_config().analyzer.context_cache_ttl_minutes),
+            )
+        except Exception as e:
+            # 例如模型不支持上下文缓存或指令长度低于缓存下限，退回普通请求
+            print(f"    - 创建 Gemini 上下文缓存失败，改为随模型发送系统指令: {e}")
+            _context_cache_failed = True
+            return None
+        _context_caches[model_name] = handle
+        return handle
+
+
+@dataclass
+class AnalysisResult:
+    """批量分析中单个用户的结果"""
+    username: str
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+    from_cache: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.result is not None
+
+
+def get_gemini_rate_limiter() -> RateLimiter:
+    """获取进程内共享的 Gemini 限流器（按 config.rate_limit 的 Gemini 限额）"""
+    rate_limit = get_config().rate_limit
+    # Gemini 只有每分钟和每天的配额；每小时上限取两者允许的最大值，由天窗口限制每日总量
+    per_hour = min(rate_limit.gemini_requests_per_minute * 60, rate_limit.gemini_requests_per_day)
+    return get_rate_limiter(
+        "gemini",
+        max_requests_per_minute=rate_limit.gemini_requests_per_minute,
+        max_requests_per_hour=per_hour,
+        max_requests_per_day=rate_limit.gemini_requests_per_day,
+    )
+
+
+class GeminiAnalyzer:
+    """Gemini API 客户端，用于MBTI分析"""
+
+    def __init__(
+        self,
+        api_key: str,
+        structured_output: Optional[bool] = None,
+        context_cache: Optional[bool] = None,
+    ):
+        """
+        初始化 Gemini 客户端
+
+        Args:
+            api_key: Gemini API 密钥
+            structured_output: 是否请求按 Schema 输出 JSON，默认读取配置
+            context_cache: 是否把系统指令放入服务端上下文缓存，默认读取配置
+        """
+        genai.configure(api_key=api_key)
+        analyzer_config = get_config().analyzer
+        self.model_name = "gemini-2.5-flash"
+        if structured_output is None:
+            structured_output = analyzer_config.structured_output
+        if context_cache is None:
+            context_cache = analyzer_config.context_cache_enabled
+        self.structured_output = structured_output
+        self.context_cache = context_cache
+        self.generation_config = None
+        if structured_output:
+            self.generation_config = {
+                "response_mime_type": "application/json",
+                "response_schema": RESPONSE_SCHEMA,
+            }
+        # 静态指令随模型创建一次，之后每次请求只发送推文样本
+        self.model = genai.GenerativeModel(
+            self.model_name,
+            generation_config=self.generation_config,
+            system_instruction=SYSTEM_INSTRUCTION,
+        )
+        self._cached_model = None
+        self._cache_handle = None
+        # 最近一次 analyze_mbti 是否来自缓存
+        self.last_from_cache = False
+
+    def _current_model(self):
+        """
+        获取本次请求使用的模型：开启上下文缓存时使用引用服务端缓存的模型，
+        缓存句柄过期重建后随之更新；缓存不可用时使用普通模型
+        """
+        if not self.context_cache:
+            return self.model
+        handle = get_context_cache(self.model_name)
+        if handle is None:
+            return self.model
+        if handle is not self._cache_handle:
+            self._cached_model = genai.GenerativeModel.from_cached_content(
+                handle, generation_config=self.generation_config
+            )
+            self._cache_handle = handle
+        return self._cached_model
+
+    def analyze_mbti(self, tweet_data: Dict) -> Dict:
+        """
+        分析推文数据，返回MBTI结果
+
+        Args:
+            tweet_data: 包含原创推文和回复的数据
+
+        Returns:
+            MBTI分析结果
+        """
+        prompt = self._build_prompt(tweet_data)
+
+        # 推文样本与提示词完全相同时直接返回之前的结果
+        cache_key, cached = self._lookup_cache(prompt)
+        self.last_from_cache = cached is not None
+        if cached is not None:
+            return cached
+
+        result = self._generate(prompt)
+        self._store_cache(cache_key, result)
+        return result
+
+    async def analyze_mbti_async(self, tweet_data: Dict) -> Dict:
+        """
+        异步分析推文数据（使用 SDK 的异步生成接口，不阻塞事件循环）
+
+        与 analyze_mbti 不同，不更新 last_from_cache（并发调用时该状态没有意义），
+        需要区分缓存命中时使用 analyze_many
+
+        Args:
+            tweet_data: 包含原创推文和回复的数据
+
+        Returns:
+            MBTI分析结果
+        """
+        result, _ = await self._analyze_async(tweet_data)
+        return result
+
+    async def analyze_many(
+        self, tweet_datas: Iterable[Dict], concurrency: Optional[int] = None
+    ) -> AsyncIterator[AnalysisResult]:
+        """
+        以有限并发批量分析多个用户，按完成顺序返回结果
+
+        同时进行的请求数不超过 concurrency 和每分钟 Gemini 请求上限中的较小值，
+        每个请求发出前还会经过共享的 Gemini 限流器
+
+        Args:
+            tweet_datas: 每个用户的推文数据
+            concurrency: 最大并发数，默认为 config.analyzer.analysis_concurrency
+
+        Yields:
+            每个用户的 AnalysisResult；单个用户失败不会中断整批分析
+        """
+        config = get_config()
+        limit = concurrency or config.analyzer.analysis_concurrency
+        limit = max(1, min(limit, config.rate_limit.gemini_requests_per_minute))
+        semaphore = asyncio.Semaphore(limit)
+
+        async def run(tweet_data: Dict) -> AnalysisResult:
+            username = tweet_data.get("username", "")
+            async with semaphore:
+                try:
+                    result, from_cache = await self._analyze_async(tweet_data)
+                    return AnalysisResult(username, result, from_cache=from_cache)
+                except Exception as e:
+                    return AnalysisResult(username, error=str(e))
+
+        tasks = [asyncio.ensure_future(run(tweet_data)) for tweet_data in tweet_datas]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            # 调用方提前停止迭代时取消尚未完成的请求
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _analyze_async(self, tweet_data: Dict) -> Tuple[Dict, bool]:
+        """异步分析单个用户，返回 (结果, 是否来自缓存)"""
+        prompt = self._build_prompt(tweet_data)
+        cache_key, cached = self._lookup_cache(prompt)
+        if cached is not None:
+            return cached, True
+
+        limiter = get_gemini_rate_limiter()
+        await self._wait_for_rate_limit(limiter)
+        try:
+            result = await self._generate_async(prompt)
+        except RateLimitError as e:
+            limiter.record_rate_limit_hit(e.retry_after)
+            raise
+        self._store_cache(cache_key, result)
+        return result, False
+
+    async def _wait_for_rate_limit(self, limiter: RateLimiter):
+        """等待限流器放行并记录本次请求（检查和记录之间没有 await，协程间不会竞争）"""
+        while True:
+            allowed, wait_seconds = limiter.can_make_request()
+            if allowed:
+                limiter.record_request(success=True)
+                return
+            await asyncio.sleep(wait_seconds or 1.0)
+
+    def _lookup_cache(self, prompt: str) -> Tuple[str, Optional[Dict]]:
+        """返回 (缓存键, 缓存结果)，缓存被关闭或未命中时结果为 None"""
+        cache = get_analysis_cache()
+        cache_key = analysis_cache_key(self.model_name, PROMPT_VERSION, prompt)
+        return cache_key, cache.get(cache_key) if cache else None
+
+    def _store_cache(self, cache_key: str, result: Dict):
+        cache = get_analysis_cache()
+        if cache:
+            cache.put(cache_key, result)
+
+    def _generate(self, prompt: str) -> Dict:
+        """调用 Gemini 生成并解析分析结果"""
+        try:
+            response = self._current_model().generate_content(prompt)
+            return self._parse_result(self._response_text(response))
+        except Exception as e:
+            raise self._map_error(e)
+
+    async def _generate_async(self, prompt: str) -> Dict:
+        """异步调用 Gemini 生成并解析分析结果"""
+        try:
+            response = await self._current_model().generate_content_async(prompt)
+            return self._parse_result(self._response_text(response))
+        except Exception as e:
+            raise self._map_error(e)
+
+    def _response_text(self, response) -> str:
+        """从响应中取出文本，被安全过滤器拦截或为空时抛出异常"""
+        try:
+            response_text = response.text
+            if not response_text:
+                raise EmptyResponseError("Gemini API 返回空响应")
+        except Exception as e:
+            # 如果无法访问 .text，尝试手动提取
+            if response.candidates:
+                candidate = response.candidates[0]
+                if hasattr(candidate, "finish_reason") and candidate.finish_reason == 2:
+                    raise APIError("内容被 Gemini 安全过滤器阻止，请尝试其他用户")
+            raise APIError(f"Gemini API 调用失败: {str(e)}")
+        return response_text
+
+    def _map_error(self, e: Exception) -> Exception:
+        """把 SDK 和解析过程中的异常统一映射为项目异常"""
+        if "GEMINI_API_KEY" in str(e):
+            return e
+        elif "RateLimitError" in str(type(e)) or "429" in str(e):
+            return RateLimitError("Gemini API 限流，请稍后重试", retry_after=60)
+        elif isinstance(e, (APIError, EmptyResponseError)):
+            return e
+        else:
+            return APIError(f"Gemini API 调用失败: {str(e)}")
+
+    def _build_prompt(self, data: Dict) -> str:
+        """
+        构建分析提示词（只包含与用户相关的部分，静态指令见 SYSTEM_INSTRUCTION）
+
+        Args:
+            data: 推文数据
+
+        Returns:
+            格式化的提示词
+        """
+        # 格式化推文样本
+        original_sample = self._format_tweets(data["original_tweets"][:30])
+        reply_sample = self._format_tweets(data["reply_tweets"][:30])
+
+        return f"""请分析Twitter用户 @{data['username']} 的推文内容，推断其MBTI类型，并按要求的JSON格式输出。
+
+## 原创推文样本
+{original_sample}
+
+## 回复他人的内容样本
+{reply_sample}"""
 
     def _format_tweets(self, tweets: List[Dict]) -> str:
         """
@@ -254,9 +547,10 @@ class GeminiAnalyzer:
             formatted.append(f"{i}. {text}")
 
             # 添加互动数据（如果有意义的话）
-            metrics = tweet.get("metrics", {})
-            likes = metrics.get("likes", 0)
-            retweets = metrics.get("retweets", 0)
+            # Tweet 记录直接带有互动数；旧的简化格式放在 metrics 中，缺失或为 None 时按 0 处理
+            metrics = tweet.get("metrics") or {}
+            likes = int(tweet.get("likes", metrics.get("likes")) or 0)
+            retweets = int(tweet.get("retweets", metrics.get("retweets")) or 0)
 
             if likes > 10 or retweets > 5:
                 formatted.append(f"   [赞:{likes} 转:{retweets}]")
@@ -264,9 +558,63 @@ class GeminiAnalyzer:
         # 使用 join 一次性拼接，比多次字符串拼接更高效
         return "\n".join(formatted)
 
+    def _parse_result(self, response_text: str) -> Dict:
+        """
+        解析响应：结构化输出时直接 json.loads 并校验，失败时退回旧的解析方式
+
+        Args:
+            response_text: Gemini的原始响应
+
+        Returns:
+            解析后的MBTI结果
+        """
+        if self.structured_output:
+            try:
+                result = self._validate_result(json.loads(response_text))
+            except ValueError:
+                # JSONDecodeError 也是 ValueError；模型偶尔仍会输出不合规的内容
+                pass
+            else:
+                _count_parse("structured")
+                return result
+        return self._parse_response(response_text)
+
+    def _validate_result(self, result) -> Dict:
+        """
+        按 RESPONSE_SCHEMA 校验结构化输出的字段和类型
+
+        Raises:
+            ValueError: 字段缺失或类型不符
+        """
+        if not isinstance(result, dict):
+            raise ValueError("响应不是JSON对象")
+        mbti_type = result.get("mbti_type")
+        if not isinstance(mbti_type, str) or not re.match(r"^[EI][SN][TF][JP]$", mbti_type):
+            raise ValueError(f"无效的MBTI类型: {mbti_type}")
+        if not isinstance(result.get("overall_analysis"), str):
+            raise ValueError("overall_analysis 必须是字符串")
+
+        dimensions = result.get("dimensions")
+        if not isinstance(dimensions, dict):
+            raise ValueError("dimensions 必须是对象")
+        for key, letters in DIMENSION_LETTERS.items():
+            dimension = dimensions.get(key)
+            if not isinstance(dimension, dict):
+                raise ValueError(f"缺少维度: {key}")
+            if dimension.get("type") not in letters:
+                raise ValueError(f"维度 {key} 的类型无效: {dimension.get('type')}")
+            percentage = dimension.get("percentage")
+            if isinstance(percentage, bool) or not isinstance(percentage, (int, float)):
+                raise ValueError(f"维度 {key} 的 percentage 必须是数字")
+            if not 0 <= percentage <= 100:
+                raise ValueError(f"维度 {key} 的 percentage 超出范围: {percentage}")
+            if not isinstance(dimension.get("analysis"), str):
+                raise ValueError(f"维度 {key} 的 analysis 必须是字符串")
+        return result
+
     def _parse_response(self, response_text: str) -> Dict:
         """
-        解析Gemini的响应文本
+        解析Gemini的响应文本（旧方式：正则提取 JSON，失败时修复常见格式错误）
 
         Args:
             response_text: Gemini的原始响应
@@ -292,11 +640,16 @@ class GeminiAnalyzer:
             # 首次尝试解析
             try:
                 result = json.loads(json_text)
+                _count_parse("legacy")
             except json.JSONDecodeError:
                 # 如果失败，尝试修复常见的JSON格式错误
-                json_text = self._fix_json_errors(json_text)
+                # 没有代码块时从原始响应修复，被截断的输出可能缺少最后的 }
+                json_text = self._fix_json_errors(
+                    json_match.group(1) if json_match else response_text
+                )
                 # 再次尝试解析
                 result = json.loads(json_text)
+                _count_parse("legacy_repair")
 
             # 验证必要字段
             required_fields = ["mbti_type", "dimensions", "overall_analysis"]
@@ -318,7 +671,7 @@ class GeminiAnalyzer:
 
     def _fix_json_errors(self, json_text: str) -> str:
         """
-        修复常见的JSON格式错误
+        修复常见的JSON格式错误（字符串中的换行和引号、缺少或多余的逗号、截断等）
 
         Args:
             json_text: 原始JSON文本
@@ -326,55 +679,4 @@ class GeminiAnalyzer:
         Returns:
             修复后的JSON文本
         """
-        # 使用更强大的方法修复JSON中的字符串值
-        # 这个方法会找到所有的 "key": "value" 对，并修复value中的问题
-        
-        # 1. 首先标记所有的JSON结构位置
-        # 临时替换所有的结构字符，避免在字符串中误匹配
-        temp_markers = {
-            '": "': '§QUOTE_COLON_QUOTE§',
-            '": {': '§QUOTE_COLON_BRACE§',
-            '": [': '§QUOTE_COLON_BRACKET§',
-            '": ': '§QUOTE_COLON_SPACE§',
-            '",': '§QUOTE_COMMA§',
-            '"}': '§QUOTE_BRACE§',
-            '"]': '§QUOTE_BRACKET§',
-        }
-        
-        # 替换结构标记
-        for old, new in temp_markers.items():
-            json_text = json_text.replace(old, new)
-        
-        # 2. 处理字符串内容中的换行符
-        # 匹配所有的字符串值（在引号之间的内容）
-        def fix_string_content(match):
-            content = match.group(1)
-            # 替换实际的换行符
-            content = content.replace('\n', ' ').replace('\r', ' ')
-            # 压缩多个空格为一个
-            content = ' '.join(content.split())
-            # 转义引号
-            content = content.replace('"', '\\"')
-            return f'"{content}"'
-        
-        # 处理所有字符串值
-        json_text = re.sub(r'"([^"§]*)"', fix_string_content, json_text)
-        
-        # 3. 恢复结构标记
-        for old, new in temp_markers.items():
-            json_text = json_text.replace(new, old)
-        
-        # 4. 修复其他常见问题
-        # 修复缺少逗号的情况
-        json_text = re.sub(r'(\d+)\s*\n\s*"', r'\1,\n"', json_text)
-        json_text = re.sub(r'}\s*\n\s*"', r'},\n"', json_text)
-        json_text = re.sub(r']\s*\n\s*"', r'],\n"', json_text)
-        
-        # 修复多余的逗号
-        json_text = re.sub(r',\s*}', r'}', json_text)
-        json_text = re.sub(r',\s*]', r']', json_text)
-        
-        # 确保JSON对象和数组的结束符号前没有逗号
-        json_text = re.sub(r',(\s*[}\]])', r'\1', json_text)
-
-        return json_text
+        return repair_json(json_text)
@@ -4,59 +4,50 @@
 """
 
 import asyncio
+import io
 import os
-from contextlib import asynccontextmanager
-from pathlib import Path
-from typing import Optional
+from concurrent.futures import Future, as_completed
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional
 
 from common.exceptions import ResourceCleanupError
-from playwright.async_api import async_playwright
+from config import get_config
+
+from .browser_pool import BrowserPool, get_browser_pool
+from .image_cache import fetch_cached_image, image_cache_key, store_rendered_image
+from .render_options import RenderOptions, ensure_thumbnail, save_image
+
+# 报告模板在页面可以截图时给 <html> 设置的属性
+RENDER_READY_ATTRIBUTE = "data-render-ready"
+
+
+@dataclass
+class ConversionResult:
+    """批量转换中单个报告的结果"""
+    html_path: str
+    image_path: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
 
 class HTMLToImageConverter:
     """HTML 转图片转换器（改进版）"""
 
-    def __init__(self):
-        """初始化转换器"""
-        self.images_dir = os.path.join(os.path.dirname(__file__), "images")
-        os.makedirs(self.images_dir, exist_ok=True)
-        self._browser = None
-        self._playwright = None
-
-    @asynccontextmanager
-    async def _get_browser(self):
+    def __init__(self, pool: Optional[BrowserPool] = None, options: Optional[RenderOptions] = None):
         """
-        获取浏览器实例的上下文管理器
-        确保浏览器资源被正确释放
+        初始化转换器
+
+        Args:
+            pool: 浏览器池，默认使用进程共享的浏览器池
+            options: 图片输出参数（格式、质量、缩放倍数等），默认读取配置
         """
-        browser = None
-        playwright = None
-        try:
-            playwright = await async_playwright().start()
-            browser = await playwright.chromium.launch(
-                headless=True,
-                args=[
-                    "--no-sandbox",
-                    "--disable-setuid-sandbox",
-                    "--disable-dev-shm-usage",  # 避免 /dev/shm 空间不足
-                    "--disable-gpu",  # 在某些环境下提高稳定性
-                ]
-            )
-            yield browser
-        except Exception as e:
-            raise ResourceCleanupError(f"无法启动浏览器: {str(e)}")
-        finally:
-            # 确保资源被释放
-            if browser:
-                try:
-                    await browser.close()
-                except Exception:
-                    pass
-            if playwright:
-                try:
-                    await playwright.stop()
-                except Exception:
-                    pass
+        self.images_dir = os.path.join(os.path.dirname(__file__), "images")
+        os.makedirs(self.images_dir, exist_ok=True)
+        self.pool = pool or get_browser_pool()
+        self.options = options or RenderOptions.from_config()
 
     async def convert_async(self, html_path: str, output_path: Optional[str] = None) -> str:
         """
@@ -73,86 +64,187 @@ class HTMLToImageConverter:
             FileNotFoundError: HTML 文件不存在
             ResourceCleanupError: 浏览器操作失败
         """
+        output_path = self._prepare_paths(html_path, output_path)
+
+        # 浏览器页面属于浏览器池的事件循环，截图在池中执行
+        return await self.pool.run_async(self._render, html_path, output_path)
+
+    def _prepare_paths(self, html_path: str, output_path: Optional[str]) -> str:
+        """检查 HTML 文件并生成输出路径"""
         # 确保 HTML 文件存在
         if not os.path.exists(html_path):
             raise FileNotFoundError(f"HTML 文件不存在: {html_path}")
 
         # 生成输出路径
         if output_path is None:
-            html_name = Path(html_path).stem
-            output_path = os.path.join(self.images_dir, f"{html_name}.png")
+            output_path = self.options.output_path_for(html_path, self.images_dir)
+        return output_path
 
-        # 使用上下文管理器确保资源释放
-        async with self._get_browser() as browser:
-            context = None
-            page = None
+    async def _convert_item(
+        self, html_path: str, output_dir: Optional[str], semaphore: asyncio.Semaphore
+    ) -> ConversionResult:
+        """转换单个报告，失败时记录错误而不是抛出（在浏览器池的事件循环中运行）"""
+        async with semaphore:
             try:
-                # 创建浏览器上下文
-                context = await browser.new_context(
-                    viewport={"width": 900, "height": 800},
-                    device_scale_factor=2,  # 提高截图质量
-                    ignore_https_errors=True,  # 忽略本地文件的 HTTPS 错误
-                )
-
-                # 创建新页面
-                page = await context.new_page()
-
-                # 设置超时
-                page.set_default_timeout(30000)  # 30 秒
-
-                # 加载 HTML 文件
-                file_url = f"file://{os.path.abspath(html_path)}"
-                await page.goto(file_url, wait_until="networkidle")
-
-                # 等待内容加载完成
-                try:
-                    await page.wait_for_selector(".terminal-body", timeout=5000)
-                except Exception:
-                    # 如果没有 terminal-body，尝试等待 body
-                    await page.wait_for_selector("body", timeout=5000)
-
-                # 获取内容实际高度
-                terminal_height = await page.evaluate(
-                    """() => {
-                    const terminal = document.querySelector('.terminal');
-                    const body = document.body;
-                    const height = terminal ? terminal.scrollHeight : body.scrollHeight;
-                    return Math.min(height + 40, 2000);  // 限制最大高度
-                }"""
-                )
-
-                # 调整视口高度以适应内容
-                await page.set_viewport_size({"width": 900, "height": terminal_height})
-
-                # 稍等一下确保渲染完成
-                await page.wait_for_timeout(500)
-
-                # 截图整个页面
-                await page.screenshot(
-                    path=output_path,
-                    full_page=True,
-                    type="png",
-                    animations="disabled"  # 禁用动画以获得稳定截图
-                )
-
-                return output_path
-
-            except asyncio.TimeoutError:
-                raise ResourceCleanupError("页面加载超时")
+                output_path = None
+                if output_dir:
+                    output_path = self.options.output_path_for(html_path, output_dir)
+                output_path = self._prepare_paths(html_path, output_path)
+                return ConversionResult(html_path, await self._render(html_path, output_path))
             except Exception as e:
-                raise ResourceCleanupError(f"截图失败: {str(e)}")
-            finally:
-                # 确保页面和上下文被关闭
-                if page:
-                    try:
-                        await page.close()
-                    except Exception:
-                        pass
-                if context:
-                    try:
-                        await context.close()
-                    except Exception:
-                        pass
+                return ConversionResult(html_path, error=str(e))
+
+    def _batch_args(self, html_paths: Iterable[str], output_dir, concurrency):
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        # 默认并发等于浏览器池的页面总数
+        limit = concurrency or self.pool.size * self.pool.pages_per_browser
+        return list(html_paths), output_dir, limit
+
+    async def _submit_batch(
+        self, html_paths: List[str], output_dir: Optional[str], limit: int
+    ) -> List[Future]:
+        """在浏览器池的事件循环中创建信号量并提交每个报告（信号量必须属于该事件循环）"""
+        semaphore = asyncio.Semaphore(limit)
+        loop = asyncio.get_running_loop()
+        return [
+            asyncio.run_coroutine_threadsafe(
+                self._convert_item(html_path, output_dir, semaphore), loop
+            )
+            for html_path in html_paths
+        ]
+
+    def convert_many(
+        self,
+        html_paths: Iterable[str],
+        output_dir: Optional[str] = None,
+        concurrency: Optional[int] = None,
+    ) -> Iterator[ConversionResult]:
+        """
+        批量转换：共享浏览器池，多个页面并行截图，按完成顺序返回结果
+
+        Args:
+            html_paths: HTML 文件路径列表
+            output_dir: 图片输出目录（可选，默认为 images 目录）
+            concurrency: 同时截图的页面数，默认为浏览器池的页面总数
+
+        Yields:
+            每个报告的 ConversionResult；单个报告失败不会中断整批转换
+        """
+        futures = self.pool.run(
+            self._submit_batch, *self._batch_args(html_paths, output_dir, concurrency)
+        )
+        for future in as_completed(futures):
+            yield future.result()
+
+    async def convert_many_async(
+        self,
+        html_paths: Iterable[str],
+        output_dir: Optional[str] = None,
+        concurrency: Optional[int] = None,
+    ) -> AsyncIterator[ConversionResult]:
+        """
+        异步批量转换，参数与 convert_many 相同
+
+        Yields:
+            按完成顺序返回的 ConversionResult
+        """
+        futures = await self.pool.run_async(
+            self._submit_batch, *self._batch_args(html_paths, output_dir, concurrency)
+        )
+        for next_result in asyncio.as_completed([asyncio.wrap_future(f) for f in futures]):
+            yield await next_result
+
+    @property
+    def device_scale_factor(self) -> int:
+        """浏览器池截图的实际缩放倍数"""
+        return self.pool.context_options.get("device_scale_factor", 1)
+
+    @property
+    def render_settings(self) -> Dict:
+        """影响输出图片的参数（用于图片缓存键）"""
+        return {
+            "renderer": "browser",
+            "viewport": self.pool.context_options.get("viewport"),
+            "device_scale_factor": self.device_scale_factor,
+            **self.options.cache_settings(),
+        }
+
+    async def _render(self, html_path: str, output_path: str) -> str:
+        """从浏览器池租用页面并截图（在浏览器池的事件循环中运行）"""
+        # 相同内容和参数的报告已经转换过时直接复用图片
+        key = image_cache_key(html_path, self.render_settings)
+        if fetch_cached_image(key, output_path):
+            ensure_thumbnail(output_path, self.options)
+            return output_path
+
+        page = None
+        try:
+            # 出错的页面由浏览器池丢弃，下次租用时重建
+            async with self.pool.lease() as page:
+                png = await self._screenshot(page, html_path)
+        except asyncio.TimeoutError:
+            raise ResourceCleanupError("页面加载超时")
+        except Exception as e:
+            if page is None:
+                raise ResourceCleanupError(f"无法启动浏览器: {str(e)}")
+            raise ResourceCleanupError(f"截图失败: {str(e)}")
+
+        if self.options.is_plain_png and self.options.scale == self.device_scale_factor:
+            with open(output_path, "wb") as f:
+                f.write(png)
+        else:
+            # 编码和缩放在线程池中进行，不阻塞池中其他页面的截图
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._save, png, output_path
+            )
+        store_rendered_image(key, output_path)
+        return output_path
+
+    def _save(self, png: bytes, output_path: str):
+        # 只有需要转换格式、缩放或生成缩略图时才用到 Pillow
+        from PIL import Image
+
+        with Image.open(io.BytesIO(png)) as image:
+            image.load()
+            save_image(image, output_path, self.options, source_scale=self.device_scale_factor)
+
+    async def _screenshot(self, page, html_path: str) -> bytes:
+        """在租用的页面中加载报告并截图，返回 PNG 数据"""
+        # 设置超时
+        page.set_default_timeout(30000)  # 30 秒
+
+        # 直接从内存加载报告内容（网络请求已被浏览器池拦截）
+        with open(html_path, "r", encoding="utf-8") as f:
+            html = f.read()
+        await page.set_content(html, wait_until="domcontentloaded")
+
+        # 等待模板设置的就绪标记；旧报告没有标记，只等待字体加载
+        if RENDER_READY_ATTRIBUTE in html:
+            await page.wait_for_selector(f"html[{RENDER_READY_ATTRIBUTE}]", state="attached")
+        else:
+            await page.evaluate("() => document.fonts.ready.then(() => true)")
+
+        # 只截取终端窗口所在的区域
+        clip = await page.evaluate(
+            """() => {
+            const element = document.querySelector('.terminal') || document.body;
+            const rect = element.getBoundingClientRect();
+            return {
+                x: rect.left + window.scrollX,
+                y: rect.top + window.scrollY,
+                width: rect.width,
+                height: rect.height,
+            };
+        }"""
+        )
+
+        return await page.screenshot(
+            clip=clip,
+            full_page=True,  # 允许截取超出视口的区域
+            type="png",
+            animations="disabled"  # 禁用动画以获得稳定截图
+        )
 
     def convert(self, html_path: str, output_path: Optional[str] = None) -> str:
         """
@@ -167,36 +259,39 @@ class HTMLToImageConverter:
         """
         # 检查是否已经在事件循环中
         try:
-            loop = asyncio.get_running_loop()
+            asyncio.get_running_loop()
             # 如果已经在事件循环中，创建任务
             return asyncio.create_task(self.convert_async(html_path, output_path))
         except RuntimeError:
-            # 如果不在事件循环中，创建新的
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                return loop.run_until_complete(self.convert_async(html_path, output_path))
-            finally:
-                # 清理事件循环
-                try:
-                    loop.close()
-                except Exception:
-                    pass
+            # 不在事件循环中：直接等待浏览器池完成截图
+            return self.pool.run(self.convert_async, html_path, output_path)
 
 
 # 保持向后兼容的全局函数
-def convert_html_to_image(html_path: str, output_path: Optional[str] = None) -> str:
+def convert_html_to_image(
+    html_path: str,
+    output_path: Optional[str] = None,
+    renderer: Optional[str] = None,
+    options: Optional[RenderOptions] = None,
+) -> str:
     """
     便捷函数：转换 HTML 到图片（改进版）
     
     Args:
         html_path: HTML 文件路径
         output_path: 输出图片路径（可选）
+        renderer: browser（Chromium 截图）或 pillow（直接绘制），默认读取配置
+        options: 图片输出参数，默认读取配置
         
     Returns:
         生成的图片路径
     """
-    converter = HTMLToImageConverter()
+    if (renderer or get_config().render.renderer) == "pillow":
+        from .image_renderer import render_report_image
+
+        return render_report_image(html_path, output_path, options)
+
+    converter = HTMLToImageConverter(options=options)
     return converter.convert(html_path, output_path)
 
 
@@ -0,0 +1,98 @@
+"""
+报告图片缓存
+以报告 HTML 内容和渲染参数的哈希为键缓存生成的图片，重复转换同一份报告时直接复制缓存
+"""
+
+import hashlib
+import shutil
+import threading
+from typing import Dict, Optional
+
+from common.utils.disk_cache import DiskCache, make_cache_key
+from config import get_config
+
+# 渲染逻辑变化导致图片不同时递增，使旧缓存失效
+RENDER_VERSION = 1
+
+_cache: Optional[DiskCache] = None
+_cache_lock = threading.Lock()
+_enabled: Optional[bool] = None
+
+
+def set_image_cache_enabled(enabled: bool):
+    """开启或关闭图片缓存（CLI 的 --no-cache 使用）"""
+    global _enabled
+    _enabled = enabled
+
+
+def get_image_cache() -> Optional[DiskCache]:
+    """
+    获取进程级的图片缓存（images 目录下的 .cache 子目录）
+
+    Returns:
+        缓存实例，缓存被关闭时返回 None
+    """
+    global _cache
+    render = get_config().render
+    enabled = render.image_cache_enabled if _enabled is None else _enabled
+    if not enabled:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = DiskCache(
+                    str(get_config().storage.images_dir / ".cache"),
+                    max_bytes=render.image_cache_max_mb * 1024 * 1024,
+                    suffix=".img",
+                )
+    return _cache
+
+
+def get_image_cache_stats() -> Dict[str, int]:
+    """获取图片缓存的命中统计"""
+    cache = _cache
+    if cache is None:
+        return {"hits": 0, "misses": 0, "expired": 0, "writes": 0, "evictions": 0}
+    return cache.get_stats()
+
+
+def image_cache_key(html_path: str, settings: Dict) -> Optional[str]:
+    """
+    根据报告内容和渲染参数生成缓存键
+
+    Args:
+        html_path: HTML 文件路径
+        settings: 影响输出图片的渲染参数（渲染方式、视口、缩放倍数、格式等）
+
+    Returns:
+        缓存键，缓存被关闭时返回 None
+    """
+    if get_image_cache() is None:
+        return None
+    with open(html_path, "rb") as f:
+        content_hash = hashlib.sha256(f.read()).hexdigest()
+    return make_cache_key(RENDER_VERSION, content_hash, settings)
+
+
+def fetch_cached_image(key: Optional[str], output_path: str) -> bool:
+    """
+    命中缓存时把图片复制到输出路径
+
+    Returns:
+        是否命中
+    """
+    cache = get_image_cache()
+    if key is None or cache is None:
+        return False
+    path = cache.get_path(key)
+    if path is None:
+        return False
+    shutil.copyfile(path, output_path)
+    return True
+
+
+def store_rendered_image(key: Optional[str], output_path: str):
+    """把新生成的图片写入缓存（超过大小上限时按最近使用时间淘汰）"""
+    cache = get_image_cache()
+    if key is not None and cache is not None:
+        cache.put_file(key, output_path)
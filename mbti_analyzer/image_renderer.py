@@ -0,0 +1,459 @@
+"""
+终端报告的纯 Python 渲染器
+不启动浏览器，直接用 Pillow 按 terminal_report.html 的版式绘制报告卡片
+"""
+
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from html.parser import HTMLParser
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+from config import get_config
+
+from .image_cache import fetch_cached_image, image_cache_key, store_rendered_image
+from .render_options import RenderOptions, ensure_thumbnail, save_image
+
+# 主题颜色（与 terminal_report.html 中的 :root 一致）
+BLACK = "#0d1117"
+GREEN = "#39ff14"
+WHITE = "#e6edf3"
+GREY = "#8b949e"
+BLUE = "#58a6ff"
+CARD_BACKGROUND = "#161b22"
+HEADER_BACKGROUND = "#30363d"
+BUTTON_COLORS = ("#ff5f56", "#ffbd2e", "#27c93f")
+
+# 元素 class 对应的 (颜色, 是否加粗)
+CLASS_STYLES = {
+    "prompt": (WHITE, False),
+    "output": (GREY, False),
+    "user": (GREEN, False),
+    "path": (BLUE, False),
+    "highlight": (BLUE, True),
+    "display-name": (GREEN, False),
+}
+
+# 版式尺寸（CSS 像素，绘制时乘以 scale）
+CARD_WIDTH = 800
+FONT_SIZE = 16
+LINE_HEIGHT = 25.6  # font-size * line-height 1.6
+BLOCK_MARGIN = 16  # p / pre 的上下外边距 1em
+BODY_PADDING = 15
+BODY_MIN_HEIGHT = 600
+HEADER_PADDING = (8, 15)
+
+# 等宽字体与中文字体的候选路径（按顺序使用第一个存在的文件）
+MONO_FONT_CANDIDATES = [
+    "C:/Windows/Fonts/consola.ttf",
+    "/System/Library/Fonts/Menlo.ttc",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSansMono.ttf",
+]
+CJK_FONT_CANDIDATES = [
+    "C:/Windows/Fonts/msyh.ttc",
+    "/System/Library/Fonts/PingFang.ttc",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+    "/usr/share/fonts/wenquanyi/wqy-microhei/wqy-microhei.ttc",
+]
+
+# 一行中的一个字符：(字符, 颜色, 是否加粗)
+Cell = Tuple[str, str, bool]
+
+
+def _find_font(configured: Optional[str], candidates: List[str]) -> Optional[str]:
+    if configured:
+        return configured
+    return next((path for path in candidates if os.path.exists(path)), None)
+
+
+def _load_font(path: Optional[str], size: int) -> ImageFont.FreeTypeFont:
+    if path:
+        return ImageFont.truetype(path, size)
+    return ImageFont.load_default(size=size)
+
+
+def _is_wide(char: str) -> bool:
+    return unicodedata.east_asian_width(char) in ("W", "F")
+
+
+class _ReportParser(HTMLParser):
+    """从报告 HTML 中提取 .terminal-body 内的段落、预排版文本和换行"""
+
+    def __init__(self):
+        super().__init__()
+        self.blocks: List[Tuple[str, List[Tuple[str, str, bool]]]] = []
+        self._depth = 0  # 在 .terminal-body 内的 div 嵌套深度
+        self._styles: List[Tuple[str, bool]] = []
+        self._block: Optional[List] = None
+
+    def handle_starttag(self, tag, attrs):
+        classes = (dict(attrs).get("class") or "").split()
+        if not self._depth:
+            if tag == "div" and "terminal-body" in classes:
+                self._depth = 1
+            return
+
+        if tag == "div":
+            self._depth += 1
+        elif tag in ("p", "pre"):
+            style = (GREEN, False)
+            if tag == "p":
+                style = CLASS_STYLES.get(classes[0] if classes else "", (GREY, False))
+            self._block = []
+            self.blocks.append((tag, self._block))
+            self._styles = [style]
+        elif tag == "br":
+            self.blocks.append(("br", []))
+        elif tag == "span":
+            if "cursor" in classes:
+                self.blocks.append(("cursor", []))
+            style = next((CLASS_STYLES[c] for c in classes if c in CLASS_STYLES), None)
+            self._styles.append(style or (self._styles[-1] if self._styles else (GREY, False)))
+
+    def handle_endtag(self, tag):
+        if not self._depth:
+            return
+        if tag == "div":
+            self._depth -= 1
+        elif tag in ("p", "pre"):
+            self._block = None
+        elif tag == "span" and len(self._styles) > 1:
+            self._styles.pop()
+
+    def handle_data(self, data):
+        if self._block is not None:
+            color, bold = self._styles[-1]
+            self._block.append((data, color, bold))
+
+
+def parse_report_blocks(html: str) -> List[Tuple[str, List[Cell]]]:
+    """
+    把报告 HTML 解析为待绘制的块
+
+    Args:
+        html: 报告 HTML 内容
+
+    Returns:
+        [(块类型 p/pre/br/cursor, 字符列表)]，段落中的空白按 HTML 规则折叠
+    """
+    parser = _ReportParser()
+    parser.feed(html)
+    parser.close()
+
+    blocks = []
+    for kind, segments in parser.blocks:
+        cells: List[Cell] = []
+        for text, color, bold in segments:
+            if kind == "p":
+                text = re.sub(r"\s+", " ", text)
+                if cells and cells[-1][0] == " " and text.startswith(" "):
+                    text = text[1:]
+            cells.extend((char, color, bold) for char in text)
+        if kind == "p":
+            while cells and cells[0][0] == " ":
+                cells.pop(0)
+            while cells and cells[-1][0] == " ":
+                cells.pop()
+        blocks.append((kind, cells))
+    return blocks
+
+
+class _GlyphAtlas:
+    """按字符缓存的字形位图（ASCII/制表符使用等宽字体，中文等宽字符使用中文字体）"""
+
+    def __init__(self, mono_path: Optional[str], cjk_path: Optional[str], size: int, line: int):
+        self.mono = _load_font(mono_path, size)
+        self.cjk = _load_font(cjk_path, size) if cjk_path else self.mono
+        self.size = size
+        self.line = line
+        ascent, descent = self.mono.getmetrics()
+        self.baseline = (line - ascent - descent) // 2 + ascent
+        self._glyphs: Dict[str, Tuple[Image.Image, int]] = {}
+
+    def glyph(self, char: str) -> Tuple[Image.Image, int]:
+        """返回字符的 (灰度位图, 前进宽度)"""
+        cached = self._glyphs.get(char)
+        if cached is None:
+            font = self.cjk if _is_wide(char) else self.mono
+            advance = max(1, round(font.getlength(char)))
+            mask = Image.new("L", (advance, self.line))
+            ImageDraw.Draw(mask).text((0, self.baseline), char, font=font, fill=255, anchor="ls")
+            cached = self._glyphs[char] = (mask, advance)
+        return cached
+
+    def advance(self, char: str) -> int:
+        return self.glyph(char)[1]
+
+
+class TerminalCardRenderer:
+    """用 Pillow 绘制终端风格的报告卡片"""
+
+    def __init__(self, scale: int = 2, font_path: str = None, cjk_font_path: str = None):
+        """
+        Args:
+            scale: 缩放倍数（对应浏览器截图的 device_scale_factor）
+            font_path: 等宽字体路径，默认自动查找
+            cjk_font_path: 中文字体路径，默认自动查找
+        """
+        self.scale = scale
+        self.fonts = (
+            _find_font(font_path, MONO_FONT_CANDIDATES),
+            _find_font(cjk_font_path, CJK_FONT_CANDIDATES),
+        )
+        if self.fonts[1] is None:
+            # 没有中文字体时中文会被绘制成方框，提前提示而不是静默生成无法阅读的图片
+            print(
+                "⚠️  未找到中文字体，报告中的中文将无法正常显示；"
+                "请通过 REPORT_CJK_FONT_PATH 指定字体文件（如 NotoSansCJK-Regular.ttc）"
+            )
+        self.atlas = _GlyphAtlas(
+            *self.fonts,
+            size=FONT_SIZE * scale,
+            line=round(LINE_HEIGHT * scale),
+        )
+        self._blocks: Dict[Tuple, Image.Image] = {}  # 预排版文本块（ASCII 艺术字）缓存
+
+    @property
+    def settings(self) -> Dict:
+        """影响输出图片的参数（用于图片缓存键）"""
+        return {
+            "renderer": "pillow",
+            "scale": self.scale,
+            "fonts": list(self.fonts),
+        }
+
+    def _px(self, value: float) -> int:
+        return round(value * self.scale)
+
+    def _wrap(self, cells: List[Cell], width: int) -> List[List[Cell]]:
+        """按像素宽度折行：英文在空格处断行，中文可在任意字符处断行"""
+        rows: List[List[Cell]] = []
+        for line in _split_lines(cells):
+            row: List[Cell] = []
+            row_width = 0
+            last_break = -1
+            for cell in line:
+                advance = self.atlas.advance(cell[0])
+                if row and row_width + advance > width:
+                    if 0 < last_break < len(row):
+                        rows.append(row[:last_break])
+                        row = row[last_break:]
+                    else:
+                        rows.append(row)
+                        row = []
+                    while row and row[0][0] == " ":
+                        row.pop(0)
+                    row_width = sum(self.atlas.advance(c[0]) for c in row)
+                    last_break = -1
+                row.append(cell)
+                row_width += advance
+                if cell[0] == " " or _is_wide(cell[0]):
+                    last_break = len(row)
+            rows.append(row)
+        return rows
+
+    def _draw_row(self, draw: ImageDraw.ImageDraw, row: List[Cell], x: int, y: int):
+        bold_offset = max(1, self.scale // 2)
+        for char, color, bold in row:
+            mask, advance = self.atlas.glyph(char)
+            if char != " ":
+                draw.bitmap((x, y), mask, fill=color)
+                if bold:
+                    draw.bitmap((x + bold_offset, y), mask, fill=color)
+            x += advance
+
+    def _pre_block(self, cells: List[Cell], width: int) -> Image.Image:
+        """绘制预排版文本块（同一类型的 ASCII 艺术字只绘制一次）"""
+        key = (tuple(cells), width)
+        block = self._blocks.get(key)
+        if block is None:
+            rows = self._wrap(cells, width)
+            block = Image.new("RGBA", (width, len(rows) * self.atlas.line), (0, 0, 0, 0))
+            draw = ImageDraw.Draw(block)
+            for i, row in enumerate(rows):
+                self._draw_row(draw, row, 0, i * self.atlas.line)
+            if len(self._blocks) > 64:
+                self._blocks.clear()
+            self._blocks[key] = block
+        return block
+
+    def render(self, html: str) -> Image.Image:
+        """
+        绘制报告卡片
+
+        Args:
+            html: 报告 HTML 内容
+
+        Returns:
+            RGB 图片
+        """
+        line = self.atlas.line
+        margin = self._px(BLOCK_MARGIN)
+        padding = self._px(BODY_PADDING)
+        content_width = self._px(CARD_WIDTH - 2 - 2 * BODY_PADDING)
+        header_height = self._px(HEADER_PADDING[0] * 2) + line
+
+        # 先排版，计算卡片高度
+        items = []  # (y, 行或图片)
+        y = padding
+        pending_margin = 0
+        for kind, cells in parse_report_blocks(html):
+            if kind in ("p", "pre"):
+                y += max(pending_margin, margin)
+                if kind == "pre":
+                    block = self._pre_block(cells, content_width)
+                    items.append((y, block))
+                    y += block.height
+                else:
+                    for row in self._wrap(cells, content_width):
+                        items.append((y, row))
+                        y += line
+                pending_margin = margin
+            else:
+                y += pending_margin
+                pending_margin = 0
+                if kind == "cursor":
+                    items.append((y, None))
+                y += line
+        body_height = max(y + pending_margin + padding, self._px(BODY_MIN_HEIGHT) + 2 * padding)
+
+        width = self._px(CARD_WIDTH)
+        height = self._px(2) + header_height + body_height
+        image = Image.new("RGB", (width, height), BLACK)
+        draw = ImageDraw.Draw(image)
+        radius = self._px(8)
+
+        # 卡片、标题栏与窗口按钮
+        draw.rounded_rectangle(
+            (0, 0, width - 1, height - 1), radius, fill=CARD_BACKGROUND,
+            outline=HEADER_BACKGROUND, width=self._px(1),
+        )
+        draw.rounded_rectangle(
+            (0, 0, width - 1, header_height), radius, fill=HEADER_BACKGROUND,
+            corners=(True, True, False, False),
+        )
+        title = [(c, GREY, True) for c in "mbti_analyzer"]
+        self._draw_row(draw, title, self._px(HEADER_PADDING[1]), self._px(HEADER_PADDING[0]))
+        button, gap = self._px(12), self._px(8)
+        button_y = (header_height - button) // 2
+        x = width - self._px(HEADER_PADDING[1]) - 3 * button - 2 * gap
+        for color in BUTTON_COLORS:
+            draw.ellipse((x, button_y, x + button, button_y + button), fill=color, outline=BLACK)
+            x += button + gap
+
+        # 正文
+        left = self._px(1) + padding
+        top = self._px(1) + header_height
+        for item_y, item in items:
+            if item is None:
+                cursor_height = self._px(19.2)  # 1.2em
+                cursor_top = top + item_y + (line - cursor_height) // 2
+                draw.rectangle(
+                    (left, cursor_top, left + self._px(10), cursor_top + cursor_height), fill=GREEN
+                )
+            elif isinstance(item, Image.Image):
+                image.paste(item, (left, top + item_y), item)
+            else:
+                self._draw_row(draw, item, left, top + item_y)
+
+        return image
+
+    def render_file(
+        self, html_path: str, output_path: str, options: Optional[RenderOptions] = None
+    ) -> str:
+        """
+        把报告文件绘制为图片
+
+        Args:
+            html_path: HTML 文件路径
+            output_path: 输出图片路径
+            options: 图片输出参数，默认为与缩放倍数一致的 PNG
+
+        Returns:
+            生成的图片路径
+        """
+        with open(html_path, "r", encoding="utf-8") as f:
+            image = self.render(f.read())
+        return save_image(image, output_path, options or RenderOptions(scale=self.scale))
+
+
+def _split_lines(cells: List[Cell]) -> Iterator[List[Cell]]:
+    line: List[Cell] = []
+    for cell in cells:
+        if cell[0] == "\n":
+            yield line
+            line = []
+        else:
+            line.append(cell)
+    yield line
+
+
+@lru_cache(maxsize=4)
+def get_card_renderer(scale: int = 2) -> TerminalCardRenderer:
+    """获取共享的渲染器（字形缓存在多次绘制之间复用），字体来自 config.render"""
+    render = get_config().render
+    return TerminalCardRenderer(scale, render.font_path, render.cjk_font_path)
+
+
+def render_report_image(
+    html_path: str, output_path: Optional[str] = None, options: Optional[RenderOptions] = None
+) -> str:
+    """
+    不使用浏览器，直接把报告绘制为图片
+
+    Args:
+        html_path: HTML 文件路径
+        output_path: 输出图片路径（可选，默认保存到 images 目录）
+        options: 图片输出参数，默认读取配置
+
+    Returns:
+        生成的图片路径
+
+    Raises:
+        FileNotFoundError: HTML 文件不存在
+    """
+    if not os.path.exists(html_path):
+        raise FileNotFoundError(f"HTML 文件不存在: {html_path}")
+
+    options = options or RenderOptions.from_config()
+    if output_path is None:
+        output_path = options.output_path_for(html_path, str(get_config().storage.images_dir))
+
+    renderer = get_card_renderer(options.scale)
+    key = image_cache_key(html_path, {**renderer.settings, **options.cache_settings()})
+    if fetch_cached_image(key, output_path):
+        ensure_thumbnail(output_path, options)
+        return output_path
+    renderer.render_file(html_path, output_path, options)
+    store_rendered_image(key, output_path)
+    return output_path
+
+
+def render_many(
+    html_paths: Iterable[str],
+    output_dir: Optional[str] = None,
+    options: Optional[RenderOptions] = None,
+) -> Iterator:
+    """
+    批量绘制报告，逐个返回结果（单个报告失败不会中断整批）
+
+    Yields:
+        ConversionResult
+    """
+    from .html_to_image import ConversionResult
+
+    options = options or RenderOptions.from_config()
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    for html_path in html_paths:
+        output_path = options.output_path_for(html_path, output_dir) if output_dir else None
+        try:
+            yield ConversionResult(html_path, render_report_image(html_path, output_path, options))
+        except Exception as e:
+            yield ConversionResult(html_path, error=str(e))
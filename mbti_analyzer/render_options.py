@@ -0,0 +1,154 @@
+"""
+图片输出参数
+控制报告图片的格式、质量、缩放倍数、调色板量化和缩略图，浏览器截图和 Pillow 绘制共用
+
+Pillow 在需要编码时才导入：浏览器截图直接保存 PNG 时不依赖 Pillow
+"""
+
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional
+
+from config import get_config
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+# 支持的输出格式：名称 -> (Pillow 格式, 扩展名)
+FORMATS = {
+    "png": ("PNG", ".png"),
+    "jpeg": ("JPEG", ".jpg"),
+    "webp": ("WEBP", ".webp"),
+}
+
+
+@dataclass(frozen=True)
+class RenderOptions:
+    """报告图片的输出参数"""
+    format: str = "png"
+    quality: int = 85  # JPEG / WebP 质量（1-100）
+    scale: int = 2  # 缩放倍数（对应 device_scale_factor）
+    palette_colors: int = 0  # PNG 调色板颜色数，0 表示不量化
+    thumbnail_width: int = 0  # 同时生成的缩略图宽度，0 表示不生成
+
+    def __post_init__(self):
+        if self.format not in FORMATS:
+            raise ValueError(f"不支持的图片格式: {self.format}（可选 {', '.join(FORMATS)}）")
+        if not 1 <= self.quality <= 100:
+            raise ValueError("quality 必须在 1-100 之间")
+        if self.scale <= 0:
+            raise ValueError("scale 必须大于 0")
+        if not 0 <= self.palette_colors <= 256:
+            raise ValueError("palette_colors 必须在 0-256 之间")
+
+    @classmethod
+    def from_config(cls, **overrides) -> "RenderOptions":
+        """
+        以 config.render 为默认值创建输出参数
+
+        Args:
+            **overrides: 需要覆盖的参数，值为 None 的参数使用配置值
+        """
+        render = get_config().render
+        values = {
+            "format": render.image_format,
+            "quality": render.image_quality,
+            "scale": render.image_scale,
+            "palette_colors": render.palette_colors,
+            "thumbnail_width": render.thumbnail_width,
+        }
+        values.update({key: value for key, value in overrides.items() if value is not None})
+        return cls(**values)
+
+    @property
+    def extension(self) -> str:
+        return FORMATS[self.format][1]
+
+    @property
+    def is_plain_png(self) -> bool:
+        """是否可以直接使用原始 PNG 数据（不需要任何后处理）"""
+        return self.format == "png" and not self.palette_colors and not self.thumbnail_width
+
+    def output_path_for(self, html_path: str, directory: str) -> str:
+        """根据报告文件名生成默认输出路径"""
+        return os.path.join(directory, f"{Path(html_path).stem}{self.extension}")
+
+    def cache_settings(self) -> Dict:
+        """影响输出内容的参数（用于图片缓存键）"""
+        return asdict(self)
+
+
+def thumbnail_path_for(output_path: str) -> str:
+    """缩略图路径：与原图同目录，文件名加 _thumb 后缀"""
+    root, ext = os.path.splitext(output_path)
+    return f"{root}_thumb{ext}"
+
+
+def _encode(image: "Image.Image", output_path: str, options: RenderOptions):
+    from PIL import Image
+
+    pil_format = FORMATS[options.format][0]
+    if options.format == "png":
+        if options.palette_colors and image.mode != "P":
+            # 终端主题只有少量颜色，量化为调色板图片可以大幅减小体积；不抖动以保持文字清晰
+            image = image.quantize(
+                options.palette_colors,
+                method=Image.Quantize.FASTOCTREE,
+                dither=Image.Dither.NONE,
+            )
+        image.save(output_path, pil_format, compress_level=1 if image.mode != "P" else 6)
+    else:
+        image.convert("RGB").save(output_path, pil_format, quality=options.quality)
+
+
+def save_image(
+    image: "Image.Image",
+    output_path: str,
+    options: RenderOptions,
+    source_scale: Optional[int] = None,
+) -> str:
+    """
+    按输出参数保存图片，需要时同时生成缩略图
+
+    Args:
+        image: 渲染得到的图片
+        output_path: 输出路径
+        options: 输出参数
+        source_scale: 图片实际的缩放倍数，与 options.scale 不同时重新采样
+
+    Returns:
+        输出路径
+    """
+    from PIL import Image
+
+    if image.mode not in ("RGB", "P"):
+        image = image.convert("RGB")
+    if source_scale and source_scale != options.scale:
+        ratio = options.scale / source_scale
+        size = (max(1, round(image.width * ratio)), max(1, round(image.height * ratio)))
+        image = image.resize(size, Image.Resampling.LANCZOS)
+
+    _encode(image, output_path, options)
+    if options.thumbnail_width:
+        _save_thumbnail(image, output_path, options)
+    return output_path
+
+
+def ensure_thumbnail(output_path: str, options: RenderOptions):
+    """图片来自缓存时补齐缩略图"""
+    if options.thumbnail_width and not os.path.exists(thumbnail_path_for(output_path)):
+        from PIL import Image
+
+        with Image.open(output_path) as image:
+            _save_thumbnail(image.convert("RGB"), output_path, options)
+
+
+def _save_thumbnail(image: "Image.Image", output_path: str, options: RenderOptions):
+    from PIL import Image
+
+    if image.mode == "P":
+        image = image.convert("RGB")
+    height = max(1, round(image.height * options.thumbnail_width / image.width))
+    thumbnail = image.resize((options.thumbnail_width, height), Image.Resampling.LANCZOS)
+    _encode(thumbnail, thumbnail_path_for(output_path), options)
@@ -4,45 +4,186 @@ HTML报告生成器
 """
 
 import os
+import re
+import sqlite3
 import sys
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterator, Optional, Tuple
 
 # 添加项目根目录到路径
 project_root = Path(__file__).parent.parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 
 from common.calculations import calculate_percentage
+from common.data.database import get_database
 from config import get_config
 
 
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "templates")
+REPORT_TEMPLATE = "terminal_report.html"
+
+DIMENSION_NAMES = {
+    "E_I": {"E": "外向 (Extraversion)", "I": "内向 (Introversion)"},
+    "S_N": {"S": "感觉 (Sensing)", "N": "直觉 (Intuition)"},
+    "T_F": {"T": "思考 (Thinking)", "F": "情感 (Feeling)"},
+    "J_P": {"J": "判断 (Judging)", "P": "感知 (Perceiving)"},
+}
+
+MBTI_DESCRIPTIONS = {
+    "INTJ": "建筑师 - 富有想象力的战略思想家",
+    "INTP": "逻辑学家 - 创新的发明家",
+    "ENTJ": "指挥官 - 大胆、有想象力的领导者",
+    "ENTP": "辩论家 - 聪明好奇的思想家",
+    "INFJ": "提倡者 - 安静而神秘的理想主义者",
+    "INFP": "调停者 - 诗意、善良的利他主义者",
+    "ENFJ": "主人公 - 有魅力、鼓舞人心的领导者",
+    "ENFP": "竞选者 - 热情、有创造力的自由精神",
+    "ISTJ": "物流师 - 实际、注重事实的管理者",
+    "ISFJ": "守卫者 - 专注、热心的保护者",
+    "ESTJ": "总经理 - 出色的管理者",
+    "ESFJ": "执政官 - 关怀他人、受欢迎的助人者",
+    "ISTP": "鉴赏家 - 大胆实际的实验家",
+    "ISFP": "探险家 - 灵活有魅力的艺术家",
+    "ESTP": "企业家 - 聪明、精力充沛的感知者",
+    "ESFP": "表演者 - 自发、精力充沛的享乐者",
+}
+
+# 每个字母的 6 行大字
+ASCII_LETTERS = {
+    "E": ["███████╗", "██╔════╝", "█████╗  ", "██╔══╝  ", "███████╗", "╚══════╝"],
+    "I": ["██╗", "██║", "██║", "██║", "██║", "╚═╝"],
+    "N": [
+        "███╗   ██╗",
+        "████╗  ██║",
+        "██╔██╗ ██║",
+        "██║╚██╗██║",
+        "██║ ╚████║",
+        "╚═╝  ╚═══╝",
+    ],
+    "S": ["███████╗", "██╔════╝", "███████╗", "╚════██║", "███████║", "╚══════╝"],
+    "T": ["████████╗", "╚══██╔══╝", "   ██║   ", "   ██║   ", "   ██║   ", "   ╚═╝   "],
+    "F": ["███████╗", "██╔════╝", "█████╗  ", "██╔══╝  ", "██║     ", "╚═╝     "],
+    "J": ["     ██╗", "     ██║", "     ██║", "██   ██║", "╚█████╔╝", " ╚════╝ "],
+    "P": ["██████╗ ", "██╔══██╗", "██████╔╝", "██╔═══╝ ", "██║     ", "╚═╝     "],
+}
+
+
+def mbti_dimension_name(dimension_type: str, dimension: str) -> str:
+    """
+    获取MBTI维度的中文名称
+
+    Args:
+        dimension_type: 维度类型（E/I/S/N/T/F/J/P）
+        dimension: 维度名称（E_I/S_N/T_F/J_P）
+
+    Returns:
+        中文名称
+    """
+    return DIMENSION_NAMES.get(dimension, {}).get(dimension_type, dimension_type)
+
+
+def progress_bar(percentage: int, dimension_type: str, dimension: str) -> str:
+    """
+    生成进度条
+
+    Args:
+        percentage: 百分比（50-100）
+        dimension_type: 当前维度类型（E/I/S/N/T/F/J/P）
+        dimension: 维度名称（E_I/S_N/T_F/J_P）
+
+    Returns:
+        进度条字符串
+    """
+    # 使用配置的进度条长度
+    total_length = 10
+    
+    # 直接将百分比转换为星号数量
+    # 80% = 8个星号，70% = 7个星号
+    filled = round(percentage * total_length / 100)
+    filled = max(0, min(filled, total_length))  # 确保在0-10范围内
+
+    # 生成进度条
+    return "*" * filled + "-" * (total_length - filled)
+
+
+@lru_cache(maxsize=64)
+def mbti_description(mbti_type: str) -> str:
+    """
+    获取MBTI类型的描述（按类型缓存）
+
+    Args:
+        mbti_type: MBTI类型
+
+    Returns:
+        类型描述
+    """
+    return MBTI_DESCRIPTIONS.get(mbti_type, "独特的人格类型")
+
+
+@lru_cache(maxsize=64)
+def mbti_ascii_art(mbti_type: str) -> str:
+    """
+    根据MBTI类型返回对应的ASCII艺术（按类型缓存）
+
+    Args:
+        mbti_type: MBTI类型
+
+    Returns:
+        ASCII艺术字符串
+    """
+    lines = [""] * 6
+    for letter in mbti_type.upper():
+        if letter in ASCII_LETTERS:
+            for i in range(6):
+                lines[i] += ASCII_LETTERS[letter][i] + "  "
+
+    return "\n".join(lines)
+
+
+@lru_cache(maxsize=1)
+def get_template_environment() -> Environment:
+    """
+    获取进程共享的 Jinja2 环境
+
+    模板在进程内只解析、编译一次；编译结果同时写入字节码缓存（系统临时目录），
+    新进程在模板未修改时直接加载字节码
+    """
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        bytecode_cache=FileSystemBytecodeCache(),
+        auto_reload=False,
+    )
+    env.filters["mbti_dimension_name"] = mbti_dimension_name
+    env.globals["progress_bar"] = progress_bar
+    return env
+
+
 class ReportGenerator:
     """HTML报告生成器"""
 
     def __init__(self):
         """初始化报告生成器"""
         config = get_config()
-        self.template_dir = os.path.join(os.path.dirname(__file__), "templates")
+        self.template_dir = TEMPLATE_DIR
         self.reports_dir = str(config.storage.reports_dir)
         self.config = config
         
         # 确保报告目录存在
         os.makedirs(self.reports_dir, exist_ok=True)
 
-        # 设置Jinja2环境
-        self.env = Environment(loader=FileSystemLoader(self.template_dir))
-        self.env.filters["mbti_dimension_name"] = self._mbti_dimension_name
-        self.env.globals["progress_bar"] = self._progress_bar
+        # 共享的Jinja2环境
+        self.env = get_template_environment()
 
-    def generate(
+    def render(
         self, username: str, mbti_result: Dict, stats: Dict = None, display_name: str = None
     ) -> str:
         """
-        生成HTML报告
+        渲染HTML报告内容（不写入文件）
 
         Args:
             username: Twitter用户名
@@ -51,26 +192,50 @@ class ReportGenerator:
             display_name: 用户显示名称
 
         Returns:
-            生成的HTML文件路径
+            HTML内容
         """
-        # 加载模板
-        template = self.env.get_template("terminal_report.html")
+        template = self.env.get_template(REPORT_TEMPLATE)
 
         # 准备模板数据
+        mbti_type = mbti_result["mbti_type"]
         context = {
             "username": username,
             "display_name": display_name or "",
-            "mbti_type": mbti_result["mbti_type"],
-            "mbti_description": self._get_mbti_description(mbti_result["mbti_type"]),
+            "mbti_type": mbti_type,
+            "mbti_description": mbti_description(mbti_type),
             "dimensions": mbti_result["dimensions"],
             "overall_analysis": mbti_result.get("overall_analysis", ""),
             "generated_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "ascii_art": self._get_mbti_ascii_art(mbti_result["mbti_type"]),
+            "ascii_art": mbti_ascii_art(mbti_type),
             "stats": stats or {"total_original": 0, "total_replies": 0},
         }
 
-        # 渲染HTML
-        html_content = template.render(**context)
+        return template.render(**context)
+
+    def generate(
+        self,
+        username: str,
+        mbti_result: Dict,
+        stats: Dict = None,
+        display_name: str = None,
+        save: bool = True,
+    ) -> str:
+        """
+        生成HTML报告
+
+        Args:
+            username: Twitter用户名
+            mbti_result: MBTI分析结果
+            stats: 统计信息
+            display_name: 用户显示名称
+            save: 是否保存到报告目录并写入统计索引；False 时直接返回HTML内容
+
+        Returns:
+            生成的HTML文件路径（save=False 时为HTML内容）
+        """
+        html_content = self.render(username, mbti_result, stats, display_name)
+        if not save:
+            return html_content
 
         # 保存报告
         filename = f"mbti_report_{username}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
@@ -79,116 +244,101 @@ class ReportGenerator:
         with open(output_path, "w", encoding="utf-8") as f:
             f.write(html_content)
 
-        return output_path
+        self._record_analysis(username, mbti_result, output_path)
 
-    def _mbti_dimension_name(self, dimension_type: str, dimension: str) -> str:
-        """
-        获取MBTI维度的中文名称
+        return output_path
 
-        Args:
-            dimension_type: 维度类型（E/I/S/N/T/F/J/P）
-            dimension: 维度名称（E_I/S_N/T_F/J_P）
+    def _record_analysis(self, username: str, mbti_result: Dict, report_path: str):
+        """把分析结果写入统计索引（失败不影响报告生成）"""
+        try:
+            database = get_database(self.config.storage.database_path)
+            database.record_analysis(username, mbti_result, report_path=report_path)
+        except sqlite3.Error as e:
+            print(f"    ✗ 分析结果未能写入数据库: {e}")
 
-        Returns:
-            中文名称
-        """
-        names = {
-            "E_I": {"E": "外向 (Extraversion)", "I": "内向 (Introversion)"},
-            "S_N": {"S": "感觉 (Sensing)", "N": "直觉 (Intuition)"},
-            "T_F": {"T": "思考 (Thinking)", "F": "情感 (Feeling)"},
-            "J_P": {"J": "判断 (Judging)", "P": "感知 (Perceiving)"},
-        }
-        return names.get(dimension, {}).get(dimension_type, dimension_type)
+    def _mbti_dimension_name(self, dimension_type: str, dimension: str) -> str:
+        """获取MBTI维度的中文名称"""
+        return mbti_dimension_name(dimension_type, dimension)
 
     def _progress_bar(self, percentage: int, dimension_type: str, dimension: str) -> str:
-        """
-        生成进度条
-
-        Args:
-            percentage: 百分比（50-100）
-            dimension_type: 当前维度类型（E/I/S/N/T/F/J/P）
-            dimension: 维度名称（E_I/S_N/T_F/J_P）
-
-        Returns:
-            进度条字符串
-        """
-        # 使用配置的进度条长度
-        total_length = 10
-        
-        # 直接将百分比转换为星号数量
-        # 80% = 8个星号，70% = 7个星号
-        filled = round(percentage * total_length / 100)
-        filled = max(0, min(filled, total_length))  # 确保在0-10范围内
-
-        # 生成进度条
-        return "*" * filled + "-" * (total_length - filled)
+        """生成进度条"""
+        return progress_bar(percentage, dimension_type, dimension)
 
     def _get_mbti_description(self, mbti_type: str) -> str:
-        """
-        获取MBTI类型的描述
-
-        Args:
-            mbti_type: MBTI类型
-
-        Returns:
-            类型描述
-        """
-        descriptions = {
-            "INTJ": "建筑师 - 富有想象力的战略思想家",
-            "INTP": "逻辑学家 - 创新的发明家",
-            "ENTJ": "指挥官 - 大胆、有想象力的领导者",
-            "ENTP": "辩论家 - 聪明好奇的思想家",
-            "INFJ": "提倡者 - 安静而神秘的理想主义者",
-            "INFP": "调停者 - 诗意、善良的利他主义者",
-            "ENFJ": "主人公 - 有魅力、鼓舞人心的领导者",
-            "ENFP": "竞选者 - 热情、有创造力的自由精神",
-            "ISTJ": "物流师 - 实际、注重事实的管理者",
-            "ISFJ": "守卫者 - 专注、热心的保护者",
-            "ESTJ": "总经理 - 出色的管理者",
-            "ESFJ": "执政官 - 关怀他人、受欢迎的助人者",
-            "ISTP": "鉴赏家 - 大胆实际的实验家",
-            "ISFP": "探险家 - 灵活有魅力的艺术家",
-            "ESTP": "企业家 - 聪明、精力充沛的感知者",
-            "ESFP": "表演者 - 自发、精力充沛的享乐者",
-        }
-        return descriptions.get(mbti_type, "独特的人格类型")
+        """获取MBTI类型的描述"""
+        return mbti_description(mbti_type)
 
     def _get_mbti_ascii_art(self, mbti_type: str) -> str:
-        """
-        根据MBTI类型返回对应的ASCII艺术
-
-        Args:
-            mbti_type: MBTI类型
-
-        Returns:
-            ASCII艺术字符串
-        """
-        # 生成大字的 MBTI 类型
-        mbti_upper = mbti_type.upper()
-
-        # 根据4个字母生成ASCII艺术
-        art_map = {
-            "E": ["███████╗", "██╔════╝", "█████╗  ", "██╔══╝  ", "███████╗", "╚══════╝"],
-            "I": ["██╗", "██║", "██║", "██║", "██║", "╚═╝"],
-            "N": [
-                "███╗   ██╗",
-                "████╗  ██║",
-                "██╔██╗ ██║",
-                "██║╚██╗██║",
-                "██║ ╚████║",
-                "╚═╝  ╚═══╝",
-            ],
-            "S": ["███████╗", "██╔════╝", "███████╗", "╚════██║", "███████║", "╚══════╝"],
-            "T": ["████████╗", "╚══██╔══╝", "   ██║   ", "   ██║   ", "   ██║   ", "   ╚═╝   "],
-            "F": ["███████╗", "██╔════╝", "█████╗  ", "██╔══╝  ", "██║     ", "╚═╝     "],
-            "J": ["     ██╗", "     ██║", "     ██║", "██   ██║", "╚█████╔╝", " ╚════╝ "],
-            "P": ["██████╗ ", "██╔══██╗", "██████╔╝", "██╔═══╝ ", "██║     ", "╚═╝     "],
-        }
-
-        lines = [""] * 6
-        for letter in mbti_upper:
-            if letter in art_map:
-                for i in range(6):
-                    lines[i] += art_map[letter][i] + "  "
-
-        return "\n".join(lines)
+        """根据MBTI类型返回对应的ASCII艺术"""
+        return mbti_ascii_art(mbti_type)
+
+
+# 报告文件名：mbti_report_<用户名>_<YYYYMMDD>_<HHMMSS>.html
+_REPORT_NAME_RE = re.compile(r"^mbti_report_(.+)_(\d{8}_\d{6})\.html$")
+_CONCLUSION_RE = re.compile(r"分析结论:.*?([A-Z]{4})")
+# 维度进度条行，例如 "[I] *******--- [E] (70%)"
+_DIMENSION_RE = re.compile(r"\[([A-Z])\] [*-]+ \[[A-Z]\] \((\d+(?:\.\d+)?)%\)")
+_DIMENSIONS = ("E_I", "S_N", "T_F", "J_P")
+
+
+def parse_report(report_path: str) -> Optional[Dict]:
+    """
+    从已生成的 HTML 报告中解析分析记录
+
+    Args:
+        report_path: 报告文件路径
+
+    Returns:
+        {"username", "mbti_result", "report_path", "created_at"}，无法识别时返回 None
+    """
+    name_match = _REPORT_NAME_RE.match(os.path.basename(report_path))
+    if not name_match:
+        return None
+
+    with open(report_path, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    mbti_match = _CONCLUSION_RE.search(content)
+    if not mbti_match:
+        return None
+
+    dimensions = {
+        dim: {"type": letter, "percentage": float(percentage)}
+        for dim, (letter, percentage) in zip(_DIMENSIONS, _DIMENSION_RE.findall(content))
+    }
+    return {
+        "username": name_match.group(1),
+        "mbti_result": {"mbti_type": mbti_match.group(1), "dimensions": dimensions},
+        "report_path": report_path,
+        "created_at": datetime.strptime(name_match.group(2), "%Y%m%d_%H%M%S"),
+    }
+
+
+def backfill_report_index(reports_dir: str = None) -> Tuple[int, int]:
+    """
+    把统计索引建立之前生成的 HTML 报告导入数据库（可重复运行，已导入的报告会被跳过）
+
+    Args:
+        reports_dir: 报告目录，默认使用配置中的目录
+
+    Returns:
+        (新导入的报告数, 无法识别的报告数)
+    """
+    config = get_config()
+    reports_dir = str(reports_dir or config.storage.reports_dir)
+    database = get_database(config.storage.database_path)
+    unrecognized = 0
+
+    def records() -> Iterator[Dict]:
+        nonlocal unrecognized
+        for entry in sorted(os.scandir(reports_dir), key=lambda e: e.name):
+            if not entry.name.endswith(".html") or database.has_report(entry.path):
+                continue
+            record = parse_report(entry.path)
+            if record is None:
+                unrecognized += 1
+            else:
+                yield record
+
+    imported = database.import_analyses(records())
+    return imported, unrecognized
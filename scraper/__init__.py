@@ -6,23 +6,52 @@ from .main import (
     save_to_csv,
     save_to_json,
     save_user_tweets,
+    scrape_many_users,
     scrape_popular_tweets,
     scrape_user_original_tweets,
     scrape_user_original_tweets_advanced,
+    scrape_user_original_tweets_incremental,
     scrape_user_replies_advanced,
+    scrape_user_replies_incremental,
+    scrape_user_timeline_advanced,
+    scrape_user_timeline_incremental,
     scrape_user_tweets,
+    scrape_user_tweets_incremental,
 )
-from .scraper import filter_tweets, sort_tweets
+from .async_scraper import (
+    gather_bounded,
+    scrape_user_original_tweets_advanced_async,
+    scrape_user_replies_advanced_async,
+    scrape_user_tweets_async,
+)
+from .client_pool import shutdown_async_client_pool, shutdown_client_pool
+from .scraper import filter_tweets, scrape_tweets_iter, scrape_with_search_iter, sort_tweets
+from .tweet_store import UserTweetStore
 
 __all__ = [
     "scrape_user_tweets",
     "scrape_user_original_tweets",
     "scrape_user_original_tweets_advanced",
     "scrape_user_replies_advanced",
+    "scrape_user_timeline_advanced",
+    "scrape_user_tweets_incremental",
+    "scrape_user_timeline_incremental",
+    "scrape_user_original_tweets_incremental",
+    "scrape_user_replies_incremental",
     "scrape_popular_tweets",
+    "scrape_many_users",
     "save_to_json",
     "save_to_csv",
     "save_user_tweets",
+    "UserTweetStore",
     "filter_tweets",
     "sort_tweets",
+    "scrape_tweets_iter",
+    "scrape_with_search_iter",
+    "shutdown_client_pool",
+    "shutdown_async_client_pool",
+    "scrape_user_tweets_async",
+    "scrape_user_original_tweets_advanced_async",
+    "scrape_user_replies_advanced_async",
+    "gather_bounded",
 ]
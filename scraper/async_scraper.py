@@ -0,0 +1,170 @@
+"""
+Twitter Scraper 异步后端
+基于 ApifyClientAsync 的异步抓取流程，适合在同一进程中并发运行大量分析
+
+同步接口（scraper.main）保持不变，两者共享输入构建、字段提取和数据验证逻辑
+"""
+
+import asyncio
+import weakref
+from typing import Awaitable, Dict, Iterable, List, TypeVar
+
+from .client_pool import get_async_pooled_client
+from .config import (
+    CONFIG,
+    DEFAULT_MAX_ITEMS,
+    MAX_CONCURRENT_RUNS,
+    ScraperConfig,
+    SearchQuery,
+    UserTweetsQuery,
+)
+from .error_handling import (
+    handle_api_errors_async,
+    retry_with_backoff_async,
+    validate_tweet_data,
+)
+from .scraper import (
+    build_search_input,
+    build_user_tweets_input,
+    extract_tweet_fields,
+    original_tweets_search_terms,
+    replies_search_terms,
+)
+
+T = TypeVar("T")
+
+# 事件循环 -> 限制同时运行的 actor 数量的信号量
+_run_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_run_semaphore() -> asyncio.Semaphore:
+    """获取当前事件循环的 actor 并发信号量"""
+    loop = asyncio.get_running_loop()
+    semaphore = _run_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_RUNS)
+        _run_semaphores[loop] = semaphore
+    return semaphore
+
+
+async def call_actor_async(input_data: Dict, config: ScraperConfig) -> List[Dict]:
+    """
+    异步执行一次 actor 运行并返回数据集内容
+
+    同一事件循环内最多同时运行 MAX_CONCURRENT_RUNS 个 actor；
+    协程被取消时会中止已经启动的 actor 运行，避免继续产生费用
+    """
+    client, actor = get_async_pooled_client(config)
+
+    async with _get_run_semaphore():
+        run = await actor.start(run_input=input_data)
+        run_client = client.run(run["id"])
+        try:
+            run = await run_client.wait_for_finish() or run
+        except asyncio.CancelledError:
+            # 中止远端运行后再把取消继续向上传播
+            try:
+                await asyncio.shield(run_client.abort())
+            except Exception:
+                pass
+            raise
+
+    return [item async for item in client.dataset(run["defaultDatasetId"]).iterate_items()]
+
+
+async def scrape_tweets_async(query: UserTweetsQuery, config: ScraperConfig) -> List[Dict]:
+    """
+    异步抓取用户推文
+
+    前置条件：query包含有效的用户名和数量
+    后置条件：返回格式化的推文列表
+    """
+    raw_tweets = await call_actor_async(build_user_tweets_input(query), config)
+    return list(map(extract_tweet_fields, raw_tweets))
+
+
+async def scrape_with_search_async(query: SearchQuery, config: ScraperConfig) -> List[Dict]:
+    """
+    异步使用搜索条件抓取推文
+
+    前置条件：query包含有效的搜索条件和数量
+    后置条件：返回格式化的推文列表
+    """
+    raw_tweets = await call_actor_async(build_search_input(query), config)
+    return list(map(extract_tweet_fields, raw_tweets))
+
+
+@retry_with_backoff_async(max_retries=3)
+@handle_api_errors_async
+async def scrape_user_tweets_async(
+    username: str, max_tweets: int = DEFAULT_MAX_ITEMS
+) -> List[Dict]:
+    """
+    异步抓取指定用户的推文（scrape_user_tweets 的异步版本）
+
+    Raises:
+        UserNotFoundError: 用户不存在
+        NoTweetsError: 用户无推文
+        RateLimitError: API限流
+        APIError: 其他API错误
+    """
+    query = UserTweetsQuery(username=username, max_items=max_tweets)
+    tweets = await scrape_tweets_async(query, CONFIG)
+
+    # 验证推文数据
+    return validate_tweet_data(tweets, username)
+
+
+async def scrape_user_original_tweets_advanced_async(
+    username: str, max_tweets: int = DEFAULT_MAX_ITEMS
+) -> List[Dict]:
+    """
+    异步使用高级搜索抓取用户的原创推文
+    """
+    query = SearchQuery(search_terms=original_tweets_search_terms(username), max_items=max_tweets)
+    return await scrape_with_search_async(query, CONFIG)
+
+
+async def scrape_user_replies_advanced_async(
+    username: str, max_tweets: int = DEFAULT_MAX_ITEMS
+) -> List[Dict]:
+    """
+    异步使用高级搜索抓取用户的回复推文
+    """
+    query = SearchQuery(search_terms=replies_search_terms(username), max_items=max_tweets)
+    return await scrape_with_search_async(query, CONFIG)
+
+
+async def gather_bounded(
+    awaitables: Iterable[Awaitable[T]], limit: int = MAX_CONCURRENT_RUNS
+) -> List[T]:
+    """
+    以有限并发运行一组协程，按输入顺序返回结果
+
+    任一协程失败时取消其余尚未完成的协程，然后抛出该异常；
+    gather_bounded 自身被取消时同样会取消全部子任务
+
+    Args:
+        awaitables: 协程列表
+        limit: 最大并发数
+
+    Returns:
+        结果列表
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(awaitable: Awaitable[T]) -> T:
+        async with semaphore:
+            return await awaitable
+
+    tasks = [asyncio.ensure_future(run(awaitable)) for awaitable in awaitables]
+    try:
+        return await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        # 等待被取消的任务真正结束（例如完成 actor 中止请求）
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,101 @@
+"""
+抓取结果缓存
+以 actor 输入的规范化哈希为键，把数据集原始条目以 JSON Lines 形式缓存到磁盘
+"""
+
+import json
+import threading
+from typing import Callable, Dict, Iterator, Optional
+
+from common.utils.disk_cache import DiskCache, make_cache_key
+
+from .config import CACHE_DIR, CACHE_ENABLED, CACHE_MAX_BYTES, CACHE_TTL_SECONDS
+from .error_handling import validate_api_response
+
+_cache: Optional[DiskCache] = None
+_cache_lock = threading.Lock()
+_enabled = CACHE_ENABLED
+
+
+def set_cache_enabled(enabled: bool):
+    """开启或关闭抓取缓存（CLI 的 --no-cache 使用）"""
+    global _enabled
+    _enabled = enabled
+
+
+def get_scrape_cache() -> Optional[DiskCache]:
+    """
+    获取进程级的抓取缓存
+
+    Returns:
+        缓存实例，缓存被关闭时返回 None
+    """
+    global _cache
+    if not _enabled:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = DiskCache(
+                    CACHE_DIR,
+                    ttl_seconds=CACHE_TTL_SECONDS,
+                    max_bytes=CACHE_MAX_BYTES,
+                    suffix=".jsonl",
+                )
+    return _cache
+
+
+def get_scrape_cache_stats() -> Dict[str, int]:
+    """获取抓取缓存的命中统计"""
+    cache = _cache
+    if cache is None:
+        return {"hits": 0, "misses": 0, "expired": 0, "writes": 0, "evictions": 0}
+    return cache.get_stats()
+
+
+def scrape_cache_key(actor_id: str, input_data: Dict) -> str:
+    """根据 actor 和输入生成缓存键"""
+    return make_cache_key(actor_id, input_data)
+
+
+def cached_items(
+    key: str, fetch: Callable[[], Iterator[Dict]], cache: Optional[DiskCache] = None
+) -> Iterator[Dict]:
+    """
+    带缓存地逐条产出数据集条目
+
+    命中时直接从缓存文件流式读取；未命中时边产出边写入缓存，
+    只有完整迭代结束且结果通过 validate_api_response 校验时才提交，
+    调用方提前停止则丢弃
+
+    Args:
+        key: 缓存键
+        fetch: 未命中时调用的远端迭代函数
+        cache: 缓存实例，默认使用进程级缓存
+    """
+    cache = cache or get_scrape_cache()
+    if cache is None:
+        yield from fetch()
+        return
+
+    path = cache.get_path(key)
+    if path is not None:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+
+    first_items = []
+    with cache.open_writer(key) as writer:
+        for item in fetch():
+            writer.write(json.dumps(item, ensure_ascii=False) + "\n")
+            if len(first_items) < 2:
+                first_items.append(item)
+            yield item
+
+    # 空结果、单条错误 / 限流信息或格式无效的条目可能是临时错误，不缓存，
+    # 否则重试会在缓存有效期内一直读到同一个失败结果
+    valid, _ = validate_api_response(first_items)
+    if not valid:
+        cache.discard(key)
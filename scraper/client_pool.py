@@ -0,0 +1,149 @@
+"""
+Apify 客户端连接池
+按 (api_token, actor_id) 复用进程级的 ApifyClient，避免每次调用都重新建立 HTTP 会话
+"""
+
+import asyncio
+import atexit
+import threading
+import weakref
+from typing import Any, Dict, Tuple
+
+from .config import ScraperConfig
+
+# (api_token, actor_id) -> (ApifyClient, ActorClient)
+_client_registry: Dict[Tuple[str, str], Tuple[Any, Any]] = {}
+_registry_lock = threading.Lock()
+
+# 事件循环 -> {(api_token, actor_id) -> (ApifyClientAsync, ActorClientAsync)}
+# 异步 HTTP 会话绑定在创建它的事件循环上，因此按循环分别缓存
+_async_client_registry: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _create_client(api_token: str) -> Any:
+    """创建新的 ApifyClient（底层 httpx 会话默认保持 keep-alive 连接）"""
+    from apify_client import ApifyClient
+
+    return ApifyClient(api_token)
+
+
+def _create_async_client(api_token: str) -> Any:
+    """创建新的 ApifyClientAsync"""
+    from apify_client import ApifyClientAsync
+
+    return ApifyClientAsync(api_token)
+
+
+def _registry_key(config: ScraperConfig) -> Tuple[str, str]:
+    return config["api_token"], config["actor_id"]
+
+
+def get_pooled_client(config: ScraperConfig) -> Tuple[Any, Any]:
+    """
+    获取共享的 Apify 客户端
+
+    同一个 (api_token, actor_id) 在整个进程中只创建一次客户端，
+    多线程并发获取时也只会创建一个实例
+
+    Args:
+        config: API 配置
+
+    Returns:
+        (ApifyClient, ActorClient) 元组
+    """
+    key = _registry_key(config)
+    entry = _client_registry.get(key)
+    if entry is not None:
+        return entry
+
+    with _registry_lock:
+        # 双重检查，避免并发时重复创建
+        entry = _client_registry.get(key)
+        if entry is None:
+            client = _create_client(config["api_token"])
+            entry = (client, client.actor(config["actor_id"]))
+            _client_registry[key] = entry
+
+    return entry
+
+
+def get_async_pooled_client(config: ScraperConfig) -> Tuple[Any, Any]:
+    """
+    获取当前事件循环共享的异步 Apify 客户端
+
+    必须在事件循环中调用；同一循环内相同配置复用一个客户端
+
+    Args:
+        config: API 配置
+
+    Returns:
+        (ApifyClientAsync, ActorClientAsync) 元组
+    """
+    loop = asyncio.get_running_loop()
+    clients = _async_client_registry.setdefault(loop, {})
+    key = _registry_key(config)
+    entry = clients.get(key)
+    if entry is None:
+        client = _create_async_client(config["api_token"])
+        entry = (client, client.actor(config["actor_id"]))
+        clients[key] = entry
+
+    return entry
+
+
+def _close_client(client: Any) -> None:
+    """关闭客户端持有的 HTTP 会话"""
+    http_client = getattr(client, "http_client", None)
+    httpx_client = getattr(http_client, "httpx_client", None)
+    close = getattr(httpx_client, "close", None)
+    if callable(close):
+        try:
+            close()
+        except Exception:
+            pass
+
+
+def shutdown_client_pool() -> int:
+    """
+    关闭并清空所有共享客户端
+
+    在进程退出时自动调用，批处理或服务模式也可以主动调用以释放连接
+
+    Returns:
+        关闭的客户端数量
+    """
+    with _registry_lock:
+        entries = list(_client_registry.values())
+        _client_registry.clear()
+
+    for client, _ in entries:
+        _close_client(client)
+
+    return len(entries)
+
+
+async def shutdown_async_client_pool() -> int:
+    """
+    关闭当前事件循环中的所有异步客户端
+
+    Returns:
+        关闭的客户端数量
+    """
+    clients = _async_client_registry.pop(asyncio.get_running_loop(), {})
+
+    for client, _ in clients.values():
+        http_client = getattr(client, "http_client", None)
+        httpx_client = getattr(http_client, "httpx_client", None)
+        aclose = getattr(httpx_client, "aclose", None)
+        if callable(aclose):
+            try:
+                await aclose()
+            except Exception:
+                pass
+
+    return len(clients)
+
+
+atexit.register(shutdown_client_pool)
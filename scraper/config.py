@@ -44,7 +44,26 @@ CONFIG = ScraperConfig(api_token=api_token, actor_id="apidojo/tweet-scraper")
 # 默认值
 DEFAULT_MAX_ITEMS = 100
 
+# 批量抓取时每次 actor 运行包含的用户数
+MULTI_HANDLE_CHUNK_SIZE = int(os.getenv("MULTI_HANDLE_CHUNK_SIZE", "50"))
+
+# 异步后端在同一事件循环中同时运行的 actor 数量上限
+MAX_CONCURRENT_RUNS = int(os.getenv("MAX_CONCURRENT_RUNS", "4"))
+
 # 数据保存路径
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "scraped_data")
 USER_TWEETS_DIR = os.path.join(DATA_DIR, "user_tweets")
+WATERMARKS_DIR = os.path.join(DATA_DIR, "watermarks")
+CACHE_DIR = os.path.join(DATA_DIR, "cache")
+
+# 推文与分析结果数据库（与 config.storage.database_path 默认指向同一个文件）
+DATABASE_ENABLED = os.getenv("USE_DATABASE", "true").lower() in ("1", "true", "yes")
+DATABASE_PATH = os.getenv(
+    "DATABASE_PATH", os.path.join(os.path.dirname(BASE_DIR), "data", "mbti.db")
+)
+
+# 抓取结果缓存（相同的 actor 输入在 TTL 内直接复用）
+CACHE_ENABLED = os.getenv("SCRAPE_CACHE", "true").lower() in ("1", "true", "yes")
+CACHE_TTL_SECONDS = int(os.getenv("SCRAPE_CACHE_TTL", "900"))
+CACHE_MAX_BYTES = int(os.getenv("SCRAPE_CACHE_MAX_MB", "200")) * 1024 * 1024
@@ -2,9 +2,10 @@
 错误处理和重试机制
 """
 
+import asyncio
 import time
 from functools import wraps
-from typing import Callable, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from common.exceptions import (
     APIError,
@@ -28,7 +29,8 @@ def validate_api_response(response: List[Dict]) -> Tuple[bool, Optional[str]]:
     # 检查是否包含错误信息
     if len(response) == 1:
         first_item = response[0]
-        if isinstance(first_item, dict):
+        # 原始响应是字典，提取后的推文是 Tweet 记录，两者都支持 get
+        if hasattr(first_item, "get"):
             # 检查常见的错误模式
             if first_item.get("error"):
                 error_msg = first_item.get("error", "Unknown error")
@@ -65,6 +67,70 @@ def check_user_exists(tweets: List[Dict], username: str) -> bool:
     return False
 
 
+class _RetryState:
+    """
+    一次带退避重试的调用状态
+
+    同步和异步重试装饰器共用：限流器检查、延迟计算和是否继续重试的判断都在这里，
+    装饰器只负责调用函数和等待（time.sleep 或 asyncio.sleep）
+    """
+
+    def __init__(
+        self,
+        max_retries: int,
+        initial_delay: float,
+        backoff_factor: float,
+        max_delay: float,
+        service_name: str,
+    ):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_delay = max_delay
+        self.delay = initial_delay
+        self.rate_limiter = get_rate_limiter(service_name)
+
+    @property
+    def attempts(self) -> range:
+        return range(self.max_retries + 1)
+
+    def wait_before_attempt(self) -> Optional[float]:
+        """检查限流器，返回发起请求前需要等待的秒数（不需要等待时返回 None）"""
+        can_request, wait_time = self.rate_limiter.can_make_request()
+        if not can_request and wait_time:
+            print(f"限流器：需要等待 {wait_time:.1f} 秒")
+            return wait_time
+        return None
+
+    def record_success(self):
+        self.rate_limiter.record_request(success=True)
+
+    def wait_after_error(self, error: Exception, attempt: int) -> Optional[float]:
+        """
+        记录一次失败，返回重试前需要等待的秒数
+
+        Returns:
+            等待秒数；已用完重试次数时返回 None，调用方应抛出该异常
+        """
+        if isinstance(error, RateLimitError):
+            # 记录限流
+            self.rate_limiter.record_rate_limit_hit(error.retry_after)
+            # 如果有明确的重试时间，使用它
+            wait_time = min(error.retry_after or self.delay, self.max_delay)
+            message = "API限流，"
+        else:
+            # 记录失败请求
+            self.rate_limiter.record_request(success=False)
+            wait_time = min(self.delay, self.max_delay)
+            message = f"API错误: {str(error)}，"
+
+        if attempt >= self.max_retries:
+            return None
+
+        print(f"{message}等待 {wait_time} 秒后重试 (尝试 {attempt + 1}/{self.max_retries})...")
+        self.delay *= self.backoff_factor
+        return wait_time
+
+
 def retry_with_backoff(
     max_retries: int = 3,
     initial_delay: float = 1.0,
@@ -85,59 +151,71 @@ def retry_with_backoff(
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs):
-            last_exception = None
-            delay = initial_delay
-            rate_limiter = get_rate_limiter(service_name)
-            
-            for attempt in range(max_retries + 1):
-                # 检查限流器
-                can_request, wait_time = rate_limiter.can_make_request()
-                if not can_request and wait_time:
-                    print(f"限流器：需要等待 {wait_time:.1f} 秒")
+            state = _RetryState(max_retries, initial_delay, backoff_factor, max_delay, service_name)
+
+            for attempt in state.attempts:
+                wait_time = state.wait_before_attempt()
+                if wait_time:
                     time.sleep(wait_time)
-                
+
                 try:
                     result = func(*args, **kwargs)
-                    # 记录成功请求
-                    rate_limiter.record_request(success=True)
+                except Exception as e:
+                    wait_time = state.wait_after_error(e, attempt)
+                    if wait_time is None:
+                        # 所有重试都失败
+                        raise
+                    time.sleep(wait_time)
+                else:
+                    state.record_success()
                     return result
-                except RateLimitError as e:
-                    # 记录限流
-                    rate_limiter.record_rate_limit_hit(e.retry_after)
-                    last_exception = e
-                    # 如果有明确的重试时间，使用它
-                    if e.retry_after:
-                        wait_time = min(e.retry_after, max_delay)
-                    else:
-                        wait_time = min(delay, max_delay)
-                    
-                    if attempt < max_retries:
-                        print(f"API限流，等待 {wait_time} 秒后重试 (尝试 {attempt + 1}/{max_retries})...")
-                        time.sleep(wait_time)
-                        delay *= backoff_factor
-                except (APIError, Exception) as e:
-                    last_exception = e
-                    # 记录失败请求
-                    rate_limiter.record_request(success=False)
-                    
-                    if attempt < max_retries:
-                        wait_time = min(delay, max_delay)
-                        print(f"API错误: {str(e)}，等待 {wait_time} 秒后重试 (尝试 {attempt + 1}/{max_retries})...")
-                        time.sleep(wait_time)
-                        delay *= backoff_factor
-                    else:
-                        break
-            
-            # 所有重试都失败
-            if last_exception:
-                raise last_exception
-            else:
-                raise APIError(f"Failed after {max_retries} retries")
-        
+
+            raise APIError(f"Failed after {max_retries} retries")
+
         return wrapper
     return decorator
 
 
+def check_api_result(result: Any) -> Any:
+    """
+    校验API调用结果，无效时抛出对应的异常
+
+    Raises:
+        UserNotFoundError: 用户不存在
+        RateLimitError: API限流
+        APIError: 其他API错误
+    """
+    if isinstance(result, list):
+        valid, error_msg = validate_api_response(result)
+        if not valid:
+            if "User not found" in error_msg:
+                raise UserNotFoundError(error_msg)
+            elif "Rate limit" in error_msg:
+                raise RateLimitError(error_msg)
+            else:
+                raise APIError(error_msg)
+
+    return result
+
+
+def translate_api_exception(e: Exception) -> Exception:
+    """
+    把底层异常转换为项目的异常类型
+
+    Returns:
+        转换后的异常；无法识别时返回原异常
+    """
+    error_str = str(e).lower()
+    if "rate limit" in error_str or "429" in error_str:
+        return RateLimitError(f"API rate limit exceeded: {str(e)}")
+    elif "user not found" in error_str or "does not exist" in error_str:
+        return UserNotFoundError(f"User not found: {str(e)}")
+    elif "timeout" in error_str:
+        return APIError(f"API timeout: {str(e)}")
+    else:
+        return e
+
+
 def handle_api_errors(func: Callable) -> Callable:
     """
     API错误处理装饰器
@@ -145,36 +223,82 @@ def handle_api_errors(func: Callable) -> Callable:
     @wraps(func)
     def wrapper(*args, **kwargs):
         try:
-            result = func(*args, **kwargs)
-            
-            # 验证响应
-            if isinstance(result, list):
-                valid, error_msg = validate_api_response(result)
-                if not valid:
-                    if "User not found" in error_msg:
-                        raise UserNotFoundError(error_msg)
-                    elif "Rate limit" in error_msg:
-                        raise RateLimitError(error_msg)
-                    else:
-                        raise APIError(error_msg)
-            
-            return result
-            
+            return check_api_result(func(*args, **kwargs))
         except Exception as e:
             # 转换常见的错误类型
-            error_str = str(e).lower()
-            if "rate limit" in error_str or "429" in error_str:
-                raise RateLimitError(f"API rate limit exceeded: {str(e)}")
-            elif "user not found" in error_str or "does not exist" in error_str:
-                raise UserNotFoundError(f"User not found: {str(e)}")
-            elif "timeout" in error_str:
-                raise APIError(f"API timeout: {str(e)}")
-            else:
+            translated = translate_api_exception(e)
+            if translated is e:
                 raise
-    
+            raise translated
+
     return wrapper
 
 
+def handle_api_errors_async(func: Callable) -> Callable:
+    """
+    API错误处理装饰器（异步版本）
+    """
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            return check_api_result(await func(*args, **kwargs))
+        except Exception as e:
+            # 转换常见的错误类型
+            translated = translate_api_exception(e)
+            if translated is e:
+                raise
+            raise translated
+
+    return wrapper
+
+
+def retry_with_backoff_async(
+    max_retries: int = 3,
+    initial_delay: float = 1.0,
+    backoff_factor: float = 2.0,
+    max_delay: float = 60.0,
+    service_name: str = "apify"
+) -> Callable:
+    """
+    带指数退避的重试装饰器（异步版本）
+
+    等待使用 asyncio.sleep，不会阻塞事件循环；任务被取消时立即退出，不再重试
+
+    Args:
+        max_retries: 最大重试次数
+        initial_delay: 初始延迟（秒）
+        backoff_factor: 退避因子
+        max_delay: 最大延迟（秒）
+        service_name: 服务名称（用于限流器）
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            state = _RetryState(max_retries, initial_delay, backoff_factor, max_delay, service_name)
+
+            for attempt in state.attempts:
+                wait_time = state.wait_before_attempt()
+                if wait_time:
+                    await asyncio.sleep(wait_time)
+
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as e:
+                    wait_time = state.wait_after_error(e, attempt)
+                    if wait_time is None:
+                        # 所有重试都失败
+                        raise
+                    await asyncio.sleep(wait_time)
+                else:
+                    state.record_success()
+                    return result
+
+            raise APIError(f"Failed after {max_retries} retries")
+
+        return wrapper
+    return decorator
+
+
 def validate_tweet_data(tweets: List[Dict], username: str) -> List[Dict]:
     """
     验证推文数据的完整性和有效性
@@ -0,0 +1,227 @@
+"""
+增量抓取
+按用户记录已抓取推文的高水位（最新推文 id / 时间），后续只抓取更新的推文并按 id 合并
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from common.data.tweet import Tweet, parse_created_at, tweet_sort_key
+
+from .config import CONFIG, USER_TWEETS_DIR, WATERMARKS_DIR, SearchQuery
+from .error_handling import (
+    check_api_result,
+    retry_with_backoff,
+    translate_api_exception,
+    validate_tweet_data,
+)
+from .scraper import scrape_with_search
+from .tweet_store import UserTweetStore
+
+
+def merge_tweets(existing: List[Dict], new: List[Dict]) -> List[Dict]:
+    """
+    按 id 合并推文，新数据覆盖旧数据（互动数会更新），结果按从新到旧排序
+
+    Args:
+        existing: 已存储的推文
+        new: 新抓取的推文
+
+    Returns:
+        合并后的推文列表
+    """
+    merged = {}
+    anonymous = []
+    for tweet in list(existing) + list(new):
+        tweet_id = tweet.get("id")
+        if tweet_id:
+            merged[str(tweet_id)] = tweet
+        else:
+            anonymous.append(tweet)
+    return sorted(list(merged.values()) + anonymous, key=tweet_sort_key, reverse=True)
+
+
+def _watermark_path(username: str, kind: str) -> str:
+    return os.path.join(WATERMARKS_DIR, f"{username.lower()}.{kind}.json")
+
+
+def _legacy_corpus_path(username: str, kind: str) -> str:
+    return os.path.join(USER_TWEETS_DIR, username, f"{username}_{kind}_corpus.json")
+
+
+def _corpus_store(username: str, kind: str) -> UserTweetStore:
+    """获取语料对应的推文库，并把旧版整文件 JSON 语料迁移进去"""
+    store = UserTweetStore(username, kind, root=USER_TWEETS_DIR)
+    legacy_path = _legacy_corpus_path(username, kind)
+    if os.path.exists(legacy_path):
+        try:
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                store.append(json.load(f))
+            os.remove(legacy_path)
+        except (OSError, ValueError, TypeError):
+            pass
+    return store
+
+
+def load_watermark(username: str, kind: str = "timeline") -> Optional[Dict]:
+    """
+    读取用户的高水位标记
+
+    Returns:
+        {"newest_id", "newest_created_at", "count", "exhausted", "updated_at"}，不存在时返回 None
+    """
+    path = _watermark_path(username, kind)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_watermark(
+    username: str, tweets: List[Dict], kind: str = "timeline", exhausted: bool = False
+) -> Optional[Dict]:
+    """
+    根据推文列表更新高水位标记
+
+    Args:
+        username: Twitter用户名
+        tweets: 已存储的全部推文
+        kind: 语料类别
+        exhausted: 全量抓取时是否已取尽该用户的全部推文
+
+    Returns:
+        新的标记，推文为空时不写入并返回 None
+    """
+    if not tweets:
+        return None
+
+    newest = max(tweets, key=tweet_sort_key)
+    watermark = {
+        "newest_id": str(newest.get("id", "")),
+        "newest_created_at": newest.get("created_at", ""),
+        "count": len(tweets),
+        "exhausted": exhausted,
+        "updated_at": datetime.now().isoformat(timespec="seconds"),
+    }
+
+    os.makedirs(WATERMARKS_DIR, exist_ok=True)
+    path = _watermark_path(username, kind)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(watermark, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+    return watermark
+
+
+def load_corpus(username: str, kind: str = "timeline") -> List[Tweet]:
+    """读取已存储的推文语料（从新到旧），不存在时返回空列表"""
+    return _corpus_store(username, kind).read_all()
+
+
+def save_corpus(username: str, tweets: Iterable[Dict], kind: str = "timeline") -> str:
+    """把语料中尚未存储的推文追加到推文库，返回推文库文件路径"""
+    store = _corpus_store(username, kind)
+    store.append(tweets)
+    return store.data_path
+
+
+def since_search_terms(base_terms: str, watermark: Dict) -> str:
+    """
+    在搜索语句后追加增量条件
+
+    优先使用 since_id（精确）；id 不是数字时退回到按日期的 since:（可能有重叠，合并时按 id 去重）
+    """
+    newest_id = watermark.get("newest_id", "")
+    if newest_id.isdigit():
+        return f"{base_terms} since_id:{newest_id}"
+
+    created = parse_created_at(watermark.get("newest_created_at", ""))
+    if created:
+        return f"{base_terms} since:{created.strftime('%Y-%m-%d')}"
+
+    return base_terms
+
+
+@retry_with_backoff(max_retries=3)
+def fetch_since(username: str, query: SearchQuery) -> List[Dict]:
+    """
+    搜索比高水位更新的推文
+
+    与全量抓取使用相同的错误处理和数据校验：错误响应转换为对应的异常并重试，
+    没有正文的条目被丢弃。没有新推文是正常情况，返回空列表
+
+    Args:
+        username: Twitter用户名（不带@）
+        query: 带增量条件的搜索查询
+
+    Returns:
+        新推文列表
+    """
+    try:
+        tweets = scrape_with_search(query, CONFIG)
+    except Exception as e:
+        translated = translate_api_exception(e)
+        if translated is e:
+            raise
+        raise translated
+
+    if not tweets:
+        return []
+    return validate_tweet_data(check_api_result(tweets), username)
+
+
+def scrape_incremental(
+    username: str,
+    max_tweets: int,
+    base_terms: str,
+    fetch_full: Callable[[str, int], List[Dict]],
+    kind: str = "timeline",
+) -> Tuple[List[Dict], int]:
+    """
+    增量抓取用户推文
+
+    有高水位且已存储的语料足够（或此前已取尽该用户的全部推文）时，
+    只搜索比标记更新的推文并合并到语料中；否则调用 fetch_full 全量抓取。
+    两种情况都会更新语料和高水位；抓取出错时异常原样抛出，语料和高水位保持不变。
+
+    Args:
+        username: Twitter用户名（不带@）
+        max_tweets: 需要返回的推文数量
+        base_terms: 增量搜索使用的基础搜索语句
+        fetch_full: 全量抓取函数 (username, max_tweets) -> 推文列表
+        kind: 语料类别（不同的抓取范围分别记录）
+
+    Returns:
+        (最新的 max_tweets 条推文, 本次新增的推文数量)
+    """
+    watermark = load_watermark(username, kind)
+    corpus = load_corpus(username, kind) if watermark else []
+
+    if watermark and (len(corpus) >= max_tweets or watermark.get("exhausted")):
+        query = SearchQuery(
+            search_terms=since_search_terms(base_terms, watermark), max_items=max_tweets
+        )
+        fetched = fetch_since(username, query)
+        exhausted = bool(watermark.get("exhausted"))
+    else:
+        fetched = fetch_full(username, max_tweets)
+        exhausted = len(fetched) < max_tweets
+
+    # 没有 id 的条目无法去重，也不是有效的推文，不写入语料
+    fetched = [t for t in fetched if t.get("id")]
+    known_ids = {str(t.get("id")) for t in corpus if t.get("id")}
+    new_count = sum(1 for t in fetched if str(t.get("id")) not in known_ids)
+
+    merged = merge_tweets(corpus, fetched)
+    if merged:
+        # 推文库只追加，已存储的推文不会被重写
+        save_corpus(username, fetched, kind)
+        save_watermark(username, merged, kind, exhausted)
+
+    return merged[:max_tweets], new_count
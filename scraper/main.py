@@ -7,8 +7,11 @@ import csv
 import json
 import os
 from datetime import datetime
-from typing import Dict, List
+from itertools import chain, islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
+from common.data.database import INSERT_BATCH_SIZE, get_database
+from common.data.tweet import tweet_to_dict
 from common.exceptions import (
     NoTweetsError,
     UserNotFoundError,
@@ -16,17 +19,35 @@ from common.exceptions import (
 from .config import (
     CONFIG,
     DATA_DIR,
+    DATABASE_ENABLED,
+    DATABASE_PATH,
     DEFAULT_MAX_ITEMS,
+    MULTI_HANDLE_CHUNK_SIZE,
     USER_TWEETS_DIR,
     SearchQuery,
     UserTweetsQuery,
 )
+from .incremental import scrape_incremental
 from .error_handling import (
+    check_api_result,
     handle_api_errors,
     retry_with_backoff,
     validate_tweet_data,
 )
-from .scraper import filter_tweets, scrape_tweets, scrape_with_search, sort_tweets
+from .scraper import (
+    build_multi_user_tweets_input,
+    create_api_iterator,
+    demux_by_author,
+    extract_tweet_fields,
+    filter_tweets,
+    original_tweets_search_terms,
+    replies_search_terms,
+    scrape_tweets,
+    scrape_with_search,
+    sort_tweets,
+    timeline_search_terms,
+)
+from .tweet_store import UserTweetStore
 
 
 @retry_with_backoff(max_retries=3)
@@ -55,6 +76,70 @@ def scrape_user_tweets(username: str, max_tweets: int = DEFAULT_MAX_ITEMS) -> Li
     return validate_tweet_data(tweets, username)
 
 
+@retry_with_backoff(max_retries=3)
+@handle_api_errors
+def scrape_handle_chunk(usernames: List[str], max_per_user: int) -> Dict[str, List[Dict]]:
+    """
+    用一次 actor 运行抓取一组用户的推文，并按作者拆分
+
+    Args:
+        usernames: 一组用户名（不超过 actor 单次支持的数量）
+        max_per_user: 每个用户的推文数量
+
+    Returns:
+        用户名 -> 推文列表
+
+    Raises:
+        RateLimitError: API限流
+        APIError: actor 返回错误响应（不会被当作各用户都没有推文）
+    """
+    input_data = build_multi_user_tweets_input(usernames, max_per_user * len(usernames))
+    raw_tweets = iter(create_api_iterator(CONFIG)(input_data))
+    # 先取出前两条检查是否为错误响应，再与剩余结果一起按作者拆分
+    head = list(islice(raw_tweets, 2))
+    if head:
+        check_api_result(head)
+    tweets = map(extract_tweet_fields, chain(head, raw_tweets))
+    return demux_by_author(tweets, usernames, max_per_user)
+
+
+def scrape_many_users(
+    usernames: List[str],
+    max_per_user: int = DEFAULT_MAX_ITEMS,
+    chunk_size: int = MULTI_HANDLE_CHUNK_SIZE,
+) -> Dict[str, List[Dict]]:
+    """
+    批量抓取多个用户的推文
+
+    把用户按 chunk_size 分组，每组只运行一次 actor（twitterHandles 传入整组用户），
+    再按作者把结果拆分到各个用户。
+
+    注意：每组的 maxItems 为 max_per_user × 组内人数，actor 按时间返回最新推文，
+    发推频繁的用户可能占用更多名额，个别用户得到的推文可能少于 max_per_user。
+
+    Args:
+        usernames: 用户名列表（不带@，重复项按不区分大小写去重）
+        max_per_user: 每个用户的推文数量
+        chunk_size: 每次 actor 运行包含的用户数
+
+    Returns:
+        用户名 -> 推文列表（没有抓到推文的用户对应空列表）
+    """
+    seen = set()
+    unique = []
+    for username in usernames:
+        if username.lower() not in seen:
+            seen.add(username.lower())
+            unique.append(username)
+
+    results: Dict[str, List[Dict]] = {}
+    for start in range(0, len(unique), chunk_size):
+        chunk = unique[start : start + chunk_size]
+        results.update(scrape_handle_chunk(chunk, max_per_user))
+
+    return results
+
+
 def scrape_user_original_tweets(username: str, max_tweets: int = DEFAULT_MAX_ITEMS) -> List[Dict]:
     """
     只抓取用户的原创推文（排除转发和回复）
@@ -73,13 +158,7 @@ def scrape_user_original_tweets_advanced(
 
     使用 searchTerms 参数，在 API 层面就过滤掉转发，提高效率
     """
-    # 使用 Twitter 高级搜索语法
-    # from:username - 来自特定用户
-    # -filter:nativeretweets - 排除转发
-    # -filter:replies - 排除回复
-    search_terms = f"from:{username} -filter:nativeretweets -filter:replies"
-
-    query = SearchQuery(search_terms=search_terms, max_items=max_tweets)
+    query = SearchQuery(search_terms=original_tweets_search_terms(username), max_items=max_tweets)
     return scrape_with_search(query, CONFIG)
 
 
@@ -89,15 +168,105 @@ def scrape_user_replies_advanced(username: str, max_tweets: int = DEFAULT_MAX_IT
 
     使用 searchTerms 参数，在 API 层面就筛选回复
     """
-    # 使用 Twitter 高级搜索语法
-    # from:username - 来自特定用户
-    # filter:replies - 只获取回复
-    search_terms = f"from:{username} filter:replies"
+    query = SearchQuery(search_terms=replies_search_terms(username), max_items=max_tweets)
+    return scrape_with_search(query, CONFIG)
+
+
+def scrape_user_timeline_advanced(
+    username: str, max_tweets: int = DEFAULT_MAX_ITEMS
+) -> List[Dict]:
+    """
+    使用高级搜索功能一次性抓取用户的原创推文和回复（排除转发）
 
-    query = SearchQuery(search_terms=search_terms, max_items=max_tweets)
+    结果中的 is_reply / is_retweet 字段可用于在本地区分原创和回复，
+    一次 actor 运行即可替代分别搜索原创和回复的两次运行
+    """
+    query = SearchQuery(search_terms=timeline_search_terms(username), max_items=max_tweets)
     return scrape_with_search(query, CONFIG)
 
 
+def scrape_user_tweets_incremental(
+    username: str, max_tweets: int = DEFAULT_MAX_ITEMS
+) -> Tuple[List[Dict], int]:
+    """
+    增量抓取用户推文
+
+    首次抓取与 scrape_user_tweets 相同；之后只抓取比上次最新推文更新的部分，
+    并按 id 合并到本地语料中
+
+    Returns:
+        (最新的 max_tweets 条推文, 本次新增的推文数量)
+    """
+    # 搜索默认不包含转发，加上 include:nativeretweets 与时间线抓取保持一致
+    return scrape_incremental(
+        username,
+        max_tweets,
+        base_terms=f"from:{username} include:nativeretweets",
+        fetch_full=scrape_user_tweets,
+        kind="timeline",
+    )
+
+
+def scrape_user_timeline_incremental(
+    username: str, max_tweets: int = DEFAULT_MAX_ITEMS
+) -> Tuple[List[Dict], int]:
+    """
+    增量抓取用户的原创推文和回复（排除转发）
+
+    scrape_user_timeline_advanced 的增量版本，供单次搜索收集模式使用
+
+    Returns:
+        (最新的 max_tweets 条推文, 本次新增的推文数量)
+    """
+    return scrape_incremental(
+        username,
+        max_tweets,
+        base_terms=timeline_search_terms(username),
+        fetch_full=scrape_user_timeline_advanced,
+        kind="no_retweets",
+    )
+
+
+def scrape_user_original_tweets_incremental(
+    username: str, max_tweets: int = DEFAULT_MAX_ITEMS
+) -> Tuple[List[Dict], int]:
+    """
+    增量抓取用户的原创推文
+
+    scrape_user_original_tweets_advanced 的增量版本，供分别搜索（split）收集模式使用
+
+    Returns:
+        (最新的 max_tweets 条推文, 本次新增的推文数量)
+    """
+    return scrape_incremental(
+        username,
+        max_tweets,
+        base_terms=original_tweets_search_terms(username),
+        fetch_full=scrape_user_original_tweets_advanced,
+        kind="original",
+    )
+
+
+def scrape_user_replies_incremental(
+    username: str, max_tweets: int = DEFAULT_MAX_ITEMS
+) -> Tuple[List[Dict], int]:
+    """
+    增量抓取用户的回复推文
+
+    scrape_user_replies_advanced 的增量版本，供分别搜索（split）收集模式使用
+
+    Returns:
+        (最新的 max_tweets 条推文, 本次新增的推文数量)
+    """
+    return scrape_incremental(
+        username,
+        max_tweets,
+        base_terms=replies_search_terms(username),
+        fetch_full=scrape_user_replies_advanced,
+        kind="replies",
+    )
+
+
 def scrape_popular_tweets(
     username: str, max_tweets: int = DEFAULT_MAX_ITEMS, min_likes: int = 100
 ) -> List[Dict]:
@@ -131,12 +300,74 @@ def generate_filename(prefix: str, extension: str) -> str:
     return f"{prefix}_{timestamp}.{extension}"
 
 
-def save_to_json(tweets: List[Dict], filename: str = None, auto_dir: bool = True) -> str:
+# CSV 中保存的字段
+CSV_FIELDS = ["created_at", "author", "text", "likes", "retweets", "replies", "url"]
+
+
+def resolve_output_path(filename: str, auto_dir: bool) -> str:
+    """
+    解析输出文件路径
+
+    相对路径在 auto_dir 为真时放到默认数据目录下
+    """
+    if auto_dir and not os.path.isabs(filename):
+        directory = ensure_data_directory(DATA_DIR)
+        return os.path.join(directory, filename)
+    return filename
+
+
+def write_tweets(
+    tweets: Iterable[Dict], json_path: Optional[str] = None, csv_path: Optional[str] = None
+) -> int:
+    """
+    单次遍历把推文流写入 JSON 和/或 CSV 文件
+
+    逐条写入，内存占用与推文总数无关；JSON 输出与 json.dump(indent=2) 格式一致
+
+    Args:
+        tweets: 推文列表或生成器
+        json_path: JSON 输出路径（可选）
+        csv_path: CSV 输出路径（可选）
+
+    Returns:
+        写入的推文数量
+    """
+    json_file = open(json_path, "w", encoding="utf-8") if json_path else None
+    csv_file = open(csv_path, "w", encoding="utf-8", newline="") if csv_path else None
+    count = 0
+
+    try:
+        writer = None
+        if csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+
+        for tweet in tweets:
+            if json_file:
+                item = json.dumps(tweet_to_dict(tweet), ensure_ascii=False, indent=2)
+                item = item.replace("\n", "\n  ")
+                json_file.write(("[\n  " if count == 0 else ",\n  ") + item)
+            if writer:
+                writer.writerow(tweet)
+            count += 1
+
+        if json_file:
+            json_file.write("\n]" if count else "[]")
+    finally:
+        if json_file:
+            json_file.close()
+        if csv_file:
+            csv_file.close()
+
+    return count
+
+
+def save_to_json(tweets: Iterable[Dict], filename: str = None, auto_dir: bool = True) -> str:
     """
     将推文保存到JSON文件
 
     Args:
-        tweets: 推文列表
+        tweets: 推文列表或生成器（生成器会被增量消费）
         filename: 自定义文件名（可选）
         auto_dir: 是否自动使用数据目录
 
@@ -147,68 +378,83 @@ def save_to_json(tweets: List[Dict], filename: str = None, auto_dir: bool = True
         # 自动生成文件名
         filename = generate_filename("tweets", "json")
 
-    if auto_dir and not os.path.isabs(filename):
-        # 使用默认数据目录
-        directory = ensure_data_directory(DATA_DIR)
-        filepath = os.path.join(directory, filename)
-    else:
-        filepath = filename
-
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(tweets, f, ensure_ascii=False, indent=2)
+    filepath = resolve_output_path(filename, auto_dir)
+    write_tweets(tweets, json_path=filepath)
 
     return filepath
 
 
-def save_to_csv(tweets: List[Dict], filename: str = None, auto_dir: bool = True) -> str:
+def save_to_csv(tweets: Iterable[Dict], filename: str = None, auto_dir: bool = True) -> str:
     """
     将推文保存到CSV文件
 
     Args:
-        tweets: 推文列表
+        tweets: 推文列表或生成器（生成器会被增量消费）
         filename: 自定义文件名（可选）
         auto_dir: 是否自动使用数据目录
 
     Returns:
-        保存的文件路径
+        保存的文件路径，没有推文时返回 None
     """
-    if not tweets:
+    # 预取第一条，空输入时不创建文件
+    tweets = iter(tweets)
+    first = next(tweets, None)
+    if first is None:
         return None
 
     if filename is None:
         # 自动生成文件名
         filename = generate_filename("tweets", "csv")
 
-    if auto_dir and not os.path.isabs(filename):
-        # 使用默认数据目录
-        directory = ensure_data_directory(DATA_DIR)
-        filepath = os.path.join(directory, filename)
-    else:
-        filepath = filename
-
-    # 选择要保存的字段
-    fields = ["created_at", "author", "text", "likes", "retweets", "replies", "url"]
-
-    with open(filepath, "w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
-        writer.writeheader()
-        writer.writerows(tweets)
+    filepath = resolve_output_path(filename, auto_dir)
+    write_tweets(chain([first], tweets), csv_path=filepath)
 
     return filepath
 
 
-def save_user_tweets(username: str, tweets: List[Dict], format: str = "both") -> Dict[str, str]:
+def _record_in_database(tweets: Iterable[Dict]) -> Iterator[Dict]:
+    """
+    在推文流经文件写入的同时分批写入数据库
+
+    不额外遍历推文，生成器输入仍然只被消费一次
+    """
+    database = get_database(DATABASE_PATH)
+    batch = []
+    for tweet in tweets:
+        batch.append(tweet)
+        yield tweet
+        if len(batch) >= INSERT_BATCH_SIZE:
+            database.insert_tweets(batch)
+            batch = []
+    if batch:
+        database.insert_tweets(batch)
+
+
+def save_user_tweets(
+    username: str, tweets: Iterable[Dict], format: str = "both"
+) -> Dict[str, str]:
     """
     保存用户推文到专门的用户文件夹
 
+    json/csv/both 格式生成一份带时间戳的完整快照；
+    jsonl 格式追加到用户的推文库（只写入未存储过的推文），命令行默认使用该格式
+
     Args:
         username: 用户名
-        tweets: 推文列表
-        format: 保存格式 ("json", "csv", "both")
+        tweets: 推文列表或生成器
+        format: 保存格式 ("jsonl", "json", "csv", "both")
 
     Returns:
         保存的文件路径字典
     """
+    if DATABASE_ENABLED:
+        tweets = _record_in_database(tweets)
+
+    if format == "jsonl":
+        store = UserTweetStore(username, root=USER_TWEETS_DIR)
+        store.append(tweets)
+        return {"jsonl": store.data_path}
+
     # 创建用户专属文件夹
     user_dir = os.path.join(USER_TWEETS_DIR, username)
     ensure_data_directory(user_dir)
@@ -218,14 +464,13 @@ def save_user_tweets(username: str, tweets: List[Dict], format: str = "both") ->
     saved_files = {}
 
     if format in ["json", "both"]:
-        json_path = os.path.join(user_dir, f"{username}_{timestamp}.json")
-        save_to_json(tweets, json_path, auto_dir=False)
-        saved_files["json"] = json_path
+        saved_files["json"] = os.path.join(user_dir, f"{username}_{timestamp}.json")
 
     if format in ["csv", "both"]:
-        csv_path = os.path.join(user_dir, f"{username}_{timestamp}.csv")
-        save_to_csv(tweets, csv_path, auto_dir=False)
-        saved_files["csv"] = csv_path
+        saved_files["csv"] = os.path.join(user_dir, f"{username}_{timestamp}.csv")
+
+    # 单次遍历同时写入两种格式，推文生成器也只会被消费一次
+    write_tweets(tweets, json_path=saved_files.get("json"), csv_path=saved_files.get("csv"))
 
     return saved_files
 
@@ -258,4 +503,4 @@ if __name__ == "__main__":
     print("\n2. 简化保存示例")
     print("- save_to_json(tweets) - 自动保存到 scraped_data/ 目录")
     print("- save_to_csv(tweets) - 自动保存到 scraped_data/ 目录")
-    print("- save_user_tweets(username, tweets) - 保存到 scraped_data/user_tweets/username/")
+    print("- save_user_tweets(username, tweets) - 追加到 scraped_data/user_tweets/username/ 推文库")
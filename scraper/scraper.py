@@ -4,8 +4,12 @@ Twitter Scraper Core Logic
 """
 
 import functools
-from typing import Callable, Dict, List
+from typing import Callable, Dict, Iterable, Iterator, List
 
+from common.data.tweet import Tweet
+
+from .cache import cached_items, get_scrape_cache, scrape_cache_key
+from .client_pool import get_pooled_client
 from .config import ScraperConfig, SearchQuery, UserTweetsQuery
 
 
@@ -22,6 +26,19 @@ def build_user_tweets_input(query: UserTweetsQuery) -> Dict:
     return {"twitterHandles": [query["username"]], "maxItems": query["max_items"], "sort": "Latest"}
 
 
+def build_multi_user_tweets_input(usernames: List[str], max_items: int) -> Dict:
+    """
+    构建一次抓取多个用户推文的API输入
+
+    前置条件：usernames非空，max_items > 0
+    后置条件：返回有效的API输入配置
+    """
+    assert usernames and all(usernames), "Usernames cannot be empty"
+    assert max_items > 0, "max_items must be positive"
+
+    return {"twitterHandles": list(usernames), "maxItems": max_items, "sort": "Latest"}
+
+
 def build_search_input(query: SearchQuery) -> Dict:
     """
     构建搜索查询的API输入
@@ -39,74 +56,84 @@ def build_search_input(query: SearchQuery) -> Dict:
     }
 
 
+def original_tweets_search_terms(username: str) -> str:
+    """
+    构建只包含原创推文的高级搜索语句
+
+    from:username - 来自特定用户
+    -filter:nativeretweets - 排除转发
+    -filter:replies - 排除回复
+    """
+    return f"from:{username} -filter:nativeretweets -filter:replies"
+
+
+def timeline_search_terms(username: str) -> str:
+    """
+    构建包含原创推文和回复（不含转发）的高级搜索语句
+
+    from:username - 来自特定用户
+    -filter:nativeretweets - 排除转发
+    """
+    return f"from:{username} -filter:nativeretweets"
+
+
+def replies_search_terms(username: str) -> str:
+    """
+    构建只包含回复的高级搜索语句
+
+    from:username - 来自特定用户
+    filter:replies - 只获取回复
+    """
+    return f"from:{username} filter:replies"
+
+
+def create_api_iterator(config: ScraperConfig) -> Callable[[Dict], Iterator[Dict]]:
+    """
+    创建流式API调用函数（高阶函数）
+
+    返回的生成器函数在首次迭代时启动 actor，随后按数据集分页逐条产出结果，
+    不会把整个数据集一次性载入内存；结果经过磁盘缓存（见 scraper.cache）
+    """
+    client, actor = get_pooled_client(config)
+
+    def iter_remote(input_data: Dict) -> Iterator[Dict]:
+        run = actor.call(run_input=input_data)
+        yield from client.dataset(run["defaultDatasetId"]).iterate_items()
+
+    def iter_actor(input_data: Dict) -> Iterator[Dict]:
+        """执行API调用并逐条产出结果（相同输入在缓存有效期内直接读取缓存）"""
+        cache = get_scrape_cache()
+        if cache is None:
+            return iter_remote(input_data)
+        key = scrape_cache_key(config["actor_id"], input_data)
+        return cached_items(key, lambda: iter_remote(input_data), cache)
+
+    return iter_actor
+
+
 def create_api_caller(config: ScraperConfig) -> Callable[[Dict], List[Dict]]:
     """
     创建配置好的API调用函数（高阶函数）
 
     返回一个闭包，封装了API客户端配置
+    客户端来自进程级连接池，多次调用复用同一个 HTTP 会话
     """
-    from apify_client import ApifyClient
-
-    client = ApifyClient(config["api_token"])
+    iter_actor = create_api_iterator(config)
 
     def call_actor(input_data: Dict) -> List[Dict]:
         """执行API调用并返回结果列表"""
-        run = client.actor(config["actor_id"]).call(run_input=input_data)
-        return list(client.dataset(run["defaultDatasetId"]).iterate_items())
+        return list(iter_actor(input_data))
 
     return call_actor
 
 
-def extract_tweet_fields(tweet: Dict) -> Dict:
+def extract_tweet_fields(tweet: Dict) -> Tweet:
     """
     提取推文的关键字段（纯函数）
 
-    保持数据不可变，只提取必要信息
-    """
-    # 基于实际API响应格式提取字段
-    author = tweet.get("author", {})
-    if isinstance(author, dict):
-        author_username = author.get("userName", "")
-        author_name = author.get("name", "") or author.get("displayName", "")
-    else:
-        author_username = tweet.get("userName", "")
-        author_name = tweet.get("name", "")
-
-    # 处理媒体内容
-    media_list = tweet.get("media", [])
-    if not isinstance(media_list, list):
-        media_list = []
-
-    # 提取照片URL
-    photos = tweet.get("photos", [])
-    if isinstance(photos, list):
-        media_urls = [
-            photo.get("url", "") if isinstance(photo, dict) else str(photo) for photo in photos
-        ]
-    else:
-        media_urls = [
-            media.get("url", "") if isinstance(media, dict) else str(media) for media in media_list
-        ]
-
-    return {
-        "text": tweet.get("text", "") or tweet.get("fullText", ""),
-        "author": author_username,
-        "author_name": author_name,
-        "created_at": tweet.get("createdAt", ""),
-        "likes": tweet.get("likeCount", 0),
-        "retweets": tweet.get("retweetCount", 0),
-        "replies": tweet.get("replyCount", 0),
-        "views": tweet.get("viewCount", 0),
-        "url": tweet.get("url", "") or tweet.get("twitterUrl", ""),
-        "id": tweet.get("id", ""),
-        "is_reply": tweet.get("isReply", False) or bool(tweet.get("inReplyToId")),
-        "is_retweet": tweet.get("isRetweet", False) or bool(tweet.get("retweetedStatusId")),
-        "is_quote": tweet.get("isQuote", False),
-        "is_pin": tweet.get("isPin", False),
-        "media": media_urls,
-        "hashtags": tweet.get("hashtags", []),
-        "mentions": tweet.get("mentions", []),
-    }
+    保持数据不可变，只提取必要信息；返回紧凑的 Tweet 记录，仍可按字典方式访问字段
+    """
+    return Tweet.from_api(tweet)
 
 
 def compose(*functions: Callable) -> Callable:
@@ -118,6 +145,17 @@ def compose(*functions: Callable) -> Callable:
     return functools.reduce(lambda f, g: lambda x: f(g(x)), functions, lambda x: x)
 
 
+def scrape_tweets_iter(query: UserTweetsQuery, config: ScraperConfig) -> Iterator[Dict]:
+    """
+    流式抓取用户推文
+
+    前置条件：query包含有效的用户名和数量
+    后置条件：逐条产出格式化的推文，调用方可随时停止迭代
+    """
+    input_data = build_user_tweets_input(query)
+    return map(extract_tweet_fields, create_api_iterator(config)(input_data))
+
+
 def scrape_tweets(query: UserTweetsQuery, config: ScraperConfig) -> List[Dict]:
     """
     主抓取函数 - 通过组合纯函数实现
@@ -125,17 +163,41 @@ def scrape_tweets(query: UserTweetsQuery, config: ScraperConfig) -> List[Dict]:
     前置条件：query包含有效的用户名和数量
     后置条件：返回格式化的推文列表
     """
-    # 1. 构建输入配置
-    input_data = build_user_tweets_input(query)
+    return list(scrape_tweets_iter(query, config))
 
-    # 2. 创建API调用器
-    api_caller = create_api_caller(config)
 
-    # 3. 执行API调用
-    raw_tweets = api_caller(input_data)
+def demux_by_author(
+    tweets: Iterable[Dict], usernames: List[str], max_per_user: int
+) -> Dict[str, List[Dict]]:
+    """
+    按作者把推文拆分到各个用户（单次遍历）
 
-    # 4. 转换数据（使用map保持函数式风格）
-    return list(map(extract_tweet_fields, raw_tweets))
+    作者匹配不区分大小写；不在 usernames 中的作者被忽略，
+    每个用户最多保留 max_per_user 条，所有用户都满额后提前停止遍历
+
+    Args:
+        tweets: 格式化后的推文（可以是生成器）
+        usernames: 目标用户名列表
+        max_per_user: 每个用户最多保留的数量
+
+    Returns:
+        用户名 -> 推文列表
+    """
+    buckets = {username: [] for username in usernames}
+    lookup = {username.lower(): bucket for username, bucket in buckets.items()}
+    unfilled = len(buckets)
+
+    for tweet in tweets:
+        bucket = lookup.get(str(tweet.get("author", "")).lower())
+        if bucket is None or len(bucket) >= max_per_user:
+            continue
+        bucket.append(tweet)
+        if len(bucket) == max_per_user:
+            unfilled -= 1
+            if unfilled == 0:
+                break
+
+    return buckets
 
 
 def filter_tweets(tweets: List[Dict], predicate: Callable[[Dict], bool]) -> List[Dict]:
@@ -156,21 +218,22 @@ def sort_tweets(tweets: List[Dict], key: str, reverse: bool = True) -> List[Dict
     return sorted(tweets, key=lambda t: t.get(key, 0), reverse=reverse)
 
 
-def scrape_with_search(query: SearchQuery, config: ScraperConfig) -> List[Dict]:
+def scrape_with_search_iter(query: SearchQuery, config: ScraperConfig) -> Iterator[Dict]:
     """
-    使用搜索条件抓取推文
+    流式搜索推文
 
     前置条件：query包含有效的搜索条件和数量
-    后置条件：返回格式化的推文列表
+    后置条件：逐条产出格式化的推文，调用方可随时停止迭代
     """
-    # 1. 构建输入配置
     input_data = build_search_input(query)
+    return map(extract_tweet_fields, create_api_iterator(config)(input_data))
 
-    # 2. 创建API调用器
-    api_caller = create_api_caller(config)
 
-    # 3. 执行API调用
-    raw_tweets = api_caller(input_data)
+def scrape_with_search(query: SearchQuery, config: ScraperConfig) -> List[Dict]:
+    """
+    使用搜索条件抓取推文
 
-    # 4. 转换数据
-    return list(map(extract_tweet_fields, raw_tweets))
+    前置条件：query包含有效的搜索条件和数量
+    后置条件：返回格式化的推文列表
+    """
+    return list(scrape_with_search_iter(query, config))
@@ -0,0 +1,264 @@
+"""
+用户推文库
+每个用户一个只追加的 JSON Lines 文件，加上记录推文 id、字节偏移和发布时间的索引文件。
+再次抓取时只追加未存储过的推文；读取时可以按 id 或时间范围直接定位，无需解析全部历史。
+"""
+
+import hashlib
+import heapq
+import json
+import math
+import os
+import tempfile
+import threading
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+from common.data.tweet import Tweet, parse_created_at, tweet_sort_key, tweet_to_dict
+
+from .config import USER_TWEETS_DIR
+
+# 不带格式参数保存时使用的推文库名称（与增量抓取的时间线语料共用）
+DEFAULT_STORE_NAME = "timeline"
+
+# 索引条目：(字节偏移, 字节长度, 发布时间 Unix 秒，未知为 NaN)
+IndexEntry = Tuple[int, int, float]
+
+
+def _tweet_key(tweet: Mapping) -> str:
+    """推文在库中的唯一键：优先使用推文 id，没有 id 时使用内容哈希"""
+    tweet_id = tweet.get("id")
+    if tweet_id:
+        return str(tweet_id)
+    digest = hashlib.sha1(
+        f"{tweet.get('created_at', '')}\0{tweet.get('text', '')}".encode("utf-8")
+    ).hexdigest()
+    return f"~{digest[:16]}"
+
+
+def _timestamp(tweet: Mapping) -> float:
+    created = parse_created_at(tweet.get("created_at", ""))
+    return created.timestamp() if created else math.nan
+
+
+def _format_index_line(key: str, entry: IndexEntry) -> str:
+    offset, length, ts = entry
+    return f"{key}\t{offset}\t{length}\t{'' if math.isnan(ts) else repr(ts)}\n"
+
+
+def _to_seconds(value: Union[datetime, float, None]) -> Optional[float]:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return value
+
+
+class UserTweetStore:
+    """
+    单个用户的只追加推文库
+
+    - <root>/<user>/<user>_<name>.jsonl：每行一条推文
+    - <root>/<user>/<user>_<name>.idx：每行 "键 \\t 偏移 \\t 长度 \\t 时间戳"
+
+    索引在首次使用时载入内存；索引落后于数据文件（例如写入中途被中断）时会扫描数据文件尾部补齐
+    """
+
+    def __init__(self, username: str, name: str = DEFAULT_STORE_NAME, root: str = None):
+        """
+        Args:
+            username: Twitter用户名
+            name: 推文库名称（同一用户可以有多个库，例如不同的抓取范围）
+            root: 存储根目录，默认为 USER_TWEETS_DIR
+        """
+        self.username = username
+        self.name = name
+        user_dir = os.path.join(root or USER_TWEETS_DIR, username)
+        self.data_path = os.path.join(user_dir, f"{username}_{name}.jsonl")
+        self.index_path = os.path.join(user_dir, f"{username}_{name}.idx")
+        self._lock = threading.RLock()
+        self._entries: Optional[Dict[str, IndexEntry]] = None
+        self._by_time: Optional[List[Tuple[float, int, int]]] = None
+
+    # ---- 索引 ----
+
+    def _load_index(self) -> Dict[str, IndexEntry]:
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._read_index()
+            return self._entries
+
+    def _read_index(self) -> Dict[str, IndexEntry]:
+        entries: Dict[str, IndexEntry] = {}
+        indexed_end = 0
+        clean = True
+
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    parts = line.rstrip("\n").split("\t")
+                    if len(parts) != 4 or not line.endswith("\n"):
+                        clean = False
+                        continue
+                    key, offset, length, ts = parts
+                    entry = (int(offset), int(length), float(ts) if ts else math.nan)
+                    entries[key] = entry
+                    indexed_end = max(indexed_end, entry[0] + entry[1])
+
+        data_size = os.path.getsize(self.data_path) if os.path.exists(self.data_path) else 0
+        if indexed_end > data_size:
+            # 数据文件被截断或替换过，索引不可信，整体重建
+            entries, indexed_end, clean = {}, 0, False
+
+        if indexed_end < data_size:
+            entries.update(self._scan_data(indexed_end))
+            clean = False
+
+        if not clean:
+            self._rewrite_index(entries)
+        return entries
+
+    def _scan_data(self, start: int) -> Dict[str, IndexEntry]:
+        """从 start 开始扫描数据文件补建索引；末尾不完整的一行会被截掉"""
+        entries = {}
+        offset = start
+        with open(self.data_path, "r+b") as f:
+            f.seek(start)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    f.truncate(offset)
+                    break
+                try:
+                    tweet = json.loads(line)
+                except ValueError:
+                    tweet = None
+                if isinstance(tweet, dict):
+                    entries[_tweet_key(tweet)] = (offset, len(line), _timestamp(tweet))
+                offset += len(line)
+        return entries
+
+    def _rewrite_index(self, entries: Dict[str, IndexEntry]):
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.index_path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.writelines(_format_index_line(key, entry) for key, entry in entries.items())
+        os.replace(tmp_path, self.index_path)
+
+    # ---- 写入 ----
+
+    def append(self, tweets: Iterable[Mapping]) -> int:
+        """
+        追加尚未存储的推文（按 id 去重，已存储的推文不会被改写）
+
+        Args:
+            tweets: 推文列表或生成器
+
+        Returns:
+            新追加的推文数量
+        """
+        with self._lock:
+            entries = self._load_index()
+            os.makedirs(os.path.dirname(self.data_path), exist_ok=True)
+            added = []
+
+            with open(self.data_path, "ab") as f:
+                offset = f.tell()
+                for tweet in tweets:
+                    key = _tweet_key(tweet)
+                    if key in entries:
+                        continue
+                    line = json.dumps(tweet_to_dict(tweet), ensure_ascii=False) + "\n"
+                    data = line.encode("utf-8")
+                    f.write(data)
+                    entry = (offset, len(data), _timestamp(tweet))
+                    entries[key] = entry
+                    added.append((key, entry))
+                    offset += len(data)
+
+            if added:
+                # 先写数据再写索引：中断时最多只需从数据文件补建索引
+                with open(self.index_path, "a", encoding="utf-8") as f:
+                    f.writelines(_format_index_line(key, entry) for key, entry in added)
+                self._by_time = None
+
+            return len(added)
+
+    # ---- 读取 ----
+
+    def __len__(self) -> int:
+        return len(self._load_index())
+
+    def __contains__(self, tweet_id: object) -> bool:
+        return str(tweet_id) in self._load_index()
+
+    def get(self, tweet_id: str) -> Optional[Tweet]:
+        """按推文 id 读取单条推文，不存在时返回 None"""
+        entry = self._load_index().get(str(tweet_id))
+        if entry is None:
+            return None
+        with open(self.data_path, "rb") as f:
+            return self._read_at(f, entry[0], entry[1])
+
+    def iter_range(
+        self,
+        since: Union[datetime, float, None] = None,
+        until: Union[datetime, float, None] = None,
+    ) -> Iterator[Tweet]:
+        """
+        按发布时间顺序读取 [since, until) 范围内的推文
+
+        Args:
+            since: 起始时间（datetime 或 Unix 秒），None 表示不限
+            until: 结束时间（不含），None 表示不限
+
+        Yields:
+            推文（发布时间未知的推文不会出现在结果中）
+        """
+        by_time = self._time_index()
+        since_ts, until_ts = _to_seconds(since), _to_seconds(until)
+        start = 0 if since_ts is None else bisect_left(by_time, (since_ts,))
+        stop = len(by_time) if until_ts is None else bisect_left(by_time, (until_ts,))
+        if start >= stop:
+            return
+
+        with open(self.data_path, "rb") as f:
+            for _, offset, length in by_time[start:stop]:
+                yield self._read_at(f, offset, length)
+
+    def latest(self, count: int) -> List[Tweet]:
+        """读取最新的 count 条推文（从新到旧），只读取需要的行"""
+        entries = self._load_index()
+        newest = heapq.nlargest(count, entries.items(), key=lambda item: _entry_order(*item))
+        with open(self.data_path, "rb") as f:
+            return [self._read_at(f, entry[0], entry[1]) for _, entry in newest]
+
+    def read_all(self) -> List[Tweet]:
+        """顺序读取全部推文，按从新到旧排序"""
+        self._load_index()
+        if not os.path.exists(self.data_path):
+            return []
+        with open(self.data_path, "r", encoding="utf-8") as f:
+            tweets = [Tweet.from_dict(json.loads(line)) for line in f if line.strip()]
+        return sorted(tweets, key=tweet_sort_key, reverse=True)
+
+    def _time_index(self) -> List[Tuple[float, int, int]]:
+        with self._lock:
+            if self._by_time is None:
+                self._by_time = sorted(
+                    (ts, offset, length)
+                    for offset, length, ts in self._load_index().values()
+                    if not math.isnan(ts)
+                )
+            return self._by_time
+
+    @staticmethod
+    def _read_at(f, offset: int, length: int) -> Tweet:
+        f.seek(offset)
+        return Tweet.from_dict(json.loads(f.read(length)))
+
+
+def _entry_order(key: str, entry: IndexEntry) -> Tuple[int, float]:
+    """与 tweet_sort_key 一致的排序：数字 id 优先，其余按时间"""
+    if key.isdigit():
+        return int(key), 0.0
+    ts = entry[2]
+    return 0, -math.inf if math.isnan(ts) else ts
@@ -0,0 +1,85 @@
+"""
+测试 MBTI 分析结果缓存
+"""
+
+from unittest.mock import Mock, patch
+
+import pytest
+
+pytest.importorskip("google.generativeai")
+
+from mbti_analyzer import gemini_api
+from mbti_analyzer.analysis_cache import AnalysisCache, analysis_cache_key
+from mbti_analyzer.gemini_api import GeminiAnalyzer
+
+RESULT = {
+    "mbti_type": "INFP",
+    "dimensions": {"E_I": {"type": "I", "percentage": 60, "analysis": "a"}},
+    "overall_analysis": "ok",
+}
+
+TWEET_DATA = {
+    "username": "someone",
+    "original_tweets": [{"text": "hello world"}],
+    "reply_tweets": [{"text": "thanks"}],
+}
+
+
+class TestAnalysisCache:
+    """测试两级缓存"""
+
+    def test_memory_then_disk(self, tmp_path):
+        """测试内存命中，以及新进程（新实例）从磁盘命中"""
+        cache = AnalysisCache(str(tmp_path))
+        cache.put("k", RESULT)
+        assert cache.get("k") == RESULT
+
+        reopened = AnalysisCache(str(tmp_path))
+        assert reopened.get("k") == RESULT
+        assert reopened.get("k") == RESULT
+        stats = reopened.get_stats()
+        assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (1, 1, 0)
+
+    def test_returns_copies(self, tmp_path):
+        """测试修改返回结果不会影响缓存"""
+        cache = AnalysisCache(None)
+        cache.put("k", RESULT)
+        cache.get("k")["mbti_type"] = "ESTJ"
+        assert cache.get("k")["mbti_type"] == "INFP"
+
+    def test_ttl_and_lru(self, tmp_path):
+        """测试过期结果和超出容量的结果不再返回"""
+        cache = AnalysisCache(str(tmp_path), ttl_seconds=60, max_entries=1)
+        cache.put("old", RESULT)
+        with patch("mbti_analyzer.analysis_cache.time.time", return_value=10**10):
+            assert cache.get("old") is None
+
+        memory_only = AnalysisCache(None, max_entries=1)
+        memory_only.put("a", RESULT)
+        memory_only.put("b", RESULT)
+        assert memory_only.get("a") is None
+
+    def test_key_depends_on_version(self):
+        """测试提示词版本或模型不同时缓存键不同"""
+        key = analysis_cache_key("m", 1, "prompt")
+        assert key != analysis_cache_key("m", 2, "prompt")
+        assert key != analysis_cache_key("other", 1, "prompt")
+
+
+class TestAnalyzerCache:
+    """测试分析器使用缓存"""
+
+    def test_second_analysis_skips_api(self, tmp_path):
+        """测试推文样本不变时第二次分析不调用 API"""
+        analyzer = GeminiAnalyzer("key")
+        analyzer._generate = Mock(return_value=RESULT)
+
+        cache = AnalysisCache(str(tmp_path))
+        with patch.object(gemini_api, "get_analysis_cache", return_value=cache):
+            first = analyzer.analyze_mbti(TWEET_DATA)
+            assert not analyzer.last_from_cache
+            second = analyzer.analyze_mbti(TWEET_DATA)
+
+        assert first == second == RESULT
+        assert analyzer.last_from_cache
+        analyzer._generate.assert_called_once()
@@ -0,0 +1,201 @@
+"""
+测试推文收集逻辑
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("google.generativeai")
+
+from common.exceptions import NoTweetsError, UserNotFoundError
+from mbti_analyzer import analyzer
+
+
+def make_tweets(n, is_reply=False):
+    return [
+        {
+            "text": f"tweet {i}",
+            "author_name": "Test User",
+            "created_at": "2024-01-01",
+            "likes": 1,
+            "retweets": 0,
+            "replies": 0,
+            "views": 10,
+            "hashtags": [],
+            "mentions": [],
+            "media": [],
+            "is_reply": is_reply,
+            "is_retweet": False,
+        }
+        for i in range(n)
+    ]
+
+
+class TestCollectTweetData:
+    """测试并发收集"""
+
+    @pytest.fixture(autouse=True)
+    def disable_incremental(self, monkeypatch):
+        """关闭增量抓取，直接测试并发搜索逻辑"""
+        monkeypatch.setattr(analyzer.get_config().scraper, "incremental", False)
+
+    def test_searches_run_concurrently(self):
+        """测试原创和回复搜索同时进行"""
+        barrier = threading.Barrier(2, timeout=2)
+
+        def originals(username, count):
+            barrier.wait()
+            return make_tweets(count)
+
+        def replies(username, count):
+            barrier.wait()
+            return make_tweets(count, is_reply=True)
+
+        with patch.object(analyzer, "scrape_user_original_tweets_advanced", originals), \
+                patch.object(analyzer, "scrape_user_replies_advanced", replies):
+            data = analyzer.collect_tweet_data("testuser", 5, 3)
+
+        assert data["stats"] == {"total_original": 5, "total_replies": 3}
+        assert data["display_name"] == "Test User"
+
+    def test_top_up_when_originals_short(self):
+        """测试原创推文不足时补充抓取"""
+        with patch.object(
+            analyzer, "scrape_user_original_tweets_advanced", return_value=make_tweets(2)
+        ), patch.object(
+            analyzer, "scrape_user_replies_advanced", return_value=make_tweets(3, True)
+        ), patch.object(analyzer, "scrape_user_tweets", return_value=make_tweets(10)) as extra:
+            data = analyzer.collect_tweet_data("testuser", 5, 3)
+
+        extra.assert_called_once_with("testuser", 6)
+        assert data["stats"]["total_original"] == 5
+
+    @pytest.mark.parametrize("error", [UserNotFoundError("x"), NoTweetsError("x")])
+    def test_user_errors_propagate(self, error):
+        """测试用户不存在 / 无推文错误直接抛出，不走备用方案"""
+
+        def slow_replies(username, count):
+            time.sleep(0.05)
+            return []
+
+        with patch.object(
+            analyzer, "scrape_user_original_tweets_advanced", side_effect=error
+        ), patch.object(analyzer, "scrape_user_replies_advanced", slow_replies), patch.object(
+            analyzer, "scrape_user_tweets"
+        ) as fallback:
+            with pytest.raises(type(error)):
+                analyzer.collect_tweet_data("testuser", 5, 3)
+
+        fallback.assert_not_called()
+
+    def test_error_waits_for_running_search(self):
+        """测试出错时等待仍在进行的搜索结束后才返回，不留下无人等待的运行"""
+        started, finished = threading.Event(), threading.Event()
+
+        def originals(username, count):
+            started.wait(timeout=2)
+            raise UserNotFoundError("x")
+
+        def slow_replies(username, count):
+            started.set()
+            time.sleep(0.05)
+            finished.set()
+            return []
+
+        with patch.object(analyzer, "scrape_user_original_tweets_advanced", originals), \
+                patch.object(analyzer, "scrape_user_replies_advanced", slow_replies):
+            with pytest.raises(UserNotFoundError):
+                analyzer.scrape_advanced_concurrently("testuser", 5, 3)
+
+            assert finished.is_set()
+
+    def test_generic_error_uses_fallback(self):
+        """测试搜索失败时使用备用方案"""
+        tweets = make_tweets(4) + make_tweets(4, is_reply=True)
+        with patch.object(
+            analyzer, "scrape_user_original_tweets_advanced", side_effect=RuntimeError("boom")
+        ), patch.object(
+            analyzer, "scrape_user_replies_advanced", return_value=[]
+        ), patch.object(analyzer, "scrape_user_tweets", return_value=tweets):
+            data = analyzer.collect_tweet_data("testuser", 3, 3)
+
+        assert data["stats"] == {"total_original": 3, "total_replies": 3}
+
+
+class TestIncrementalSplitCollection:
+    """测试分别搜索模式下的增量抓取"""
+
+    def test_split_mode_uses_watermarks(self, monkeypatch):
+        """测试启用增量抓取时原创和回复都走各自的增量搜索"""
+        monkeypatch.setattr(analyzer.get_config().scraper, "incremental", True)
+        with patch.object(
+            analyzer, "scrape_user_original_tweets_incremental", return_value=(make_tweets(5), 2)
+        ) as originals, patch.object(
+            analyzer, "scrape_user_replies_incremental", return_value=(make_tweets(3, True), 0)
+        ) as replies, patch.object(analyzer, "scrape_user_original_tweets_advanced") as full:
+            data = analyzer.collect_tweet_data("testuser", 5, 3, collection_mode="split")
+
+        originals.assert_called_once_with("testuser", 5)
+        replies.assert_called_once_with("testuser", 3)
+        full.assert_not_called()
+        assert data["stats"] == {"total_original": 5, "total_replies": 3}
+
+
+class TestSinglePassCollection:
+    """测试单次搜索收集模式"""
+
+    @pytest.fixture(autouse=True)
+    def disable_incremental(self, monkeypatch):
+        """关闭增量抓取，直接测试单次搜索逻辑"""
+        monkeypatch.setattr(analyzer.get_config().scraper, "incremental", False)
+
+    @staticmethod
+    def timeline(originals, replies, start=0):
+        tweets = make_tweets(originals) + make_tweets(replies, is_reply=True)
+        for i, tweet in enumerate(tweets, start):
+            tweet["id"] = str(i)
+        return tweets
+
+    def test_one_run_when_buckets_filled(self):
+        """测试两类都足够时只运行一次搜索"""
+        with patch.object(
+            analyzer, "scrape_user_timeline_advanced", return_value=self.timeline(6, 4)
+        ) as timeline, patch.object(
+            analyzer, "scrape_user_original_tweets_advanced"
+        ) as originals, patch.object(analyzer, "scrape_user_replies_advanced") as replies:
+            data = analyzer.collect_tweet_data("testuser", 5, 3, collection_mode="single_pass")
+
+        timeline.assert_called_once_with("testuser", 8)
+        originals.assert_not_called()
+        replies.assert_not_called()
+        assert data["stats"] == {"total_original": 5, "total_replies": 3}
+
+    def test_fallback_only_for_short_bucket(self):
+        """测试只为不足的一类补充搜索，并按 id 去重"""
+        fallback_replies = self.timeline(0, 3, start=7)
+        fallback_replies[0]["id"] = "7"  # 与单次搜索结果重复
+        with patch.object(
+            analyzer, "scrape_user_timeline_advanced", return_value=self.timeline(7, 1)
+        ), patch.object(
+            analyzer, "scrape_user_original_tweets_advanced"
+        ) as originals, patch.object(
+            analyzer, "scrape_user_replies_advanced", return_value=fallback_replies
+        ) as replies:
+            data = analyzer.collect_tweet_data("testuser", 5, 3, collection_mode="single_pass")
+
+        originals.assert_not_called()
+        replies.assert_called_once_with("testuser", 3)
+        assert data["stats"] == {"total_original": 5, "total_replies": 3}
+
+    def test_no_fallback_when_timeline_exhausted(self):
+        """测试搜索结果不满额时不再补充"""
+        with patch.object(
+            analyzer, "scrape_user_timeline_advanced", return_value=self.timeline(2, 1)
+        ), patch.object(analyzer, "scrape_user_replies_advanced") as replies:
+            data = analyzer.collect_tweet_data("testuser", 5, 3, collection_mode="single_pass")
+
+        replies.assert_not_called()
+        assert data["stats"] == {"total_original": 2, "total_replies": 1}
@@ -0,0 +1,105 @@
+"""
+测试异步抓取后端
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from scraper import async_scraper
+from scraper.async_scraper import call_actor_async, gather_bounded
+
+
+def make_fake_client(wait_for_finish):
+    """构造伪造的异步客户端"""
+
+    async def iterate_items():
+        for i in range(3):
+            yield {"id": str(i), "text": f"tweet {i}", "author": {"userName": "testuser"}}
+
+    run_client = MagicMock()
+    run_client.wait_for_finish = wait_for_finish
+    run_client.abort = AsyncMock()
+
+    client = MagicMock()
+    client.run.return_value = run_client
+    client.dataset.return_value.iterate_items = iterate_items
+
+    actor = MagicMock()
+    actor.start = AsyncMock(return_value={"id": "run-1", "defaultDatasetId": "ds-1"})
+    return client, actor, run_client
+
+
+class TestCallActorAsync:
+    """测试异步 actor 调用"""
+
+    def test_returns_dataset_items(self):
+        """测试返回数据集内容"""
+        client, actor, _ = make_fake_client(AsyncMock(return_value=None))
+        with patch.object(async_scraper, "get_async_pooled_client", return_value=(client, actor)):
+            items = asyncio.run(call_actor_async({"maxItems": 3}, {}))
+
+        assert [item["id"] for item in items] == ["0", "1", "2"]
+        actor.start.assert_awaited_once_with(run_input={"maxItems": 3})
+
+    def test_cancel_aborts_run(self):
+        """测试取消时中止远端 actor 运行"""
+
+        async def never_finishes():
+            await asyncio.sleep(3600)
+
+        client, actor, run_client = make_fake_client(never_finishes)
+
+        async def scenario():
+            task = asyncio.ensure_future(call_actor_async({}, {}))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        with patch.object(async_scraper, "get_async_pooled_client", return_value=(client, actor)):
+            asyncio.run(scenario())
+
+        run_client.abort.assert_awaited_once()
+
+
+class TestGatherBounded:
+    """测试有界并发"""
+
+    def test_respects_limit_and_order(self):
+        """测试并发数不超过上限，结果保持输入顺序"""
+        running = 0
+        peak = 0
+
+        async def job(i):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return i
+
+        results = asyncio.run(gather_bounded([job(i) for i in range(10)], limit=3))
+
+        assert results == list(range(10))
+        assert peak == 3
+
+    def test_failure_cancels_others(self):
+        """测试一个任务失败时取消其余任务"""
+        cancelled = []
+
+        async def slow(i):
+            try:
+                await asyncio.sleep(3600)
+            except asyncio.CancelledError:
+                cancelled.append(i)
+                raise
+
+        async def boom():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            asyncio.run(gather_bounded([slow(0), slow(1), boom()], limit=5))
+
+        assert sorted(cancelled) == [0, 1]
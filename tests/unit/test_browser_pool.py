@@ -0,0 +1,259 @@
+"""
+测试无头浏览器池
+使用假的 Playwright 驱动，不需要安装浏览器
+"""
+
+import asyncio
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+pytest.importorskip("google.generativeai")
+
+from mbti_analyzer import image_cache
+from mbti_analyzer.browser_pool import BrowserPool
+from mbti_analyzer.html_to_image import HTMLToImageConverter
+from mbti_analyzer.render_options import RenderOptions
+
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+    def set_default_timeout(self, timeout):
+        pass
+
+    async def set_content(self, html, **options):
+        self.html = html
+
+    async def wait_for_selector(self, selector, **options):
+        self.waited_for = selector
+
+    async def evaluate(self, script):
+        return {"x": 0, "y": 0, "width": 800, "height": 600}
+
+    async def screenshot(self, **options):
+        self.clip = options.get("clip")
+        buffer = io.BytesIO()
+        Image.new("RGB", (1600, 1200), "#161b22").save(buffer, "PNG")
+        return buffer.getvalue()
+
+
+class FakeContext:
+    def __init__(self):
+        self.routes = []
+
+    async def new_page(self):
+        return FakePage()
+
+    async def route(self, pattern, handler):
+        self.routes.append(pattern)
+
+    async def close(self):
+        pass
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **options):
+        return FakeContext()
+
+    async def close(self):
+        self.connected = False
+
+
+class FakeDriver:
+    def __init__(self):
+        self.chromium = self
+        self.launched = []
+
+    async def launch(self, **options):
+        browser = FakeBrowser()
+        self.launched.append(browser)
+        return browser
+
+    async def stop(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def no_image_cache():
+    """转换测试不读写图片缓存"""
+    with patch.object(image_cache, "_enabled", False):
+        yield
+
+
+@pytest.fixture
+def driver():
+    return FakeDriver()
+
+
+def make_pool(driver, **kwargs):
+    async def start_driver():
+        return driver
+
+    return BrowserPool(start_driver=start_driver, **kwargs)
+
+
+async def lease_page(pool, fail=False):
+    async with pool.lease() as page:
+        if fail:
+            raise RuntimeError("boom")
+        return page
+
+
+class TestBrowserPool:
+    """测试页面租用、健康检查与回收"""
+
+    def test_reuses_warm_page(self, driver):
+        """测试多次截图复用同一个浏览器和页面"""
+        pool = make_pool(driver, size=1, pages_per_browser=1)
+        try:
+            first = pool.run(lease_page, pool)
+            second = pool.run(lease_page, pool)
+        finally:
+            pool.close()
+
+        assert first is second
+        assert len(driver.launched) == 1
+        assert pool.stats["leases"] == 2
+
+    def test_disconnected_browser_is_relaunched(self, driver):
+        """测试浏览器断开后自动重启"""
+        pool = make_pool(driver, size=1, pages_per_browser=1)
+        try:
+            first = pool.run(lease_page, pool)
+            driver.launched[0].connected = False
+            second = pool.run(lease_page, pool)
+        finally:
+            pool.close()
+
+        assert first is not second
+        assert len(driver.launched) == 2
+
+    def test_failed_page_is_rebuilt(self, driver):
+        """测试使用中出错的页面被丢弃"""
+        pool = make_pool(driver, size=1, pages_per_browser=1)
+        try:
+            with pytest.raises(RuntimeError):
+                pool.run(lease_page, pool, fail=True)
+            pool.run(lease_page, pool)
+        finally:
+            pool.close()
+
+        assert len(driver.launched) == 1
+        assert pool.stats["leases"] == 2
+
+    def test_recycle_after_n_pages(self, driver):
+        """测试截图次数达到上限后重启浏览器"""
+        pool = make_pool(driver, size=1, pages_per_browser=1, recycle_after=2)
+        try:
+            for _ in range(5):
+                pool.run(lease_page, pool)
+        finally:
+            pool.close()
+
+        assert pool.stats["recycles"] == 2
+        assert len(driver.launched) == 3
+        assert not driver.launched[0].is_connected()
+
+
+class TestConvertMany:
+    """测试批量转换"""
+
+    def test_streams_results_and_reports_failures(self, driver, tmp_path):
+        """测试批量转换返回每个报告的结果，单个失败不影响其他报告"""
+        reports = []
+        for i in range(4):
+            path = tmp_path / f"report_{i}.html"
+            path.write_text("<div class='terminal'></div>")
+            reports.append(str(path))
+        reports.append(str(tmp_path / "missing.html"))
+
+        pool = make_pool(driver, size=1, pages_per_browser=2)
+        try:
+            converter = HTMLToImageConverter(pool=pool, options=RenderOptions())
+            results = list(converter.convert_many(reports, str(tmp_path / "images"), 2))
+        finally:
+            pool.close()
+
+        assert len(results) == 5
+        failed = [r for r in results if not r.ok]
+        assert [r.html_path for r in failed] == [reports[-1]]
+        assert all((tmp_path / "images" / f"report_{i}.png").exists() for i in range(4))
+        assert len(driver.launched) == 1
+
+    def test_semaphore_created_in_pool_loop(self, driver, tmp_path):
+        """测试信号量在浏览器池的线程中创建，从其他线程提交超过并发数的报告也能完成"""
+        reports = []
+        for i in range(5):
+            path = tmp_path / f"report_{i}.html"
+            path.write_text("<div class='terminal'></div>")
+            reports.append(str(path))
+
+        created_in = []
+        real_semaphore = asyncio.Semaphore
+
+        def semaphore(*args):
+            created_in.append(threading.current_thread().name)
+            return real_semaphore(*args)
+
+        pool = make_pool(driver, size=1, pages_per_browser=1)
+        try:
+            converter = HTMLToImageConverter(pool=pool, options=RenderOptions())
+            with patch.object(asyncio, "Semaphore", semaphore), ThreadPoolExecutor(1) as executor:
+                results = executor.submit(
+                    lambda: list(converter.convert_many(reports, str(tmp_path / "images"), 1))
+                ).result()
+        finally:
+            pool.close()
+
+        assert created_in == ["browser-pool"]
+        assert len(results) == 5 and all(r.ok for r in results)
+
+    def test_fast_path_waits_for_ready_flag(self, driver, tmp_path):
+        """测试从内存加载报告、等待就绪标记并按终端区域裁剪截图"""
+        report = tmp_path / "report.html"
+        report.write_text("<html><script>data-render-ready</script></html>")
+        pool = make_pool(driver, size=1, pages_per_browser=1)
+        try:
+            converter = HTMLToImageConverter(pool=pool, options=RenderOptions())
+            converter.convert(str(report), str(tmp_path / "report.png"))
+            page = pool.run(lease_page, pool)
+        finally:
+            pool.close()
+
+        assert page.html == report.read_text()
+        assert page.waited_for == "html[data-render-ready]"
+        assert page.clip == {"x": 0, "y": 0, "width": 800, "height": 600}
+
+    def test_output_options(self, driver, tmp_path):
+        """测试按输出参数转换格式、缩放并生成缩略图"""
+        report = tmp_path / "report.html"
+        report.write_text("<html></html>")
+        options = RenderOptions(format="webp", scale=1, thumbnail_width=200)
+        pool = make_pool(driver, size=1, pages_per_browser=1)
+        try:
+            converter = HTMLToImageConverter(pool=pool, options=options)
+            converter.images_dir = str(tmp_path)
+            image_path = converter.convert(str(report))
+        finally:
+            pool.close()
+
+        assert image_path == str(tmp_path / "report.webp")
+        with Image.open(image_path) as image:
+            assert (image.format, image.size) == ("WEBP", (800, 600))
+        with Image.open(tmp_path / "report_thumb.webp") as thumbnail:
+            assert thumbnail.size == (200, 150)
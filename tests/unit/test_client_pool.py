@@ -0,0 +1,72 @@
+"""
+测试 Apify 客户端连接池
+"""
+
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+
+from scraper import client_pool
+from scraper.client_pool import get_pooled_client, shutdown_client_pool
+
+
+@pytest.fixture(autouse=True)
+def clean_pool():
+    """每个测试前后清空连接池"""
+    shutdown_client_pool()
+    yield
+    shutdown_client_pool()
+
+
+def make_config(token="token-a", actor_id="apidojo/tweet-scraper"):
+    return {"api_token": token, "actor_id": actor_id}
+
+
+class TestClientPool:
+    """测试客户端复用"""
+
+    def test_same_key_reuses_client(self):
+        """测试相同配置复用同一客户端"""
+        with patch.object(client_pool, "_create_client", side_effect=lambda _: Mock()) as create:
+            first = get_pooled_client(make_config())
+            second = get_pooled_client(make_config())
+
+        assert first is second
+        assert create.call_count == 1
+
+    def test_different_keys_get_different_clients(self):
+        """测试不同 token / actor 使用不同客户端"""
+        with patch.object(client_pool, "_create_client", side_effect=lambda _: Mock()) as create:
+            a = get_pooled_client(make_config(token="a"))
+            b = get_pooled_client(make_config(token="b"))
+            c = get_pooled_client(make_config(token="a", actor_id="other/actor"))
+
+        assert a is not b and a is not c
+        assert create.call_count == 3
+
+    def test_concurrent_access_creates_once(self):
+        """测试多线程并发获取只创建一次"""
+        results = []
+        with patch.object(client_pool, "_create_client", side_effect=lambda _: Mock()) as create:
+            threads = [
+                threading.Thread(target=lambda: results.append(get_pooled_client(make_config())))
+                for _ in range(16)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        assert create.call_count == 1
+        assert all(r is results[0] for r in results)
+
+    def test_shutdown_closes_sessions(self):
+        """测试关闭钩子释放 HTTP 会话"""
+        client = Mock()
+        with patch.object(client_pool, "_create_client", return_value=client):
+            get_pooled_client(make_config())
+
+        assert shutdown_client_pool() == 1
+        client.http_client.httpx_client.close.assert_called_once()
+        assert shutdown_client_pool() == 0
@@ -0,0 +1,127 @@
+"""
+测试 SQLite 存储
+"""
+
+import os
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from common.data.database import Database, get_database
+from common.data.tweet import Tweet
+
+
+def make_tweet(tweet_id, author="alice", day=1, likes=0):
+    return Tweet(
+        id=str(tweet_id),
+        author=author,
+        text=f"tweet {tweet_id}",
+        likes=likes,
+        hashtags=["tag"],
+        created_at=f"Mon Jan {day:02d} 12:00:00 +0000 2024",
+    )
+
+
+def make_result(mbti_type, percentage=70):
+    return {
+        "mbti_type": mbti_type,
+        "dimensions": {dim: {"percentage": percentage} for dim in ("E_I", "S_N", "T_F", "J_P")},
+    }
+
+
+@pytest.fixture
+def database(tmp_path):
+    db = Database(str(tmp_path / "test.db"))
+    yield db
+    db.close()
+
+
+class TestTweets:
+    """测试推文表"""
+
+    def test_bulk_insert_and_query(self, database):
+        """测试批量写入后按作者和时间查询"""
+        tweets = [make_tweet(i, day=i) for i in range(1, 6)] + [make_tweet(9, author="bob")]
+        assert database.insert_tweets(iter(tweets)) == 6
+
+        result = database.get_tweets("ALICE", limit=2)
+        assert [t.id for t in result] == ["5", "4"]
+        assert result[0].hashtags == ("tag",)
+
+        since = datetime(2024, 1, 2, tzinfo=timezone.utc)
+        until = datetime(2024, 1, 4, tzinfo=timezone.utc)
+        assert [t.id for t in database.get_tweets("alice", since=since, until=until)] == ["3", "2"]
+        assert database.count_tweets("bob") == 1
+
+    def test_upsert_updates_metrics(self, database):
+        """测试重复写入只更新互动数"""
+        database.insert_tweets([make_tweet(1, likes=1)])
+        database.insert_tweets([make_tweet(1, likes=7), {"text": "no id"}])
+
+        assert database.count_tweets() == 1
+        assert database.get_tweets("alice")[0].likes == 7
+
+    def test_wal_mode(self, database):
+        """测试启用 WAL 模式"""
+        mode = database._connection().execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+
+
+class TestAnalyses:
+    """测试分析结果表"""
+
+    def test_aggregates(self, database):
+        """测试按类型和日期聚合"""
+        database.record_analysis("alice", make_result("INTJ"), created_at=datetime(2024, 1, 1))
+        database.record_analysis("bob", make_result("ENFP"), created_at=datetime(2024, 1, 2))
+        database.record_analysis("alice", make_result("INTJ", 80), "r.html", datetime(2024, 1, 2))
+
+        assert database.count_analyses() == 3
+        assert database.mbti_type_counts() == {"INTJ": 2, "ENFP": 1}
+        assert database.mbti_type_counts("2024-01-02") == {"INTJ": 1, "ENFP": 1}
+        assert database.analyzed_users() == ["alice", "bob"]
+        assert database.count_users("2024-01-01") == 1
+
+        latest = database.latest_analysis("Alice")
+        assert latest["e_i"] == 80
+        assert latest["report_path"] == "r.html"
+
+    def test_usernames_case_insensitive(self, database):
+        """测试大小写不同的用户名按同一个用户统计"""
+        database.record_analysis("Foo", make_result("INTJ"))
+        database.record_analysis("foo", make_result("INTJ"))
+        database.record_analysis("bar", make_result("ENFP"))
+
+        assert database.count_users() == 2
+        assert [name.lower() for name in database.analyzed_users()] == ["bar", "foo"]
+
+    def test_memory_and_uri_paths(self, tmp_path, monkeypatch):
+        """测试 ":memory:" 和 file: URI 不会被当作相对路径在当前目录创建文件"""
+        monkeypatch.chdir(tmp_path)
+        memory = get_database(":memory:")
+        memory.record_analysis("alice", make_result("INTJ"))
+        uri = get_database(f"file:{tmp_path / 'uri.db'}?mode=rwc")
+        uri.record_analysis("alice", make_result("INTJ"))
+
+        assert memory.path == ":memory:" and memory.count_analyses() == 1
+        assert uri.count_analyses() == 1
+        files = os.listdir(tmp_path)
+        assert "uri.db" in files
+        assert not any(name.startswith(("file:", ":memory:")) for name in files)
+
+    def test_shared_instance_across_threads(self, tmp_path):
+        """测试共享实例在多个线程中各自使用连接"""
+        database = get_database(str(tmp_path / "shared.db"))
+        assert get_database(str(tmp_path / "shared.db")) is database
+
+        def worker(i):
+            database.record_analysis(f"user{i}", make_result("ISTP"))
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert database.count_users() == 4
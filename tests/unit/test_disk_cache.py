@@ -0,0 +1,127 @@
+"""
+测试磁盘缓存
+"""
+
+import os
+import time
+
+import pytest
+
+from common.utils.disk_cache import DiskCache, make_cache_key
+from scraper.cache import cached_items
+from scraper.error_handling import handle_api_errors, retry_with_backoff
+
+
+class TestCacheKey:
+    """测试缓存键"""
+
+    def test_key_is_canonical(self):
+        """测试字段顺序不影响缓存键"""
+        a = make_cache_key("actor", {"searchTerms": ["from:a"], "maxItems": 10})
+        b = make_cache_key("actor", {"maxItems": 10, "searchTerms": ["from:a"]})
+        assert a == b
+        assert a != make_cache_key("actor", {"maxItems": 11, "searchTerms": ["from:a"]})
+
+
+class TestDiskCache:
+    """测试磁盘缓存行为"""
+
+    def test_put_and_get(self, tmp_path):
+        """测试写入后命中"""
+        cache = DiskCache(str(tmp_path))
+        cache.put_bytes("k", b"data")
+
+        assert cache.get_bytes("k") == b"data"
+        assert cache.get_bytes("missing") is None
+        assert cache.get_stats()["hits"] == 1
+        assert cache.get_stats()["misses"] == 1
+
+    def test_ttl_expiry(self, tmp_path):
+        """测试过期后未命中并删除文件"""
+        cache = DiskCache(str(tmp_path), ttl_seconds=60)
+        path = cache.put_bytes("k", b"data")
+        old = time.time() - 120
+        os.utime(path, (old, old))
+
+        assert cache.get_path("k") is None
+        assert not os.path.exists(path)
+        assert cache.get_stats()["expired"] == 1
+
+    def test_lru_eviction(self, tmp_path):
+        """测试超过大小上限时淘汰最久未使用的条目"""
+        cache = DiskCache(str(tmp_path), max_bytes=25)
+        for i, key in enumerate(["a", "b"]):
+            path = cache.put_bytes(key, b"x" * 10)
+            os.utime(path, (1000 + i, 1000 + i))
+
+        cache.get_path("a")  # a 变为最近使用
+        cache.put_bytes("c", b"x" * 10)
+
+        assert cache.get_path("b") is None
+        assert cache.get_path("a") is not None
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_writer_discards_on_error(self, tmp_path):
+        """测试写入中途出错时不提交"""
+        cache = DiskCache(str(tmp_path))
+        with pytest.raises(RuntimeError):
+            with cache.open_writer("k") as f:
+                f.write("partial")
+                raise RuntimeError("boom")
+
+        assert cache.get_path("k") is None
+        assert os.listdir(tmp_path) == []
+
+
+class TestCachedItems:
+    """测试抓取结果缓存"""
+
+    def test_second_read_hits_cache(self, tmp_path):
+        """测试完整读取后第二次直接命中缓存"""
+        cache = DiskCache(str(tmp_path), suffix=".jsonl")
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            yield {"id": "1"}
+            yield {"id": "2"}
+
+        assert list(cached_items("k", fetch, cache)) == [{"id": "1"}, {"id": "2"}]
+        assert list(cached_items("k", fetch, cache)) == [{"id": "1"}, {"id": "2"}]
+        assert len(calls) == 1
+
+    def test_early_stop_not_cached(self, tmp_path):
+        """测试提前停止的迭代不会写入缓存"""
+        cache = DiskCache(str(tmp_path), suffix=".jsonl")
+        items = cached_items("k", lambda: iter([{"id": "1"}, {"id": "2"}]), cache)
+        next(items)
+        items.close()
+
+        assert cache.get_path("k") is None
+
+    def test_empty_result_not_cached(self, tmp_path):
+        """测试空结果不缓存"""
+        cache = DiskCache(str(tmp_path), suffix=".jsonl")
+        assert list(cached_items("k", lambda: iter([]), cache)) == []
+        assert cache.get_path("k") is None
+
+    @pytest.mark.parametrize("payload", [{"error": "rate limit exceeded"}, {"id": "1"}])
+    def test_error_payload_not_cached(self, tmp_path, payload):
+        """测试单条错误信息或无文本的条目不缓存"""
+        cache = DiskCache(str(tmp_path), suffix=".jsonl")
+        assert list(cached_items("k", lambda: iter([payload]), cache)) == [payload]
+        assert cache.get_path("k") is None
+
+    def test_retry_succeeds_after_error_payload(self, tmp_path, monkeypatch):
+        """测试第一次返回限流信息时，重试会重新请求而不是读到缓存的失败结果"""
+        monkeypatch.setattr(time, "sleep", lambda seconds: None)
+        cache = DiskCache(str(tmp_path), suffix=".jsonl")
+        responses = iter([[{"error": "rate limit exceeded"}], [{"text": "a"}, {"text": "b"}]])
+
+        @retry_with_backoff(max_retries=1, initial_delay=0, service_name="test_cache_retry")
+        @handle_api_errors
+        def scrape():
+            return list(cached_items("k", lambda: iter(next(responses)), cache))
+
+        assert scrape() == [{"text": "a"}, {"text": "b"}]
+        assert list(cached_items("k", lambda: iter([]), cache)) == [{"text": "a"}, {"text": "b"}]
@@ -2,8 +2,10 @@
 测试错误处理机制
 """
 
+import asyncio
+
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 from datetime import datetime, timedelta
 
 from common.exceptions import (
@@ -16,7 +18,9 @@ from common.rate_limiter import RateLimiter
 from scraper.error_handling import (
     check_user_exists,
     handle_api_errors,
+    handle_api_errors_async,
     retry_with_backoff,
+    retry_with_backoff_async,
     validate_api_response,
     validate_tweet_data,
 )
@@ -257,4 +261,74 @@ class TestErrorHandlingDecorator:
         
         with pytest.raises(RateLimitError) as excinfo:
             decorated()
-        assert "rate limit exceeded" in str(excinfo.value).lower()
\ No newline at end of file
+        assert "rate limit exceeded" in str(excinfo.value).lower()
+
+class TestAsyncDecorators:
+    """测试异步版本的重试和错误处理装饰器"""
+
+    def test_async_retry_on_rate_limit(self):
+        """测试异步限流重试"""
+        calls = []
+
+        async def flaky():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RateLimitError("Rate limited", retry_after=1)
+            return "success"
+
+        decorated = retry_with_backoff_async(
+            max_retries=3, initial_delay=0.1, service_name="test_async"
+        )(flaky)
+
+        with patch("asyncio.sleep", new=AsyncMock()) as sleep:
+            result = asyncio.run(decorated())
+
+        assert result == "success"
+        assert len(calls) == 2
+        sleep.assert_awaited()
+
+    def test_async_max_retries_exceeded(self):
+        """测试异步超过最大重试次数"""
+        func = AsyncMock(side_effect=APIError("API error"))
+        decorated = retry_with_backoff_async(
+            max_retries=2, initial_delay=0.1, service_name="test_async_fail"
+        )(func)
+
+        with patch("asyncio.sleep", new=AsyncMock()):
+            with pytest.raises(APIError):
+                asyncio.run(decorated())
+
+        assert func.await_count == 3
+
+    def test_sync_and_async_share_backoff(self):
+        """测试同步和异步重试使用相同的延迟计算和重试判断"""
+        errors = [
+            APIError("boom"),
+            RateLimitError("Rate limited", retry_after=30),
+            RateLimitError("Rate limited"),
+            APIError("boom"),
+        ]
+        limiter = Mock()
+        limiter.can_make_request.return_value = (True, None)
+        options = dict(max_retries=3, initial_delay=1, backoff_factor=3, max_delay=20)
+
+        with patch("scraper.error_handling.get_rate_limiter", return_value=limiter):
+            with patch("time.sleep") as sleep, pytest.raises(APIError):
+                retry_with_backoff(**options)(Mock(side_effect=errors))()
+            sync_waits = [c.args[0] for c in sleep.call_args_list]
+
+            with patch("asyncio.sleep", new=AsyncMock()) as sleep, pytest.raises(APIError):
+                asyncio.run(retry_with_backoff_async(**options)(AsyncMock(side_effect=errors))())
+            async_waits = [c.args[0] for c in sleep.await_args_list]
+
+        assert sync_waits == async_waits == [1, 20, 9]
+
+    def test_async_handle_api_errors(self):
+        """测试异步错误转换"""
+        decorated = handle_api_errors_async(AsyncMock(return_value=[{"error": "User not found"}]))
+        with pytest.raises(UserNotFoundError):
+            asyncio.run(decorated())
+
+        decorated = handle_api_errors_async(AsyncMock(side_effect=Exception("429 Too Many")))
+        with pytest.raises(RateLimitError):
+            asyncio.run(decorated())
@@ -0,0 +1,129 @@
+"""
+测试 Gemini 异步批量分析
+"""
+
+import asyncio
+from unittest.mock import Mock, patch
+
+import pytest
+
+pytest.importorskip("google.generativeai")
+
+from common.utils.rate_limiter import RateLimiter
+from mbti_analyzer import gemini_api
+from mbti_analyzer.gemini_api import GeminiAnalyzer
+
+RESPONSE_TEMPLATE = (
+    '{"mbti_type": "%s", "dimensions": {}, "overall_analysis": "ok"}'
+)
+
+
+def make_tweet_data(username):
+    return {"username": username, "original_tweets": [{"text": username}], "reply_tweets": []}
+
+
+@pytest.fixture
+def analyzer():
+    """不使用结果缓存、使用独立限流器的分析器"""
+    limiter = RateLimiter(max_requests_per_minute=100)
+    with patch.object(gemini_api, "get_analysis_cache", return_value=None), \
+            patch.object(gemini_api, "get_gemini_rate_limiter", return_value=limiter):
+        yield GeminiAnalyzer("key")
+
+
+def fake_model(delays, failing=()):
+    """按用户名延迟返回的假模型，记录最大并发数"""
+    state = {"active": 0, "peak": 0}
+
+    async def generate_content_async(prompt):
+        username = next(name for name in delays if f"@{name} " in prompt)
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        try:
+            await asyncio.sleep(delays[username])
+            if username in failing:
+                raise RuntimeError("boom")
+            return Mock(text=RESPONSE_TEMPLATE % "INTP")
+        finally:
+            state["active"] -= 1
+
+    return Mock(generate_content_async=generate_content_async), state
+
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+
+class TestAnalyzeMany:
+    """测试有限并发的批量分析"""
+
+    def test_completion_order_and_error_isolation(self, analyzer):
+        """测试按完成顺序返回，单个失败不影响其他用户"""
+        analyzer.model, _ = fake_model({"slow": 0.05, "fast": 0.0, "bad": 0.01}, failing={"bad"})
+        users = ["slow", "fast", "bad"]
+
+        results = asyncio.run(collect(analyzer.analyze_many(map(make_tweet_data, users))))
+
+        assert [r.username for r in results] == ["fast", "bad", "slow"]
+        assert [r.ok for r in results] == [True, False, True]
+        assert "boom" in results[1].error
+        assert results[0].result["mbti_type"] == "INTP"
+
+    def test_concurrency_bounded(self, analyzer):
+        """测试同时进行的请求数不超过 concurrency"""
+        delays = {f"user{i}": 0.01 for i in range(6)}
+        analyzer.model, state = fake_model(delays)
+
+        results = asyncio.run(
+            collect(analyzer.analyze_many(map(make_tweet_data, delays), concurrency=2))
+        )
+
+        assert len(results) == 6 and all(r.ok for r in results)
+        assert state["peak"] == 2
+
+    def test_concurrency_capped_by_rate_limit(self, analyzer):
+        """测试并发数不超过每分钟 Gemini 请求上限"""
+        delays = {f"user{i}": 0.01 for i in range(4)}
+        analyzer.model, state = fake_model(delays)
+        config = Mock()
+        config.rate_limit.gemini_requests_per_minute = 1
+
+        with patch.object(gemini_api, "get_config", return_value=config):
+            asyncio.run(collect(analyzer.analyze_many(map(make_tweet_data, delays), 8)))
+
+        assert state["peak"] == 1
+
+
+class TestAnalyzeMbtiAsync:
+    """测试单个用户的异步分析"""
+
+    def test_rate_limit_error_mapped(self, analyzer):
+        """测试 429 错误映射为 RateLimitError"""
+        async def generate_content_async(prompt):
+            raise RuntimeError("429 Resource exhausted")
+
+        analyzer.model = Mock(generate_content_async=generate_content_async)
+
+        with pytest.raises(gemini_api.RateLimitError):
+            asyncio.run(analyzer.analyze_mbti_async(make_tweet_data("someone")))
+
+
+class TestGeminiRateLimiter:
+    """测试 Gemini 限流器的限额"""
+
+    def test_limits_per_window(self):
+        """测试每日配额只作为天窗口的上限，每小时上限由每分钟配额推出"""
+        config = Mock()
+        config.rate_limit.gemini_requests_per_minute = 2
+        config.rate_limit.gemini_requests_per_day = 1500
+
+        with patch.object(gemini_api, "get_config", return_value=config), \
+                patch.object(gemini_api, "get_rate_limiter") as get_rate_limiter:
+            gemini_api.get_gemini_rate_limiter()
+
+        get_rate_limiter.assert_called_once_with(
+            "gemini",
+            max_requests_per_minute=2,
+            max_requests_per_hour=120,
+            max_requests_per_day=1500,
+        )
@@ -0,0 +1,112 @@
+"""
+测试 Gemini 响应解析（结构化输出与旧解析方式）
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("google.generativeai")
+
+from mbti_analyzer import gemini_api
+from mbti_analyzer.gemini_api import RESPONSE_SCHEMA, GeminiAnalyzer, get_parse_stats
+
+
+def make_result(**overrides):
+    result = {
+        "mbti_type": "INFP",
+        "dimensions": {
+            key: {"type": letters[1], "percentage": 60, "analysis": "依据"}
+            for key, letters in gemini_api.DIMENSION_LETTERS.items()
+        },
+        "overall_analysis": "总结",
+    }
+    result.update(overrides)
+    return result
+
+
+def parse_delta(analyzer, text):
+    """解析响应，返回 (结果, 解析计数的变化)"""
+    before = get_parse_stats()
+    result = analyzer._parse_result(text)
+    after = get_parse_stats()
+    return result, {kind: after[kind] - before[kind] for kind in after
+                    if after[kind] > before[kind]}
+
+
+class TestStructuredOutput:
+    """测试结构化输出模式"""
+
+    def test_model_configured_with_schema(self):
+        """测试开启时请求 JSON MIME 类型和响应 Schema，关闭时不传生成配置"""
+        with patch.object(gemini_api.genai, "GenerativeModel") as model_cls:
+            GeminiAnalyzer("key", structured_output=True)
+            GeminiAnalyzer("key", structured_output=False)
+
+        enabled, disabled = model_cls.call_args_list
+        config = enabled.kwargs["generation_config"]
+        assert config["response_mime_type"] == "application/json"
+        assert config["response_schema"] is RESPONSE_SCHEMA
+        assert disabled.kwargs["generation_config"] is None
+
+    def test_generation_config_accepted_by_sdk(self):
+        """测试生成配置能被 SDK 的 GenerationConfig 类型接受（Schema 可转换为 proto）"""
+        generation_types = pytest.importorskip("google.generativeai.types.generation_types")
+        analyzer = GeminiAnalyzer("key", structured_output=True)
+
+        config = generation_types.to_generation_config_dict(analyzer.generation_config)
+
+        assert config["response_mime_type"] == "application/json"
+        schema = config["response_schema"]
+        assert list(schema.required) == ["mbti_type", "dimensions", "overall_analysis"]
+        assert set(schema.properties["dimensions"].properties) == set(
+            gemini_api.DIMENSION_LETTERS
+        )
+
+    def test_single_json_loads(self):
+        """测试合规的结构化响应直接解析"""
+        analyzer = GeminiAnalyzer("key", structured_output=True)
+        result, delta = parse_delta(analyzer, json.dumps(make_result(), ensure_ascii=False))
+
+        assert result["mbti_type"] == "INFP"
+        assert delta == {"structured": 1}
+
+    @pytest.mark.parametrize(
+        "result",
+        [
+            make_result(overall_analysis=None),
+            make_result(dimensions={"E_I": {"type": "I", "percentage": "60", "analysis": ""}}),
+        ],
+    )
+    def test_invalid_types_fall_back(self, result):
+        """测试类型不符时退回旧解析方式"""
+        analyzer = GeminiAnalyzer("key", structured_output=True)
+        _, delta = parse_delta(analyzer, json.dumps(result, ensure_ascii=False))
+
+        assert delta == {"legacy": 1}
+
+    def test_invalid_mbti_type_rejected(self):
+        """测试无效的MBTI类型在两种解析方式下都被拒绝"""
+        analyzer = GeminiAnalyzer("key", structured_output=True)
+
+        with pytest.raises(ValueError):
+            analyzer._parse_result(json.dumps(make_result(mbti_type="XXXX")))
+
+
+class TestLegacyParsing:
+    """测试旧解析方式的命中计数"""
+
+    def test_fenced_and_repaired(self):
+        """测试代码块提取和修复路径分别计数"""
+        analyzer = GeminiAnalyzer("key", structured_output=False)
+        fenced = "说明\n```json\n" + json.dumps(make_result(), ensure_ascii=False) + "\n```"
+        text = json.dumps(make_result(), ensure_ascii=False, indent=4)
+        broken = text[:-1].rstrip() + ",\n}"  # 多余的逗号
+
+        _, fenced_delta = parse_delta(analyzer, fenced)
+        result, broken_delta = parse_delta(analyzer, broken)
+
+        assert fenced_delta == {"legacy": 1}
+        assert broken_delta == {"legacy_repair": 1}
+        assert result["overall_analysis"] == "总结"
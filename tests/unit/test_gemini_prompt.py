@@ -0,0 +1,133 @@
+"""
+测试 Gemini 系统指令和上下文缓存
+"""
+
+import inspect
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock, patch
+
+import pytest
+
+pytest.importorskip("google.generativeai")
+
+from mbti_analyzer import gemini_api
+from mbti_analyzer.gemini_api import SYSTEM_INSTRUCTION, GeminiAnalyzer
+
+TWEET_DATA = {
+    "username": "someone",
+    "original_tweets": [{"text": "原创内容"}],
+    "reply_tweets": [{"text": "回复内容"}],
+}
+
+
+@pytest.fixture
+def fresh_context_cache():
+    """每个测试使用空的上下文缓存状态"""
+    with patch.object(gemini_api, "_context_caches", {}), \
+            patch.object(gemini_api, "_context_cache_failed", False):
+        yield
+
+
+class TestSystemInstruction:
+    """测试静态指令与每个用户的提示词分离"""
+
+    def test_model_created_with_system_instruction(self):
+        """测试模型创建时带上系统指令"""
+        with patch.object(gemini_api.genai, "GenerativeModel") as model_cls:
+            GeminiAnalyzer("key", context_cache=False)
+
+        assert model_cls.call_args.kwargs["system_instruction"] is SYSTEM_INSTRUCTION
+
+    def test_prompt_only_contains_user_data(self):
+        """测试提示词只包含用户名和推文样本，不再重复静态指令"""
+        prompt = GeminiAnalyzer("key", context_cache=False)._build_prompt(TWEET_DATA)
+
+        assert "@someone" in prompt and "原创内容" in prompt and "回复内容" in prompt
+        assert "重要指导原则" not in prompt
+        assert len(prompt) < len(SYSTEM_INSTRUCTION) / 5
+        assert '"mbti_type": "XXXX"' in SYSTEM_INSTRUCTION
+
+
+    def test_engagement_lines(self):
+        """测试互动数较高时附带 [赞/转]，缺失或为 None 时按 0 处理"""
+        formatted = GeminiAnalyzer("key", context_cache=False)._format_tweets([
+            {"text": "热门", "likes": 20, "retweets": 1},
+            {"text": "旧格式", "metrics": {"likes": 3, "retweets": 9}},
+            {"text": "没有数据", "likes": None, "retweets": None},
+        ])
+
+        assert formatted.splitlines() == [
+            "1. 热门",
+            "   [赞:20 转:1]",
+            "2. 旧格式",
+            "   [赞:3 转:9]",
+            "3. 没有数据",
+        ]
+
+class TestContextCache:
+    """测试服务端上下文缓存"""
+
+    def test_cached_model_reused_until_expiry(self, fresh_context_cache):
+        """测试缓存句柄在过期前被重复使用，过期后重新创建"""
+        now = datetime.now(timezone.utc)
+        fresh = Mock(expire_time=now + timedelta(hours=1))
+        stale = Mock(expire_time=now)
+        create = Mock(side_effect=[stale, fresh])
+        genai = Mock()
+        genai.caching.CachedContent.create = create
+
+        with patch.object(gemini_api, "genai", genai):
+            analyzer = GeminiAnalyzer("key", context_cache=True)
+            analyzer._current_model()
+            first = analyzer._current_model()
+            second = analyzer._current_model()
+
+        assert create.call_count == 2
+        assert create.call_args.kwargs["system_instruction"] is SYSTEM_INSTRUCTION
+        assert first is second
+        genai.GenerativeModel.from_cached_content.assert_called_with(
+            fresh, generation_config=analyzer.generation_config
+        )
+
+    def test_failure_falls_back(self, fresh_context_cache, capsys):
+        """测试创建失败时使用普通模型，且不再重试"""
+        genai = Mock()
+        genai.caching.CachedContent.create.side_effect = RuntimeError("too short")
+
+        with patch.object(gemini_api, "genai", genai):
+            analyzer = GeminiAnalyzer("key", context_cache=True)
+            assert analyzer._current_model() is analyzer.model
+            assert analyzer._current_model() is analyzer.model
+
+        genai.caching.CachedContent.create.assert_called_once()
+        assert "too short" in capsys.readouterr().out
+
+
+class TestSdkSupport:
+    """测试所依赖的 SDK 接口在真实的 google-generativeai 中存在"""
+
+    def test_system_instruction_accepted(self):
+        """测试 GenerativeModel 接受 system_instruction 参数"""
+        pytest.importorskip("google.generativeai.types")
+        model = GeminiAnalyzer("key", context_cache=False).model
+
+        assert model._system_instruction.parts[0].text == SYSTEM_INSTRUCTION
+
+    def test_context_cache_calls_match_sdk(self, fresh_context_cache):
+        """测试创建和使用上下文缓存的调用参数与 SDK 签名一致"""
+        caching = pytest.importorskip("google.generativeai.caching")
+        real_model_cls = gemini_api.genai.GenerativeModel
+        genai = Mock()
+        genai.caching.CachedContent.create.return_value = Mock(
+            expire_time=datetime.now(timezone.utc) + timedelta(hours=1)
+        )
+
+        with patch.object(gemini_api, "genai", genai):
+            GeminiAnalyzer("key", context_cache=True)._current_model()
+
+        create = genai.caching.CachedContent.create.call_args
+        inspect.signature(caching.CachedContent.create).bind(*create.args, **create.kwargs)
+        from_cached = genai.GenerativeModel.from_cached_content.call_args
+        inspect.signature(real_model_cls.from_cached_content).bind(
+            *from_cached.args, **from_cached.kwargs
+        )
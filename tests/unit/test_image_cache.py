@@ -0,0 +1,64 @@
+"""
+测试报告图片缓存
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("google.generativeai")
+
+from common.utils.disk_cache import DiskCache
+from mbti_analyzer import image_cache
+from mbti_analyzer.image_renderer import render_report_image
+
+REPORT_HTML = """
+<div class="terminal"><div class="terminal-body">
+    <p class="output">分析结论: <span class="highlight">{mbti_type}</span></p>
+</div></div>
+"""
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """使用临时目录中的图片缓存"""
+    disk_cache = DiskCache(str(tmp_path / "cache"), max_bytes=10 * 1024 * 1024, suffix=".img")
+    with patch.object(image_cache, "_cache", disk_cache), \
+            patch.object(image_cache, "_enabled", True):
+        yield disk_cache
+
+
+def write_report(tmp_path, name, mbti_type="INTP"):
+    path = tmp_path / f"{name}.html"
+    path.write_text(REPORT_HTML.format(mbti_type=mbti_type), encoding="utf-8")
+    return str(path)
+
+
+class TestImageCache:
+    """测试按内容哈希复用生成的图片"""
+
+    def test_same_content_hits(self, cache, tmp_path):
+        """测试相同内容的报告（即使文件名不同）直接复用缓存图片"""
+        first = render_report_image(write_report(tmp_path, "a"), str(tmp_path / "a.png"))
+        second = render_report_image(write_report(tmp_path, "b"), str(tmp_path / "b.png"))
+
+        assert cache.get_stats()["hits"] == 1
+        with open(first, "rb") as f1, open(second, "rb") as f2:
+            assert f1.read() == f2.read()
+
+    def test_settings_change_key(self, cache, tmp_path):
+        """测试内容或渲染参数不同时生成不同的缓存键"""
+        report = write_report(tmp_path, "a")
+        other = write_report(tmp_path, "b", mbti_type="ENFJ")
+
+        key = image_cache.image_cache_key(report, {"scale": 2})
+        assert key != image_cache.image_cache_key(report, {"scale": 1})
+        assert key != image_cache.image_cache_key(other, {"scale": 2})
+
+    def test_disabled(self, cache, tmp_path):
+        """测试关闭缓存时每次都重新生成"""
+        with patch.object(image_cache, "_enabled", False):
+            render_report_image(write_report(tmp_path, "a"), str(tmp_path / "a.png"))
+            render_report_image(write_report(tmp_path, "a"), str(tmp_path / "a.png"))
+
+        assert cache.get_stats()["writes"] == 0
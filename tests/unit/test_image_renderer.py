@@ -0,0 +1,69 @@
+"""
+测试不依赖浏览器的报告图片渲染
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("google.generativeai")
+
+from PIL import Image
+
+from mbti_analyzer import image_renderer
+from mbti_analyzer.image_renderer import GREEN, TerminalCardRenderer, parse_report_blocks
+
+REPORT_HTML = """
+<div class="terminal"><div class="terminal-body">
+    <p class="prompt"><span class="user">user@LLM</span>:~$ run</p>
+    <pre>██╗
+╚═╝</pre>
+    <p class="output">分析结论: <span class="highlight">INTP</span></p>
+    <br>
+    <p class="output">   >   long   text</p>
+    <span class="cursor"></span>
+</div></div>
+"""
+
+
+class TestParseReportBlocks:
+    """测试从报告 HTML 提取待绘制内容"""
+
+    def test_blocks_and_styles(self):
+        """测试块类型、颜色和空白折叠"""
+        blocks = parse_report_blocks(REPORT_HTML)
+
+        assert [kind for kind, _ in blocks] == ["p", "pre", "p", "br", "p", "cursor"]
+        prompt = blocks[0][1]
+        assert prompt[0] == ("u", GREEN, False)
+        assert "".join(c[0] for c in blocks[1][1]) == "██╗\n╚═╝"
+        assert blocks[2][1][-1][2] is True  # highlight 加粗
+        assert "".join(c[0] for c in blocks[4][1]) == "> long text"
+
+
+class TestTerminalCardRenderer:
+    """测试卡片绘制"""
+
+    def test_render_size(self):
+        """测试卡片宽度按缩放倍数计算，高度不低于正文最小高度"""
+        image = TerminalCardRenderer(scale=1).render(REPORT_HTML)
+
+        assert isinstance(image, Image.Image)
+        assert image.width == 800
+        assert image.height > 600
+
+    def test_long_text_wraps(self):
+        """测试超出宽度的段落自动折行"""
+        renderer = TerminalCardRenderer(scale=1)
+        cells = [(c, GREEN, False) for c in "word " * 100]
+
+        rows = renderer._wrap(cells, 300)
+        assert len(rows) > 1
+        assert all(sum(renderer.atlas.advance(c[0]) for c in row) <= 300 for row in rows)
+        assert all(row[0][0] != " " for row in rows)
+
+    def test_warns_without_cjk_font(self, capsys):
+        """测试找不到中文字体时给出提示"""
+        with patch.object(image_renderer, "CJK_FONT_CANDIDATES", []):
+            TerminalCardRenderer(scale=1)
+        assert "REPORT_CJK_FONT_PATH" in capsys.readouterr().out
@@ -0,0 +1,156 @@
+"""
+测试增量抓取
+"""
+
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+
+from common.exceptions import APIError
+from common.rate_limiter import RateLimiter
+from scraper import error_handling, incremental
+from scraper.incremental import (
+    load_corpus,
+    load_watermark,
+    merge_tweets,
+    scrape_incremental,
+    since_search_terms,
+)
+
+
+def make_tweet(tweet_id, likes=0):
+    return {
+        "id": str(tweet_id),
+        "text": f"tweet {tweet_id}",
+        "author": "testuser",
+        "likes": likes,
+        "created_at": "",
+    }
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """把语料和高水位写到临时目录"""
+    with patch.object(incremental, "USER_TWEETS_DIR", str(tmp_path / "user_tweets")), \
+            patch.object(incremental, "WATERMARKS_DIR", str(tmp_path / "watermarks")):
+        yield tmp_path
+
+
+@pytest.fixture(autouse=True)
+def rate_limiter():
+    """增量搜索经过限流器，每个测试使用独立的限流器，不受其他测试的退避状态影响"""
+    with patch.object(error_handling, "get_rate_limiter", lambda _: RateLimiter()):
+        yield
+
+
+class TestMergeTweets:
+    """测试按 id 合并"""
+
+    def test_dedupes_and_sorts_newest_first(self):
+        """测试去重并按 id 从新到旧排序"""
+        existing = [make_tweet(1), make_tweet(3)]
+        merged = merge_tweets(existing, [make_tweet(3, likes=9), make_tweet(20)])
+        assert [t["id"] for t in merged] == ["20", "3", "1"]
+        assert merged[1]["likes"] == 9  # 新数据覆盖旧数据
+
+    def test_since_terms(self):
+        """测试增量搜索条件"""
+        assert since_search_terms("from:a", {"newest_id": "123"}) == "from:a since_id:123"
+        watermark = {"newest_id": "abc", "newest_created_at": "Wed Oct 10 20:19:24 +0000 2018"}
+        assert since_search_terms("from:a", watermark) == "from:a since:2018-10-10"
+
+
+class TestScrapeIncremental:
+    """测试增量抓取流程"""
+
+    def test_first_run_fetches_full(self, storage):
+        """测试首次抓取走全量路径并记录高水位"""
+        fetch_full = Mock(return_value=[make_tweet(i) for i in range(5, 0, -1)])
+        tweets, new_count = scrape_incremental("testuser", 5, "from:testuser", fetch_full)
+
+        fetch_full.assert_called_once_with("testuser", 5)
+        assert new_count == 5
+        assert len(tweets) == 5
+        assert load_watermark("testuser")["newest_id"] == "5"
+
+    def test_second_run_fetches_delta(self, storage):
+        """测试再次抓取只搜索新推文并合并"""
+        fetch_full = Mock(return_value=[make_tweet(i) for i in range(5, 0, -1)])
+        scrape_incremental("testuser", 5, "from:testuser", fetch_full)
+
+        with patch.object(
+            incremental, "scrape_with_search", return_value=[make_tweet(7), make_tweet(6)]
+        ) as search:
+            tweets, new_count = scrape_incremental("testuser", 5, "from:testuser", fetch_full)
+
+        assert fetch_full.call_count == 1
+        assert search.call_args[0][0]["search_terms"] == "from:testuser since_id:5"
+        assert new_count == 2
+        assert [t["id"] for t in tweets] == ["7", "6", "5", "4", "3"]
+        assert len(load_corpus("testuser")) == 7
+        assert load_watermark("testuser")["newest_id"] == "7"
+
+    def test_small_corpus_refetches_full(self, storage):
+        """测试语料不足且未取尽时重新全量抓取"""
+        first_batch = Mock(return_value=[make_tweet(2), make_tweet(1)])
+        scrape_incremental("testuser", 2, "from:a", first_batch)
+
+        fetch_full = Mock(return_value=[make_tweet(i) for i in range(10, 0, -1)])
+        tweets, new_count = scrape_incremental("testuser", 10, "from:a", fetch_full)
+
+        fetch_full.assert_called_once_with("testuser", 10)
+        assert new_count == 8
+        assert len(tweets) == 10
+
+    def test_exhausted_user_uses_delta(self, storage):
+        """测试已取尽全部推文的用户即使数量不足也只抓增量"""
+        scrape_incremental("testuser", 10, "from:a", Mock(return_value=[make_tweet(1)]))
+
+        fetch_full = Mock()
+        with patch.object(incremental, "scrape_with_search", return_value=[]):
+            tweets, new_count = scrape_incremental("testuser", 10, "from:a", fetch_full)
+
+        fetch_full.assert_not_called()
+        assert new_count == 0
+        assert [t["id"] for t in tweets] == ["1"]
+
+    def test_legacy_corpus_is_migrated(self, storage):
+        """测试旧版整文件 JSON 语料迁移到只追加的推文库"""
+        legacy_dir = storage / "user_tweets" / "testuser"
+        legacy_dir.mkdir(parents=True)
+        legacy_path = legacy_dir / "testuser_timeline_corpus.json"
+        legacy_path.write_text(json.dumps([make_tweet(2), make_tweet(1)]), encoding="utf-8")
+
+        assert [t["id"] for t in load_corpus("testuser")] == ["2", "1"]
+        assert not legacy_path.exists()
+        assert (legacy_dir / "testuser_timeline.jsonl").exists()
+
+    def test_error_payload_leaves_store_unchanged(self, storage, monkeypatch):
+        """测试增量搜索返回错误响应时抛出异常，语料和高水位不变"""
+        monkeypatch.setattr(error_handling.time, "sleep", lambda _: None)
+        first_batch = Mock(return_value=[make_tweet(2), make_tweet(1)])
+        scrape_incremental("testuser", 2, "from:a", first_batch)
+        watermark = load_watermark("testuser")
+
+        # 错误响应经过字段提取后只剩一条没有 id 和正文的记录
+        with patch.object(incremental, "scrape_with_search", return_value=[{"author": ""}]):
+            with pytest.raises(APIError):
+                scrape_incremental("testuser", 2, "from:a", Mock())
+
+        assert [t["id"] for t in load_corpus("testuser")] == ["2", "1"]
+        assert load_watermark("testuser") == watermark
+
+    def test_items_without_id_are_dropped(self, storage):
+        """测试没有 id 的条目不写入语料"""
+        first_batch = Mock(return_value=[make_tweet(2), make_tweet(1)])
+        scrape_incremental("testuser", 2, "from:a", first_batch)
+
+        anonymous = {"text": "no id", "author": "testuser", "created_at": ""}
+        with patch.object(
+            incremental, "scrape_with_search", return_value=[make_tweet(3), anonymous]
+        ):
+            tweets, new_count = scrape_incremental("testuser", 2, "from:a", Mock())
+
+        assert [t["id"] for t in tweets] == ["3", "2"]
+        assert [t["id"] for t in load_corpus("testuser")] == ["3", "2", "1"]
@@ -0,0 +1,65 @@
+"""
+测试容错 JSON 解析
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from common.utils.json_repair import benchmark, loads_tolerant, repair_json
+
+CORPUS_DIR = Path(__file__).parent.parent / "fixtures" / "malformed_gemini"
+CORPUS = sorted(CORPUS_DIR.glob("*.txt"))
+
+
+class TestRepairJson:
+    """测试单项修复"""
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ('{"a": "x\ny"}', {"a": "x\ny"}),
+            ('{"a": "他说"好的"吧"}', {"a": '他说"好的"吧'}),
+            ('{"a": "说"你好""}', {"a": '说"你好"'}),
+            ('{"a": 1\n"b": [1 2]}', {"a": 1, "b": [1, 2]}),
+            ('{"a": [1, 2,], "b": {"c": 3,},}', {"a": [1, 2], "b": {"c": 3}}),
+            ('{"a": "§ 230 \\"x\\" \\d"}', {"a": '§ 230 "x" \\d'}),
+            ('结果：```json\n{"a": True, "b": None}\n```', {"a": True, "b": None}),
+            ('{"a": {"b": "trunc', {"a": {"b": "trunc"}}),
+            ('{"a": "逗号"在里面", 还有"}', {"a": '逗号"在里面", 还有'}),
+        ],
+    )
+    def test_repairs(self, text, expected):
+        """测试换行、多余引号、缺少/多余逗号、转义、代码块和截断"""
+        assert json.loads(repair_json(text)) == expected
+
+    def test_valid_json_unchanged(self):
+        """测试合法 JSON 修复后语义不变"""
+        data = {"a": [1, -2.5e3, "x\\y", {"b": None}], "c": "引号\"和\n换行"}
+        assert json.loads(repair_json(json.dumps(data, ensure_ascii=False, indent=2))) == data
+        assert loads_tolerant(json.dumps(data)) == data
+
+    def test_no_json(self):
+        """测试没有 JSON 时抛出 ValueError"""
+        with pytest.raises(ValueError):
+            repair_json("抱歉，无法分析")
+
+
+class TestCorpus:
+    """测试不规范输出样本"""
+
+    @pytest.mark.parametrize("path", CORPUS, ids=[p.stem for p in CORPUS])
+    def test_corpus_parses(self, path):
+        """测试每个样本都能修复为包含四个维度的结果"""
+        result = json.loads(repair_json(path.read_text(encoding="utf-8")))
+
+        assert len(result["mbti_type"]) == 4
+        assert set(result["dimensions"]) == {"E_I", "S_N", "T_F", "J_P"}
+
+    def test_benchmark(self):
+        """测试基准统计全部成功"""
+        result = benchmark([str(p) for p in CORPUS])
+
+        assert result["total"] == len(CORPUS) >= 10
+        assert result["failed"] == []
@@ -0,0 +1,69 @@
+"""
+测试图片输出参数
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip("google.generativeai")
+
+from PIL import Image, ImageDraw
+
+from mbti_analyzer.render_options import RenderOptions, save_image, thumbnail_path_for
+
+
+def make_image():
+    """带抗锯齿文字的终端配色图片"""
+    image = Image.new("RGB", (800, 600), "#161b22")
+    draw = ImageDraw.Draw(image)
+    for i in range(20):
+        draw.text((10, 10 + i * 28), "user@LLM:~$ mbti --deep " * 3, fill="#39ff14")
+    return image
+
+
+class TestRenderOptions:
+    """测试参数校验与默认路径"""
+
+    def test_invalid_format(self):
+        """测试不支持的格式"""
+        with pytest.raises(ValueError):
+            RenderOptions(format="gif")
+
+    def test_output_path_extension(self):
+        """测试输出路径使用对应格式的扩展名"""
+        options = RenderOptions(format="jpeg")
+        assert options.output_path_for("/r/mbti_report_a.html", "/img") == os.path.join(
+            "/img", "mbti_report_a.jpg"
+        )
+        assert thumbnail_path_for("/img/a.jpg") == "/img/a_thumb.jpg"
+
+    def test_from_config_overrides(self):
+        """测试命令行未指定的参数使用配置值"""
+        options = RenderOptions.from_config(format="webp", quality=None)
+        assert options.format == "webp"
+        assert options.quality == RenderOptions().quality
+
+
+class TestSaveImage:
+    """测试保存时的后处理"""
+
+    def test_palette_png_is_smaller(self, tmp_path):
+        """测试调色板量化后的 PNG 体积更小"""
+        image = make_image()
+        plain = save_image(image, str(tmp_path / "plain.png"), RenderOptions())
+        palette = save_image(image, str(tmp_path / "palette.png"), RenderOptions(palette_colors=16))
+
+        with Image.open(palette) as saved:
+            assert saved.mode == "P"
+        assert os.path.getsize(palette) < os.path.getsize(plain)
+
+    def test_scale_and_thumbnail(self, tmp_path):
+        """测试按缩放倍数重新采样并生成缩略图"""
+        options = RenderOptions(format="jpeg", scale=1, thumbnail_width=100)
+        path = save_image(make_image(), str(tmp_path / "a.jpg"), options, source_scale=2)
+
+        with Image.open(path) as saved:
+            assert (saved.format, saved.size) == ("JPEG", (400, 300))
+        with Image.open(thumbnail_path_for(path)) as thumbnail:
+            assert thumbnail.size == (100, 75)
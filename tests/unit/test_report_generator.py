@@ -0,0 +1,58 @@
+"""
+测试报告生成器
+"""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("google.generativeai")
+
+from mbti_analyzer import report_generator
+from mbti_analyzer.report_generator import ReportGenerator, mbti_ascii_art
+
+MBTI_RESULT = {
+    "mbti_type": "ENFJ",
+    "dimensions": {
+        "E_I": {"type": "E", "percentage": 60, "analysis": "a"},
+        "S_N": {"type": "N", "percentage": 70, "analysis": "b"},
+        "T_F": {"type": "F", "percentage": 80, "analysis": "c"},
+        "J_P": {"type": "J", "percentage": 90, "analysis": "d"},
+    },
+}
+
+
+@pytest.fixture
+def generator(tmp_path):
+    config = SimpleNamespace(
+        storage=SimpleNamespace(reports_dir=tmp_path / "reports", database_path=tmp_path / "db")
+    )
+    with patch.object(report_generator, "get_config", return_value=config):
+        yield ReportGenerator()
+
+
+class TestReportGenerator:
+    """测试模板环境复用与内存渲染"""
+
+    def test_environment_is_shared(self, generator):
+        """测试多个生成器共用同一个已编译模板的环境"""
+        assert ReportGenerator().env is generator.env
+        assert generator.env.get_template("terminal_report.html") is generator.env.get_template(
+            "terminal_report.html"
+        )
+
+    def test_generate_without_saving(self, generator, tmp_path):
+        """测试 save=False 只返回HTML内容，不写文件也不写索引"""
+        html = generator.generate("someone", MBTI_RESULT, save=False)
+
+        assert "@someone" in html
+        assert "[E] ******---- [I] (60%)" in html
+        assert mbti_ascii_art("ENFJ") in html
+        assert list((tmp_path / "reports").iterdir()) == []
+        assert not (tmp_path / "db").exists()
+
+    def test_ascii_art_is_memoized(self):
+        """测试同一类型的ASCII艺术只生成一次"""
+        assert mbti_ascii_art("INTP") is mbti_ascii_art("INTP")
+        assert len(mbti_ascii_art("INTP").splitlines()) == 6
@@ -0,0 +1,77 @@
+"""
+测试报告统计索引与历史报告导入
+"""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("google.generativeai")
+
+from common.data.database import get_database
+from mbti_analyzer import report_generator
+from mbti_analyzer.report_generator import ReportGenerator, backfill_report_index, parse_report
+
+MBTI_RESULT = {
+    "mbti_type": "INTP",
+    "dimensions": {
+        "E_I": {"type": "I", "percentage": 72, "analysis": "a"},
+        "S_N": {"type": "N", "percentage": 65, "analysis": "b"},
+        "T_F": {"type": "T", "percentage": 80, "analysis": "c"},
+        "J_P": {"type": "P", "percentage": 55, "analysis": "d"},
+    },
+    "overall_analysis": "ok",
+}
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """把报告目录和数据库指向临时目录"""
+    config = SimpleNamespace(
+        storage=SimpleNamespace(
+            reports_dir=tmp_path / "reports", database_path=tmp_path / "index.db"
+        )
+    )
+    with patch.object(report_generator, "get_config", return_value=config):
+        yield config.storage
+
+
+class TestReportIndex:
+    """测试生成报告时写入索引"""
+
+    def test_generate_records_analysis(self, storage):
+        """测试生成报告的同时写入一条分析记录"""
+        path = ReportGenerator().generate("some_user", MBTI_RESULT)
+
+        database = get_database(storage.database_path)
+        assert database.mbti_type_counts() == {"INTP": 1}
+        assert database.latest_analysis("some_user")["report_path"] == path
+
+    def test_parse_report(self, storage):
+        """测试从报告中解析类型和维度百分比"""
+        path = ReportGenerator().generate("some_user", MBTI_RESULT)
+        record = parse_report(path)
+
+        assert record["username"] == "some_user"
+        assert record["mbti_result"]["mbti_type"] == "INTP"
+        percentages = [d["percentage"] for d in record["mbti_result"]["dimensions"].values()]
+        assert percentages == [72, 65, 80, 55]
+
+
+class TestBackfill:
+    """测试导入已有报告"""
+
+    def test_backfill_is_idempotent(self, storage, tmp_path):
+        """测试导入历史报告，重复运行不会重复导入"""
+        ReportGenerator().generate("old_user", MBTI_RESULT)
+        (storage.reports_dir / "mbti_report_broken_20240101_000000.html").write_text("x")
+
+        # 换一个新的数据库，模拟索引建立之前生成的报告
+        storage.database_path = tmp_path / "fresh.db"
+        assert backfill_report_index() == (1, 1)
+        assert backfill_report_index() == (0, 1)
+
+        database = get_database(storage.database_path)
+        assert database.analyzed_users() == ["old_user"]
+        assert database.latest_analysis("old_user")["t_f"] == 80
@@ -0,0 +1,211 @@
+"""
+测试流式抓取与增量保存
+"""
+
+import csv
+import json
+import os
+from unittest.mock import Mock, patch
+
+import pytest
+
+from common.data.database import get_database
+from common.exceptions import APIError
+from common.rate_limiter import RateLimiter
+from scraper import cache, error_handling, main, scraper
+from scraper.main import save_to_csv, save_to_json, save_user_tweets
+
+
+def make_tweet(i):
+    return {
+        "id": str(i),
+        "text": f"推文 {i}\n第二行",
+        "author": "testuser",
+        "created_at": "2024-01-01",
+        "likes": i,
+        "retweets": 0,
+        "replies": 0,
+        "url": f"https://x.com/testuser/status/{i}",
+        "hashtags": ["tag"],
+        "mentions": [],
+    }
+
+
+def make_raw_tweet(i):
+    return {"id": str(i), "text": f"raw {i}", "author": {"userName": "testuser"}}
+
+
+class TestStreamingScrape:
+    """测试流式抓取"""
+
+    @pytest.fixture
+    def fake_pool(self):
+        """伪造连接池中的客户端，记录消费的条数"""
+        consumed = []
+
+        def iterate_items():
+            for i in range(1000):
+                consumed.append(i)
+                yield make_raw_tweet(i)
+
+        client = Mock()
+        client.dataset.return_value.iterate_items.side_effect = iterate_items
+        actor = Mock()
+        actor.call.return_value = {"defaultDatasetId": "ds"}
+
+        with patch.object(scraper, "get_pooled_client", return_value=(client, actor)), \
+                patch.object(cache, "_enabled", False):
+            yield actor, consumed
+
+    def test_iter_yields_normalized_tweets(self, fake_pool):
+        """测试生成器产出格式化后的推文"""
+        actor, _ = fake_pool
+        tweets = scraper.scrape_tweets_iter({"username": "testuser", "max_items": 5}, {})
+        first = next(tweets)
+
+        assert first["author"] == "testuser"
+        assert first["text"] == "raw 0"
+        actor.call.assert_called_once_with(
+            run_input={"twitterHandles": ["testuser"], "maxItems": 5, "sort": "Latest"}
+        )
+
+    def test_iter_supports_early_stop(self, fake_pool):
+        """测试调用方提前停止时不会拉取剩余数据"""
+        _, consumed = fake_pool
+        tweets = scraper.scrape_with_search_iter({"search_terms": "from:a", "max_items": 5}, {})
+        for i, _ in enumerate(tweets):
+            if i == 2:
+                break
+
+        assert len(consumed) == 3
+
+    def test_list_api_unchanged(self, fake_pool):
+        """测试列表接口仍返回完整结果"""
+        tweets = scraper.scrape_tweets({"username": "testuser", "max_items": 5}, {})
+        assert len(tweets) == 1000
+
+
+class TestIncrementalSave:
+    """测试增量保存"""
+
+    def test_json_matches_json_dump(self, tmp_path):
+        """测试流式 JSON 与 json.dump 输出一致"""
+        tweets = [make_tweet(i) for i in range(3)]
+        path = save_to_json(iter(tweets), str(tmp_path / "t.json"), auto_dir=False)
+
+        with open(path, encoding="utf-8") as f:
+            content = f.read()
+        assert content == json.dumps(tweets, ensure_ascii=False, indent=2)
+
+    def test_json_empty(self, tmp_path):
+        """测试空输入写出空数组"""
+        path = save_to_json(iter([]), str(tmp_path / "t.json"), auto_dir=False)
+        with open(path, encoding="utf-8") as f:
+            assert json.load(f) == []
+
+    def test_csv_from_generator(self, tmp_path):
+        """测试 CSV 可以消费生成器"""
+        path = save_to_csv((make_tweet(i) for i in range(4)), str(tmp_path / "t.csv"), False)
+        with open(path, encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+        assert [r["likes"] for r in rows] == ["0", "1", "2", "3"]
+
+    def test_csv_empty_returns_none(self, tmp_path):
+        """测试空输入不创建 CSV"""
+        assert save_to_csv(iter([]), str(tmp_path / "t.csv"), auto_dir=False) is None
+        assert not (tmp_path / "t.csv").exists()
+
+    def test_save_user_tweets_default_snapshots(self, tmp_path):
+        """测试默认格式仍为 both，返回 json 和 csv 快照路径"""
+        with patch.object(main, "USER_TWEETS_DIR", str(tmp_path)), \
+                patch.object(main, "DATABASE_ENABLED", False):
+            saved = save_user_tweets("testuser", [make_tweet(1)])
+
+        assert set(saved) == {"json", "csv"}
+        assert all(os.path.exists(path) for path in saved.values())
+
+    def test_save_user_tweets_single_pass(self, tmp_path):
+        """测试同时保存两种格式时生成器只被消费一次"""
+        with patch.object(main, "USER_TWEETS_DIR", str(tmp_path)), \
+                patch.object(main, "DATABASE_PATH", str(tmp_path / "t.db")):
+            saved = save_user_tweets(
+                "testuser", (make_tweet(i) for i in range(5)), format="both"
+            )
+
+        assert get_database(str(tmp_path / "t.db")).count_tweets() == 5
+
+        with open(saved["json"], encoding="utf-8") as f:
+            assert len(json.load(f)) == 5
+        with open(saved["csv"], encoding="utf-8", newline="") as f:
+            assert len(list(csv.DictReader(f))) == 5
+
+
+class TestMultiUserScrape:
+    """测试多用户批量抓取"""
+
+    def test_demux_by_author(self):
+        """测试按作者拆分并限制每人数量"""
+        tweets = [
+            {"author": "Alice", "id": "1"},
+            {"author": "bob", "id": "2"},
+            {"author": "alice", "id": "3"},
+            {"author": "stranger", "id": "4"},
+            {"author": "alice", "id": "5"},
+        ]
+        result = scraper.demux_by_author(tweets, ["alice", "Bob", "carol"], max_per_user=2)
+
+        assert [t["id"] for t in result["alice"]] == ["1", "3"]
+        assert [t["id"] for t in result["Bob"]] == ["2"]
+        assert result["carol"] == []
+
+    def test_demux_stops_when_all_filled(self):
+        """测试所有用户满额后停止读取"""
+        consumed = []
+
+        def stream():
+            for i in range(100):
+                consumed.append(i)
+                yield {"author": "alice", "id": str(i)}
+
+        scraper.demux_by_author(stream(), ["alice"], max_per_user=3)
+        assert len(consumed) == 3
+
+    def test_scrape_many_users_chunks(self):
+        """测试按分组运行 actor"""
+        calls = []
+
+        def fake_chunk(usernames, max_per_user):
+            calls.append(list(usernames))
+            return {u: [{"author": u}] for u in usernames}
+
+        with patch.object(main, "scrape_handle_chunk", side_effect=fake_chunk):
+            result = main.scrape_many_users(["a", "b", "A", "c", "d"], 10, chunk_size=2)
+
+        assert calls == [["a", "b"], ["c", "d"]]
+        assert list(result) == ["a", "b", "c", "d"]
+
+    def test_handle_chunk_raises_on_error_payload(self, monkeypatch):
+        """测试 actor 返回错误响应时抛出异常，而不是当作各用户都没有推文"""
+        monkeypatch.setattr(error_handling.time, "sleep", lambda _: None)
+        monkeypatch.setattr(error_handling, "get_rate_limiter", lambda _: RateLimiter())
+        # 每次重试都重新运行 actor，得到同样的错误响应
+        iterator = Mock(side_effect=lambda input_data: iter([{"error": "actor failed"}]))
+
+        with patch.object(main, "create_api_iterator", return_value=iterator):
+            with pytest.raises(APIError, match="actor failed"):
+                main.scrape_handle_chunk(["alice", "bob"], 5)
+        assert iterator.call_count == 4
+
+    def test_handle_chunk_demuxes_stream(self, monkeypatch):
+        """测试正常结果经过检查后完整地按作者拆分"""
+        monkeypatch.setattr(error_handling, "get_rate_limiter", lambda _: RateLimiter())
+        raw = [
+            {"id": str(i), "text": f"raw {i}", "author": {"userName": name}}
+            for i, name in enumerate(["alice", "bob", "alice", "bob"])
+        ]
+
+        with patch.object(main, "create_api_iterator", return_value=Mock(return_value=iter(raw))):
+            result = main.scrape_handle_chunk(["alice", "bob"], 5)
+
+        assert [t["id"] for t in result["alice"]] == ["0", "2"]
+        assert [t["id"] for t in result["bob"]] == ["1", "3"]
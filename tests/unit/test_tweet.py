@@ -0,0 +1,119 @@
+"""
+Tweet 记录类型的单元测试
+"""
+
+import csv
+import io
+import json
+
+import pytest
+
+from common.data.tweet import TWEET_FIELDS, Tweet, as_tweet, tweet_to_dict
+
+
+@pytest.fixture
+def raw_tweet():
+    """Apify 原始响应中的一条推文"""
+    return {
+        "id": "1001",
+        "text": "hello world",
+        "author": {"userName": "alice", "name": "Alice"},
+        "createdAt": "Wed Oct 10 20:19:24 +0000 2018",
+        "likeCount": 8,
+        "retweetCount": 1,
+        "replyCount": 1,
+        "viewCount": 100,
+        "url": "https://x.com/alice/status/1001",
+        "inReplyToId": "999",
+        "photos": [{"url": "https://img/1.jpg"}],
+        "hashtags": ["python"],
+        "mentions": [],
+    }
+
+
+class TestTweetRecord:
+    """测试 Tweet 的构建和字段访问"""
+
+    def test_from_api(self, raw_tweet):
+        """测试从原始响应构建"""
+        tweet = Tweet.from_api(raw_tweet)
+
+        assert tweet.author == "alice"
+        assert tweet.author_name == "Alice"
+        assert tweet.likes == 8
+        assert tweet.is_reply is True
+        assert tweet.is_retweet is False
+        assert tweet.media == ("https://img/1.jpg",)
+
+    def test_derived_fields(self, raw_tweet):
+        """测试派生字段"""
+        tweet = Tweet.from_api(raw_tweet)
+
+        assert tweet.has_media is True
+        assert tweet.engagement_rate == pytest.approx(0.1)
+        assert Tweet(likes=3, views=0).engagement_rate == 3
+
+    def test_mapping_access(self, raw_tweet):
+        """测试兼容字典式访问"""
+        tweet = Tweet.from_api(raw_tweet)
+
+        assert tweet["text"] == "hello world"
+        assert tweet["has_media"] is True
+        assert tweet.get("views", 0) == 100
+        assert tweet.get("fullText") is None
+        assert tweet.get("metrics", {}) == {}
+        assert "id" in tweet
+        with pytest.raises(KeyError):
+            tweet["missing"]
+
+    def test_no_instance_dict(self):
+        """测试使用 __slots__ 存储"""
+        tweet = Tweet(text="x")
+        assert not hasattr(tweet, "__dict__")
+        with pytest.raises(AttributeError):
+            tweet.extra = 1
+
+
+class TestTweetBoundary:
+    """测试 JSON/CSV 边界的转换"""
+
+    def test_to_dict_matches_legacy_layout(self, raw_tweet):
+        """测试字典字段顺序和类型与原格式一致"""
+        data = Tweet.from_api(raw_tweet).to_dict()
+
+        assert tuple(data) == TWEET_FIELDS
+        assert data["media"] == ["https://img/1.jpg"]
+        assert data["hashtags"] == ["python"]
+        json.dumps(data)
+
+    def test_round_trip(self, raw_tweet):
+        """测试 to_dict / from_dict 往返"""
+        tweet = Tweet.from_api(raw_tweet)
+        restored = Tweet.from_dict(json.loads(json.dumps(tweet.to_dict())))
+
+        assert restored == tweet
+
+    def test_from_dict_ignores_unknown_keys(self):
+        """测试未知字段被忽略、缺失字段使用默认值"""
+        tweet = Tweet.from_dict({"text": "t", "likes": 2, "favorite_count": 9})
+
+        assert tweet.likes == 2
+        assert tweet.retweets == 0
+        assert tweet.media == ()
+
+    def test_csv_dict_writer(self, raw_tweet):
+        """测试可以直接交给 csv.DictWriter"""
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=["id", "text", "likes"], extrasaction="ignore")
+        writer.writerow(Tweet.from_api(raw_tweet))
+
+        assert buffer.getvalue().strip() == "1001,hello world,8"
+
+    def test_helpers(self):
+        """测试 as_tweet / tweet_to_dict 对两种输入的处理"""
+        tweet = Tweet(text="a")
+
+        assert as_tweet(tweet) is tweet
+        assert as_tweet({"text": "a"}) == tweet
+        assert tweet_to_dict({"text": "a"}) == {"text": "a"}
+        assert tweet_to_dict(tweet)["text"] == "a"
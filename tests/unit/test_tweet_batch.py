@@ -0,0 +1,109 @@
+"""
+列式推文批次的单元测试
+"""
+
+import math
+
+import pytest
+
+from common.calculations import calculate_stats_summary
+from common.data.tweet import Tweet
+from common.data.tweet_batch import TweetBatch
+from common.tweet_utils import calculate_tweet_stats
+
+
+@pytest.fixture
+def tweets():
+    """示例推文"""
+    return [
+        Tweet(
+            text="hello",
+            likes=10,
+            retweets=2,
+            replies=1,
+            views=100,
+            hashtags=["a"],
+            media=["m"],
+            created_at="Wed Oct 10 20:19:24 +0000 2018",
+        ),
+        Tweet(text="hi there", likes=0, views=0, mentions=["bob"], is_reply=True),
+        Tweet(text="x", likes=5, retweets=5, replies=0, views=50, created_at="bad"),
+    ]
+
+
+class TestTweetBatch:
+    """测试批次构建和列访问"""
+
+    def test_columns(self, tweets):
+        """测试列内容"""
+        batch = TweetBatch.from_tweets(tweets)
+
+        assert len(batch) == 3
+        assert batch["likes"].tolist() == [10, 0, 5]
+        assert batch["text_length"].tolist() == [5, 8, 1]
+        assert batch["has_media"].tolist() == [True, False, False]
+        assert batch["is_reply"].tolist() == [False, True, False]
+
+    def test_engagement_rate_matches_tweet(self, tweets):
+        """测试向量化互动率与逐条计算一致"""
+        batch = TweetBatch.from_tweets(tweets)
+
+        expected = [t.engagement_rate for t in tweets]
+        assert batch.engagement_rate.tolist() == pytest.approx(expected)
+
+    def test_timestamps_lazy(self, tweets):
+        """测试时间戳列：可解析的转为秒，其余为 NaN"""
+        timestamps = TweetBatch.from_tweets(tweets).timestamps
+
+        assert timestamps[0] == 1539202764.0
+        assert math.isnan(timestamps[1]) and math.isnan(timestamps[2])
+
+    def test_dict_input_and_empty(self):
+        """测试字典输入（含旧字段名）和空批次"""
+        batch = TweetBatch.from_tweets([{"text": "ab", "favorite_count": 3, "media": ["m"]}])
+        assert batch["likes"].tolist() == [3]
+        assert batch.rate("has_media") == 1.0
+
+        empty = TweetBatch.from_tweets([])
+        assert len(empty) == 0
+        assert empty.mean("likes") == 0.0
+
+    def test_unknown_column(self, tweets):
+        """测试未知列名"""
+        with pytest.raises(KeyError):
+            TweetBatch.from_tweets(tweets).column("nope")
+
+
+class TestVectorizedStats:
+    """测试统计函数的列式路径与列表路径结果一致"""
+
+    def test_calculate_tweet_stats(self):
+        """测试 calculate_tweet_stats"""
+        tweets = [
+            {"text": "abc", "favorite_count": 4, "retweet_count": 1, "reply_count": 2},
+            {"text": "abcdefg", "favorite_count": 1, "retweet_count": 0, "reply_count": 0},
+        ]
+
+        assert calculate_tweet_stats(TweetBatch.from_tweets(tweets)) == calculate_tweet_stats(
+            tweets
+        )
+
+    def test_calculate_tweet_stats_records(self, tweets):
+        """测试 Tweet 记录和当前字段名的字典在列表与批次路径下统计一致"""
+        dicts = [t.to_dict() for t in tweets] + [{"text": None, "likes": None}]
+
+        for records in (tweets, dicts):
+            expected = calculate_tweet_stats(records)
+            assert calculate_tweet_stats(TweetBatch.from_tweets(records)) == expected
+        assert calculate_tweet_stats(tweets)["total_likes"] == 15
+        assert calculate_tweet_stats(tweets)["total_retweets"] == 7
+
+    @pytest.mark.parametrize("group_key", [None, "is_reply", "has_media"])
+    def test_calculate_stats_summary(self, tweets, group_key):
+        """测试 calculate_stats_summary（含分组）"""
+        dicts = [dict(t, has_media=t.has_media) for t in tweets]
+
+        expected = calculate_stats_summary(dicts, "likes", group_key)
+        actual = calculate_stats_summary(TweetBatch.from_tweets(tweets), "likes", group_key)
+
+        assert actual == expected
@@ -0,0 +1,108 @@
+"""
+测试只追加的用户推文库
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+from common.data.tweet import Tweet
+from scraper.tweet_store import UserTweetStore
+
+
+def make_tweet(tweet_id, day=1, likes=0):
+    return Tweet(
+        id=str(tweet_id),
+        text=f"tweet {tweet_id}",
+        likes=likes,
+        created_at=f"Mon Jan {day:02d} 12:00:00 +0000 2024",
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    return UserTweetStore("testuser", root=str(tmp_path))
+
+
+class TestAppend:
+    """测试追加写入"""
+
+    def test_appends_only_unseen(self, store):
+        """测试重复抓取只追加新推文"""
+        assert store.append([make_tweet(1), make_tweet(2)]) == 2
+        assert store.append([make_tweet(2, likes=5), make_tweet(3), make_tweet(3)]) == 1
+
+        assert len(store) == 3
+        with open(store.data_path, encoding="utf-8") as f:
+            assert len(f.readlines()) == 3
+        # 已存储的推文不会被改写
+        assert store.get("2").likes == 0
+
+    def test_accepts_dicts_without_id(self, store):
+        """测试字典输入和没有 id 的推文按内容去重"""
+        tweet = {"text": "no id", "created_at": ""}
+        assert store.append([tweet, dict(tweet)]) == 1
+        assert store.read_all()[0].text == "no id"
+
+
+class TestRead:
+    """测试按 id / 时间读取"""
+
+    def test_get_and_contains(self, store):
+        """测试按 id 定位"""
+        store.append([make_tweet(i, day=i) for i in range(1, 6)])
+
+        assert "3" in store
+        assert store.get(3) == make_tweet(3, day=3)
+        assert store.get("99") is None
+
+    def test_iter_range(self, store):
+        """测试按时间范围读取（左闭右开，按时间顺序）"""
+        store.append([make_tweet(i, day=i) for i in (5, 1, 3, 2, 4)])
+
+        since = datetime(2024, 1, 2, tzinfo=timezone.utc)
+        until = datetime(2024, 1, 4, 12, tzinfo=timezone.utc)
+        assert [t.id for t in store.iter_range(since, until)] == ["2", "3"]
+        assert len(list(store.iter_range())) == 5
+
+    def test_latest_and_read_all(self, store):
+        """测试读取最新推文和全部推文"""
+        store.append([make_tweet(i) for i in (2, 10, 7)])
+
+        assert [t.id for t in store.latest(2)] == ["10", "7"]
+        assert [t.id for t in store.read_all()] == ["10", "7", "2"]
+
+    def test_index_reused_across_instances(self, store, tmp_path):
+        """测试新实例直接使用索引文件"""
+        store.append([make_tweet(1), make_tweet(2)])
+
+        reopened = UserTweetStore("testuser", root=str(tmp_path))
+        assert len(reopened) == 2
+        assert reopened.append([make_tweet(2)]) == 0
+
+
+class TestRecovery:
+    """测试中断后的恢复"""
+
+    def test_missing_index_is_rebuilt(self, store, tmp_path):
+        """测试索引丢失时从数据文件重建"""
+        store.append([make_tweet(1, day=1), make_tweet(2, day=2)])
+        os.remove(store.index_path)
+
+        reopened = UserTweetStore("testuser", root=str(tmp_path))
+        assert reopened.get("2").text == "tweet 2"
+        assert os.path.exists(reopened.index_path)
+
+    def test_partial_tail_is_dropped(self, store, tmp_path):
+        """测试数据文件末尾不完整的一行被截掉，已索引之外的完整行被补建"""
+        store.append([make_tweet(1)])
+        with open(store.data_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(make_tweet(2).to_dict()) + "\n")
+            f.write('{"id": "3", "te')
+
+        reopened = UserTweetStore("testuser", root=str(tmp_path))
+        assert len(reopened) == 2
+        assert reopened.append([make_tweet(3)]) == 1
+        assert [t.id for t in reopened.read_all()] == ["3", "2", "1"]